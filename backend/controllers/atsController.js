@@ -1,6 +1,7 @@
 const axios = require('axios');
 const FormData = require('form-data');
 const db = require('../db');
+const { startNlpTrace, logSlowNlpCall } = require('../utils/tracing');
 
 const connection = db.promise();
 
@@ -69,11 +70,12 @@ exports.analyzeATS = async (req, res) => {
     });
 
     // Call ATS analysis service
+    const trace = startNlpTrace(req);
     try {
       // We always call the /api/analyze endpoint; handle URLs with or without /api.
       const atsUrl = `${getNlpApiBase()}/analyze`;
 
-      let headers = form.getHeaders();
+      let headers = { ...form.getHeaders(), traceparent: trace.traceparent };
       try {
         const length = await new Promise((resolve, reject) => {
           form.getLength((err, len) => (err ? reject(err) : resolve(len)));
@@ -89,13 +91,14 @@ exports.analyzeATS = async (req, res) => {
         maxContentLength: Infinity,
         timeout: 60000, // 60 seconds timeout
       });
+      logSlowNlpCall(trace, '/analyze');
 
       return res.status(200).json({
         success: true,
         ...response.data,
       });
     } catch (atsError) {
-      console.error('ATS Service error:', atsError.message || atsError);
+      console.error(`ATS Service error (trace ${trace.traceId}):`, atsError.message || atsError);
       
       if (atsError.code === 'ECONNREFUSED' || atsError.code === 'ETIMEDOUT') {
         return res.status(503).json({
@@ -4,6 +4,7 @@ const db = require('../db');
 const cloudinary = require('../utils/cloudinaryClient');
 const { parseResumeText } = require('../utils/resumeParser');
 const { Readable } = require('stream');
+const { startNlpTrace, logSlowNlpCall } = require('../utils/tracing');
 
 const connection = db.promise();
 
@@ -63,6 +64,7 @@ exports.upload = async (req, res) => {
   let cloudinaryUrl = null;
 
   // 1) Send PDF buffer to NLP service for text extraction
+  const trace = startNlpTrace(req);
   try {
     const form = new FormData();
     const nlpStream = Readable.from(fileBuffer);
@@ -71,7 +73,7 @@ exports.upload = async (req, res) => {
       contentType: 'application/pdf',
     });
 
-    let headers = form.getHeaders();
+    let headers = { ...form.getHeaders(), traceparent: trace.traceparent };
     try {
       const length = await new Promise((resolve, reject) => {
         form.getLength((err, len) => (err ? reject(err) : resolve(len)));
@@ -87,6 +89,7 @@ exports.upload = async (req, res) => {
       maxContentLength: Infinity,
       timeout: 30000,
     });
+    logSlowNlpCall(trace, '/extract-text');
 
     if (response.data && typeof response.data.text === 'string') {
       extractedText = response.data.text;
@@ -96,7 +99,7 @@ exports.upload = async (req, res) => {
     const status = err.response?.status;
     const detail = err.response?.data?.detail || err.response?.data?.message;
     console.error(
-      'NLP extract-text error:',
+      `NLP extract-text error (trace ${trace.traceId}):`,
       err.message || err,
       status ? `(${status})` : '',
       detail ? String(detail) : ''
@@ -0,0 +1,37 @@
+const crypto = require('crypto');
+
+// W3C trace context: version-traceid-parentid-flags
+const TRACEPARENT_PATTERN = /^[0-9a-f]{2}-([0-9a-f]{32})-([0-9a-f]{16})-[0-9a-f]{2}$/;
+
+// NLP calls slower than this are logged with their trace id
+const NLP_SLOW_MS = parseInt(process.env.NLP_SLOW_MS || '5000', 10);
+
+/**
+ * Trace context for an outgoing NLP service call.
+ * Continues the incoming request's trace when the client sent a traceparent,
+ * otherwise starts a new trace. Send `traceparent` as a request header; the
+ * NLP service records its pipeline spans under the same trace id.
+ */
+const startNlpTrace = (req) => {
+  const incoming = TRACEPARENT_PATTERN.exec(String(req?.headers?.traceparent || '').trim().toLowerCase());
+  const traceId = incoming ? incoming[1] : crypto.randomBytes(16).toString('hex');
+  const spanId = crypto.randomBytes(8).toString('hex');
+  return {
+    traceId,
+    traceparent: `00-${traceId}-${spanId}-01`,
+    startedAt: Date.now(),
+  };
+};
+
+/**
+ * Log a successful NLP call that was slow, with its trace id, so it can be
+ * matched with the NLP service's spans. Failures are logged by the caller.
+ */
+const logSlowNlpCall = (trace, endpoint) => {
+  const elapsed = Date.now() - trace.startedAt;
+  if (elapsed >= NLP_SLOW_MS) {
+    console.warn(`NLP ${endpoint} took ${elapsed}ms (trace ${trace.traceId})`);
+  }
+};
+
+module.exports = { startNlpTrace, logSlowNlpCall };
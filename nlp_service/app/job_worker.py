@@ -0,0 +1,203 @@
+"""
+Analysis job workers - run queued jobs from the SQLite job queue
+
+The API starts JOB_WORKERS worker processes at startup (see main.py); they
+can also run on their own, e.g. on a separate instance sharing JOB_DB_PATH:
+
+    python -m app.job_worker --processes 2
+"""
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import signal
+import socket
+import time
+import urllib.error
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+from app.services.job_queue import FAILED, JOB_DB_PATH, SUCCEEDED, JobQueue
+from lib import memory_tracking
+from lib.callback_urls import CallbackURLError, post_callback
+from lib.sandbox import SandboxError
+
+logger = logging.getLogger(__name__)
+
+WORKER_PROCESSES = int(os.environ.get("JOB_WORKERS", 1))
+POLL_SECONDS = float(os.environ.get("JOB_POLL_SECONDS", 0.5))
+CALLBACK_TIMEOUT_SECONDS = float(os.environ.get("JOB_CALLBACK_TIMEOUT_SECONDS", 10))
+CALLBACK_ATTEMPTS = 3
+# Callbacks are delivered on threads of each worker process, so a slow or
+# unreachable receiver does not hold up the jobs behind it
+CALLBACK_THREADS = int(os.environ.get("JOB_CALLBACK_THREADS", 4))
+
+
+_pipeline = None
+
+
+def _analysis_pipeline():
+    # Built once per worker process, on its first job
+    global _pipeline
+    if _pipeline is None:
+        from app.services.analysis_pipeline import AnalysisPipeline
+        from app.services.ats_scorer import ATSScorer
+        from app.services.domain_classifier import DomainClassifier
+        from app.services.resume_parser import ResumeParser
+        from app.services.skill_extractor import SkillExtractor
+        _pipeline = AnalysisPipeline(ResumeParser(), SkillExtractor(), DomainClassifier(), ATSScorer())
+    return _pipeline
+
+
+def _run_analyze(job: Dict[str, Any]) -> Dict[str, Any]:
+    response = _analysis_pipeline().run(job["file_path"], job["file_ext"], job["options"]["mode"])
+    return response.model_dump(mode="json")
+
+
+# Job kind -> function computing its JSON result
+JOB_HANDLERS = {
+    "analyze": _run_analyze,
+}
+
+
+def job_payload(job: Dict[str, Any]) -> Dict[str, Any]:
+    """Public view of a job (GET /api/jobs/{id} and completion callbacks)."""
+    return {
+        "job_id": job["id"],
+        "kind": job["kind"],
+        "status": job["status"],
+        "attempts": job["attempts"],
+        "created_at": job["created_at"],
+        "updated_at": job["updated_at"],
+        "finished_at": job["finished_at"],
+        "result": job["result"],
+        "error": job["error"],
+    }
+
+
+def notify_callback(job: Dict[str, Any]) -> str:
+    """POST the finished job to its callback URL; return the delivery status."""
+    body = json.dumps(job_payload(job)).encode("utf-8")
+    error = None
+    for attempt in range(CALLBACK_ATTEMPTS):
+        if attempt:
+            time.sleep(2 ** attempt)
+        try:
+            with post_callback(job["callback_url"], body, CALLBACK_TIMEOUT_SECONDS):
+                return "delivered"
+        except CallbackURLError as e:
+            error = str(e)
+            break  # refused target (e.g. a private address); retrying will not help
+        except urllib.error.HTTPError as e:
+            error = f"HTTP {e.code}"
+            if e.code < 500:
+                break  # the receiver rejected it; retrying will not help
+        except (urllib.error.URLError, OSError) as e:
+            error = str(getattr(e, "reason", e))
+    logger.warning("Callback for job %s failed: %s", job["id"], error)
+    return f"failed: {error}"
+
+
+def _deliver_callback(queue: JobQueue, job: Dict[str, Any]) -> None:
+    queue.set_callback_status(job["id"], notify_callback(job))
+
+
+def process_one(queue: JobQueue, worker: str, callbacks: Optional[Executor] = None) -> bool:
+    """Claim and run one job; return False if none was ready.
+
+    The finished job's callback is delivered on `callbacks` if given,
+    otherwise before returning.
+    """
+    job = queue.claim(worker)
+    if job is None:
+        return False
+    try:
+        result = JOB_HANDLERS[job["kind"]](job)
+    except SandboxError as e:
+        # The document tripped a parse limit; it will do so again
+        queue.fail(job["id"], worker, str(e), retry=False)
+    except Exception as e:
+        logger.exception("Job %s attempt %d failed", job["id"], job["attempts"])
+        queue.fail(job["id"], worker, str(e))
+    else:
+        if not queue.complete(job["id"], worker, result):
+            return True  # lease expired and the job went to another worker
+    finished = queue.get(job["id"])
+    if finished["status"] in (SUCCEEDED, FAILED) and finished["callback_url"]:
+        if callbacks is None:
+            _deliver_callback(queue, finished)
+        else:
+            callbacks.submit(_deliver_callback, queue, finished)
+    return True
+
+
+def worker_loop(stop, db_path: str = JOB_DB_PATH) -> None:
+    """Process jobs until `stop` (a multiprocessing Event) is set."""
+    # The API process handles Ctrl+C and stops workers through `stop`
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    if memory_tracking.TRACKING:
+        memory_tracking.start()
+    queue = JobQueue(db_path)
+    worker = f"{socket.gethostname()}:{os.getpid()}"
+    callbacks = ThreadPoolExecutor(max_workers=max(1, CALLBACK_THREADS), thread_name_prefix="job-callback")
+    try:
+        while not stop.is_set():
+            try:
+                if not process_one(queue, worker, callbacks):
+                    stop.wait(POLL_SECONDS)
+            except Exception:
+                # Queue unavailable (e.g. database locked for too long); back off
+                logger.exception("Job worker %s error", worker)
+                stop.wait(POLL_SECONDS * 10)
+    finally:
+        # Deliveries still queued are dropped; one in flight may finish
+        callbacks.shutdown(wait=False, cancel_futures=True)
+
+
+def start_workers(processes: int = WORKER_PROCESSES, db_path: str = JOB_DB_PATH) -> tuple:
+    """Start worker processes; return (stop event, processes)."""
+    ctx = multiprocessing.get_context("spawn")
+    stop = ctx.Event()
+    workers = []
+    for _ in range(processes):
+        # Not daemonic: workers start parse-sandbox children of their own
+        proc = ctx.Process(target=worker_loop, args=(stop, db_path), name="job-worker")
+        proc.start()
+        workers.append(proc)
+    return stop, workers
+
+
+def stop_workers(stop, workers: List, timeout: float = 10.0) -> None:
+    """Ask workers to finish their current job, then terminate stragglers.
+
+    A job interrupted this way stays leased and is retried after
+    JOB_LEASE_SECONDS.
+    """
+    stop.set()
+    deadline = time.monotonic() + timeout
+    for proc in workers:
+        proc.join(max(0.0, deadline - time.monotonic()))
+        if proc.is_alive():
+            proc.terminate()
+            proc.join()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Run analysis job workers.")
+    parser.add_argument("--processes", type=int, default=max(1, WORKER_PROCESSES))
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+
+    stop, workers = start_workers(args.processes)
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    try:
+        while not stop.is_set() and any(proc.is_alive() for proc in workers):
+            stop.wait(1.0)
+    except KeyboardInterrupt:
+        pass
+    stop_workers(stop, workers)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,7 @@
 """
 Pydantic models for API request/response schemas
 """
-from pydantic import BaseModel
+from pydantic import BaseModel, PrivateAttr
 from typing import List, Optional, Dict, Any
 
 
@@ -29,6 +29,13 @@ class SkillsData(BaseModel):
     other: List[str] = []
     total_count: int = 0
     skill_categories: List[SkillCategory] = []
+    # Internal skill-id bitset (see SkillVocabulary); never serialized
+    _skill_bits: Optional[int] = PrivateAttr(default=None)
+    # Vocabulary the bits were computed with (ids change on taxonomy reload)
+    _skill_vocabulary: Any = PrivateAttr(default=None)
+
+    def skill_bits(self, vocabulary) -> Optional[int]:
+        return self._skill_bits if self._skill_vocabulary is vocabulary else None
 
 
 class Project(BaseModel):
@@ -117,3 +124,48 @@ class AnalysisResponse(BaseModel):
     # OCR metadata
     parsing_method: str = "standard"  # "standard" | "ocr" | "ocr_unavailable"
     ocr_confidence: Optional[str] = None  # "low" | "medium" | "high" (only when OCR used)
+    # Analysis tier metadata
+    analysis_mode: str = "balanced"  # tier that actually ran: "fast" | "balanced" | "thorough"
+    requested_mode: str = "balanced"
+    skipped_stages: List[str] = []  # optional stages dropped to meet the tier deadline
+    # Two-phase analysis: native-text result now, OCR upgrade as a queued job
+    provisional: bool = False  # True when OCR would change the text and was deferred
+    upgrade_job_id: Optional[str] = None  # GET /api/jobs/{id} (or /events) for the final result
+    # Incremental re-scoring of edited versions (POST /api/rescore)
+    analysis_id: Optional[str] = None  # id of this analysis' stored parse state
+
+
+class JobAccepted(BaseModel):
+    job_id: str
+    status: str  # "queued"
+    status_url: str
+
+
+class JobStatus(BaseModel):
+    job_id: str
+    kind: str
+    status: str  # "queued" | "running" | "succeeded" | "failed"
+    attempts: int
+    created_at: float
+    updated_at: float
+    finished_at: Optional[float] = None
+    result: Optional[Dict[str, Any]] = None  # AnalysisResponse once succeeded
+    error: Optional[str] = None  # last attempt's error (kept while retrying)
+
+
+class EditImpact(BaseModel):
+    type: str  # "add_skill" | "add_keyword" | "add_metrics" | "add_section"
+    value: Optional[str] = None
+    section: str  # section the lines were added to
+    text: str  # the lines added
+    ats_score: int  # score after the edit
+    score_delta: int
+    weighted_delta: float  # change of the weighted sum before rounding down; ranks ties of score_delta
+    component_deltas: Dict[str, int] = {}  # ScoreBreakdown components the edit changes
+    domain: str  # primary domain after the edit
+
+
+class SimulationResponse(BaseModel):
+    success: bool
+    ats_score: int  # score of the analysis, before any edit
+    impacts: List[EditImpact] = []  # one per edit, largest score_delta (then weighted_delta) first
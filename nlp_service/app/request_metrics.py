@@ -0,0 +1,58 @@
+"""
+Request Metrics - Count and time HTTP requests per endpoint for /metrics
+"""
+import time
+
+from lib.metrics import REGISTRY
+
+REQUESTS = REGISTRY.counter(
+    "nlp_http_requests_total", "HTTP requests by endpoint, method and status.", ["endpoint", "method", "status"]
+)
+REQUEST_SECONDS = REGISTRY.histogram(
+    "nlp_http_request_duration_seconds", "HTTP request latency by endpoint (until the response body is sent).",
+    ["endpoint", "method"]
+)
+IN_FLIGHT = REGISTRY.gauge("nlp_http_requests_in_flight", "HTTP requests being served.")
+
+
+class RequestMetricsMiddleware:
+    """ASGI middleware recording request counts, latency and concurrency
+
+    Requests are labelled by route template ("/api/jobs/{job_id}"), taken
+    from the route the router matched, so ids in paths do not create new
+    series; requests matching no route share the "unmatched" label.
+    """
+
+    def __init__(self, app, exclude: tuple = ("/metrics",)):
+        """
+        Args:
+            app: Wrapped ASGI application
+            exclude: Paths not recorded (the scrape endpoint itself)
+        """
+        self.app = app
+        self.exclude = exclude
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope.get("path") in self.exclude:
+            await self.app(scope, receive, send)
+            return
+
+        status = 500  # unless a response starts
+        started = time.perf_counter()
+
+        async def recording_send(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, recording_send)
+        finally:
+            IN_FLIGHT.dec()
+            route = scope.get("route")
+            endpoint = getattr(route, "path", None) or "unmatched"
+            method = scope.get("method", "")
+            REQUESTS.inc(endpoint, method, str(status))
+            REQUEST_SECONDS.observe(time.perf_counter() - started, endpoint, method)
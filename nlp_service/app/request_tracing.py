@@ -0,0 +1,54 @@
+"""
+Request Tracing - Root span per HTTP request, continuing the caller's trace
+"""
+from lib import tracing
+
+
+class RequestTracingMiddleware:
+    """ASGI middleware opening a server span around each request
+
+    A W3C `traceparent` header (sent by the Node backend) makes the span a
+    child of the caller's span, so backend and NLP spans share one trace id.
+    The trace id is returned in an `X-Trace-Id` response header either way.
+    Pipeline spans opened while the request runs (also in the threadpool
+    and the parse sandbox) nest under this span. Does nothing unless
+    TRACE_EXPORTER is set.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not tracing.enabled():
+            await self.app(scope, receive, send)
+            return
+
+        traceparent = None
+        for name, value in scope.get("headers", []):
+            if name == b"traceparent":
+                traceparent = value.decode("latin-1")
+                break
+        method = scope.get("method", "")
+
+        with tracing.span(
+            f"{method} {scope.get('path', '')}",
+            kind=tracing.KIND_SERVER,
+            parent=tracing.parse_traceparent(traceparent),
+            **{"http.method": method, "http.target": scope.get("path", "")}
+        ) as span:
+            async def traced_send(message):
+                if message["type"] == "http.response.start":
+                    span.attributes["http.status_code"] = message["status"]
+                    headers = list(message.get("headers", []))
+                    headers.append((b"x-trace-id", span.trace_id.encode("ascii")))
+                    message = dict(message, headers=headers)
+                await send(message)
+
+            try:
+                await self.app(scope, receive, traced_send)
+            finally:
+                route = scope.get("route")
+                if getattr(route, "path", None):
+                    # Name by route template, as OpenTelemetry's HTTP conventions do
+                    span.name = f"{method} {route.path}"
+                    span.attributes["http.route"] = route.path
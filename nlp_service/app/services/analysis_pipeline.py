@@ -0,0 +1,465 @@
+"""
+Analysis Pipeline Service - Runs parse, skills, domain and scoring for one resume
+"""
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app.models.schemas import (
+    AnalysisResponse, EditImpact, Education, ExperienceSummary, Project, ScoreBreakdown, SimulationResponse
+)
+from app.services.resume_parser import ResumeParser, text_hash
+from app.services.skill_extractor import SkillExtractor
+from app.services.domain_classifier import DomainClassifier
+from app.services.ats_scorer import ATSScorer, ScoreFeatures
+from app.services.analysis_store import AnalysisStore, analysis_store
+from app.services.taxonomy import Taxonomy, TaxonomyStore, taxonomy_store
+from lib.analysis_modes import ANALYSIS_MODES, DEFAULT_MODE, Deadline, effective_mode, resolve_mode
+from lib import memory_tracking, tracing
+from lib.metrics import CACHE_LOOKUPS, STAGE_SECONDS
+
+# Pipeline stage -> stage label of nlp_stage_duration_seconds ("parse" covers
+# the sandboxed extraction, whose own stages are recorded inside it)
+_STAGE_METRICS = {
+    "parse": "parse",
+    "skills": "skill_extraction",
+    "domain": "domain_classification",
+    "score": "ats_scoring",
+}
+
+# Format of the parse states kept for /api/rescore and /api/simulate; older states are rejected
+STATE_VERSION = 2
+
+# Result model of each section extractor, to read its result back from a state
+_EXTRACTED_MODELS = {
+    "experience": ExperienceSummary,
+    "projects": Project,
+    "education": Education,
+}
+
+
+# Hypothetical edits /api/simulate scores, after the suggestions ATSScorer makes:
+# edit type -> section its lines are added to (add_section: the one in its value)
+SIMULATED_EDITS = {
+    "add_skill": "skills",
+    "add_keyword": "skills",
+    "add_metrics": "experience",
+    "add_section": None,
+}
+# Lines added by an edit sent without text of its own
+_METRICS_LINE = "• Increased efficiency by 40%"
+_SUMMARY_LINE = "Results-driven {domain} professional with X years of experience..."
+
+
+def _dump_extracted(value: Any) -> Any:
+    if isinstance(value, list):
+        return [item.model_dump(mode="json") for item in value]
+    return value.model_dump(mode="json")
+
+
+def _load_extracted(section: str, value: Any) -> Any:
+    model = _EXTRACTED_MODELS[section]
+    if isinstance(value, list):
+        return [model.model_validate(item) for item in value]
+    return model.model_validate(value)
+
+
+class AnalysisPipeline:
+    """Full resume analysis for a given quality tier"""
+
+    def __init__(
+        self,
+        resume_parser: ResumeParser,
+        skill_extractor: SkillExtractor,
+        domain_classifier: DomainClassifier,
+        ats_scorer: ATSScorer,
+        store: TaxonomyStore = taxonomy_store,
+        states: AnalysisStore = analysis_store
+    ):
+        self.resume_parser = resume_parser
+        self.skill_extractor = skill_extractor
+        self.domain_classifier = domain_classifier
+        self.ats_scorer = ats_scorer
+        self.store = store
+        self.states = states
+
+    def run(
+        self,
+        file_path: str,
+        file_ext: str,
+        mode: str = DEFAULT_MODE,
+        deadline: Optional[Deadline] = None,
+        defer_ocr: bool = False,
+        on_stage: Optional[Callable[[str, Dict[str, Any]], None]] = None
+    ) -> AnalysisResponse:
+        """Analyze a resume file on disk
+
+        Args:
+            file_path: Path to the uploaded resume
+            file_ext: ".pdf" or ".docx"
+            mode: Analysis tier ("fast" | "balanced" | "thorough")
+            deadline: Latency budget (default: the tier's configured deadline)
+            defer_ocr: Score the native text and mark the response provisional
+                instead of waiting for OCR
+            on_stage: Called as each stage finishes with its name ("parse",
+                "skills", "domain", "score") and partial results, including
+                the stage's duration as stage_ms
+
+        Returns:
+            AnalysisResponse reporting the tier that actually ran, with the
+            analysis_id of its stored parse state
+        """
+        deadline = deadline or Deadline.for_mode(mode)
+        # One taxonomy version for the whole request, even across a hot reload
+        taxonomy = self.store.current()
+        # Peak allocation per stage, when allocations are traced (MEMORY_TRACKING)
+        memory = memory_tracking.current() or memory_tracking.RequestMemory()
+        memory_frame = memory.begin()
+        started = time.perf_counter()
+
+        def stage_done(stage: str, **partial) -> None:
+            nonlocal started, memory_frame
+            now = time.perf_counter()
+            STAGE_SECONDS.observe(now - started, _STAGE_METRICS[stage])
+            memory.end(memory_frame, _STAGE_METRICS[stage])
+            if on_stage is not None:
+                on_stage(stage, dict(partial, stage_ms=round((now - started) * 1000, 1)))
+            started = now
+            memory_frame = memory.begin()
+
+        # Parse resume
+        parsed_data = self.resume_parser.parse(
+            file_path, file_ext, mode=mode, deadline=deadline, defer_ocr=defer_ocr
+        )
+        stage_done(
+            "parse",
+            candidate=parsed_data["candidate"],
+            experience=parsed_data["experience"],
+            education=parsed_data["education"],
+            projects=parsed_data["projects"],
+            parsing_method=parsed_data.get("parsing_method", "standard"),
+            ocr_confidence=parsed_data.get("ocr_confidence"),
+            provisional=parsed_data.get("ocr_deferred", False)
+        )
+
+        return self._analyze(parsed_data, mode, deadline, taxonomy, stage_done)
+    
+    def rescore(
+        self,
+        state: Dict[str, Any],
+        text: Optional[str] = None,
+        sections: Optional[Dict[str, str]] = None
+    ) -> AnalysisResponse:
+        """Re-analyze an edited resume from the parse state of an earlier analysis
+
+        The text is split into blocks (a section header and its lines) and
+        only what an edit can affect is recomputed: blocks whose hash is
+        unchanged keep their skills and domain terms, and section extractors
+        whose input is unchanged keep their results. Candidate info and the
+        ATS score read the whole text and always rerun. The response equals
+        a full analysis of the edited text with the original document's
+        extraction results (parsing method, tables, images).
+
+        Args:
+            state: Parse state stored by an earlier analysis or rescore
+            text: The edited text in full, or
+            sections: New contents of edited sections by section type,
+                e.g. {"experience": "..."}, without their header lines
+
+        Raises:
+            ValueError: Invalid or outdated state, or an impossible edit
+        """
+        if (text is None) == (sections is None):
+            raise ValueError("Send either the edited text or the edited sections.")
+        taxonomy = self.store.current()
+        loaded = self._load_state(state)
+        mode, blocks, previous, metadata = loaded["mode"], loaded["blocks"], loaded["previous"], loaded["metadata"]
+        # Block results hold for the taxonomy version they were found with
+        cached = {}
+        if loaded["taxonomy"] == taxonomy.source_sha256:
+            cached = {digest: (bits, terms) for digest, bits, terms in loaded["block_results"]}
+
+        if sections is not None:
+            blocks = self.resume_parser.replace_sections(blocks, sections)
+            text = '\n'.join(block for _, block in blocks)
+        else:
+            blocks = None
+        if not text.strip():
+            raise ValueError("The edited resume text is empty.")
+
+        parsed_data = self.resume_parser.parse_text(
+            text, metadata["has_tables"], metadata["has_images"], blocks=blocks, previous=previous
+        )
+        parsed_data.update(
+            parsing_method=metadata["parsing_method"],
+            ocr_confidence=metadata["ocr_confidence"],
+            ocr_deferred=False
+        )
+        for section, (digest, _) in parsed_data["extracted"].items():
+            reused = section in previous and previous[section][0] == digest
+            CACHE_LOOKUPS.inc("rescore_section", "hit" if reused else "miss")
+
+        deadline = Deadline.for_mode(mode)
+        deadline.skipped[:] = loaded["skipped"]
+        # Not timed per stage: rescores would skew the full-analysis histograms
+        return self._analyze(parsed_data, mode, deadline, taxonomy, lambda stage, **partial: None, cached)
+    
+    def simulate(self, state: Dict[str, Any], edits: List[Dict[str, Optional[str]]]) -> SimulationResponse:
+        """Score change of each of a list of hypothetical edits to an analyzed resume
+        
+        Every edit adds lines to one section (see SIMULATED_EDITS) and is
+        simulated on its own, from the score features in the parse state:
+        only the added lines are scanned for skills, domain terms and ATS
+        keywords, only section extractors whose input changed rerun, and only
+        the ScoreBreakdown components reading a changed feature are
+        re-evaluated. A simulated score is the one /api/rescore gives the
+        edited text, except that candidate contact info is kept.
+        
+        Args:
+            state: Parse state stored by an earlier analysis or rescore
+            edits: Edits as {"type", "value", "text"}; text replaces the
+                lines an edit adds by default
+        
+        Raises:
+            ValueError: Invalid or outdated state, or an impossible edit
+        """
+        taxonomy = self.store.current()
+        loaded = self._load_state(state)
+        if loaded["taxonomy"] != taxonomy.source_sha256:
+            raise ValueError("The taxonomy changed since this analysis; rescore the resume first.")
+        features = loaded["features"]
+        score, breakdown = self.ats_scorer.score_features(features, taxonomy)
+        sections = self.resume_parser.sections_of(loaded["blocks"])
+        
+        impacts = []
+        for edit in edits:
+            section, lines = self._edit_lines(edit, sections, features.domain)
+            edited_score, edited_breakdown, domain = self._simulate_edit(
+                loaded, sections, section, lines, (features, breakdown), taxonomy
+            )
+            component_deltas = {
+                component: getattr(edited_breakdown, component) - points
+                for component, points in breakdown
+                if getattr(edited_breakdown, component) != points
+            }
+            impacts.append(EditImpact(
+                type=edit["type"],
+                value=edit.get("value"),
+                section=section,
+                text=lines,
+                ats_score=edited_score,
+                score_delta=edited_score - score,
+                weighted_delta=round(sum(
+                    delta * self.ats_scorer.WEIGHTS[component] for component, delta in component_deltas.items()
+                ), 2),
+                component_deltas=component_deltas,
+                domain=domain
+            ))
+        impacts.sort(key=lambda impact: (impact.score_delta, impact.weighted_delta), reverse=True)
+        return SimulationResponse(success=True, ats_score=score, impacts=impacts)
+    
+    def _edit_lines(self, edit: Dict[str, Optional[str]], sections: Dict[str, str], domain: str) -> Tuple[str, str]:
+        """Section a simulated edit adds lines to, and the lines"""
+        edit_type, value, text = edit["type"], edit.get("value"), edit.get("text")
+        if edit_type not in SIMULATED_EDITS:
+            raise ValueError(f"Unknown edit type '{edit_type}'. Edits: {', '.join(SIMULATED_EDITS)}")
+        if edit_type in ("add_skill", "add_keyword", "add_section") and not value:
+            raise ValueError(f"An {edit_type} edit needs a value.")
+        
+        section = SIMULATED_EDITS[edit_type]
+        if edit_type == "add_metrics":
+            if "experience" not in sections:
+                section = "projects"
+            if section not in sections:
+                raise ValueError("The resume has no experience or projects section to add metrics to.")
+            text = text or _METRICS_LINE
+        elif edit_type == "add_section":
+            section = value
+            if section in sections:
+                raise ValueError(f"The resume already has a '{section}' section.")
+            if not text and section == "summary":
+                text = _SUMMARY_LINE.format(domain=domain)
+            if not text:
+                raise ValueError(f"An add_section edit for '{section}' needs its text.")
+        else:
+            text = text or value
+        return section, text
+    
+    def _simulate_edit(
+        self,
+        loaded: Dict[str, Any],
+        sections: Dict[str, str],
+        section: str,
+        lines: str,
+        base: Tuple[ScoreFeatures, ScoreBreakdown],
+        taxonomy: Taxonomy
+    ) -> Tuple[int, ScoreBreakdown, str]:
+        """Score, breakdown and primary domain of a resume with lines added to a section"""
+        blocks, inserted = self.resume_parser.insert_lines(loaded["blocks"], section, lines)
+        edited_sections = self.resume_parser.sections_of(blocks)
+        text = '\n'.join(block for _, block in blocks)
+        extracted = self.resume_parser.extract_sections(text, edited_sections, loaded["previous"])
+        
+        # Skills and domain terms of the text are those of its blocks and the inserted lines
+        texts = [block for _, block in loaded["blocks"]] + [inserted]
+        block_results = loaded["block_results"]
+        skills_data, _ = self.skill_extractor.extract_blocks(
+            texts, taxonomy, [bits for _, bits, _ in block_results] + [None]
+        )
+        domain_data, _ = self.domain_classifier.classify_blocks(
+            texts, skills_data, taxonomy, [terms for _, _, terms in block_results] + [None]
+        )
+        
+        features = self.ats_scorer.edited_features(
+            base[0],
+            text,
+            inserted,
+            {name: content for name, content in edited_sections.items() if sections.get(name) != content},
+            skills_data,
+            domain_data.primary,
+            extracted["experience"][1],
+            extracted["projects"][1],
+            taxonomy
+        )
+        score, breakdown = self.ats_scorer.score_features(features, taxonomy, base=base)
+        return score, breakdown, domain_data.primary
+    
+    def _load_state(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        """Contents of a parse state, read back into their in-memory types
+        
+        Raises:
+            ValueError: Invalid or outdated state
+        """
+        try:
+            if state["version"] != STATE_VERSION:
+                raise ValueError(f"parse state version {state['version']}")
+            return {
+                "mode": resolve_mode(state["mode"]),
+                "taxonomy": state["taxonomy"],
+                "blocks": [(block["section"], block["text"]) for block in state["blocks"]],
+                # (hash, skill bitset, domain terms) of each block
+                "block_results": [
+                    (block["hash"], int(block["skills"], 16), block["domain_terms"])
+                    for block in state["blocks"]
+                ],
+                "previous": {
+                    section: (entry["hash"], _load_extracted(section, entry["value"]))
+                    for section, entry in state["extracted"].items()
+                },
+                "skipped": list(state["skipped_stages"]),
+                "metadata": {
+                    key: state[key] for key in ("has_tables", "has_images", "parsing_method", "ocr_confidence")
+                },
+                "features": ScoreFeatures(**state["features"]),
+            }
+        except (KeyError, TypeError, ValueError) as e:
+            raise ValueError("Invalid or outdated parse state; analyze the resume again.") from e
+    
+    def _analyze(
+        self,
+        parsed_data: Dict[str, Any],
+        mode: str,
+        deadline: Deadline,
+        taxonomy: Taxonomy,
+        stage_done: Callable[..., None],
+        cached: Optional[Dict[str, Tuple[int, List[str]]]] = None
+    ) -> AnalysisResponse:
+        """Skills, domain and ATS score of parsed text; stores its parse state
+
+        Args:
+            cached: Skill bitset and domain terms by block hash, from the
+                parse state being re-scored
+        """
+        tier = ANALYSIS_MODES[mode]
+        # Stages skipped while extracting the document, kept in its state
+        extraction_skipped = list(deadline.skipped)
+        
+        # Get OCR metadata
+        parsing_method = parsed_data.get("parsing_method", "standard")
+        ocr_confidence = parsed_data.get("ocr_confidence")
+
+        blocks = [block for _, block in parsed_data["blocks"]]
+        hashes = [text_hash(block) for block in blocks]
+        known = [None] * len(blocks)
+        if cached is not None:
+            known = [cached.get(digest) for digest in hashes]
+            for hit in known:
+                CACHE_LOOKUPS.inc("rescore_block", "miss" if hit is None else "hit")
+            tracing.set_attributes(**{
+                "rescore.blocks": len(blocks),
+                "rescore.blocks_reused": sum(hit is not None for hit in known),
+            })
+
+        # Extract skills (per block, so a rescore can reuse unchanged ones)
+        skills_data, block_bits = self.skill_extractor.extract_blocks(
+            blocks, taxonomy, [hit and hit[0] for hit in known]
+        )
+        stage_done("skills", skills=skills_data)
+
+        # Classify domain
+        domain_data, block_terms = self.domain_classifier.classify_blocks(
+            blocks, skills_data, taxonomy, [hit and hit[1] for hit in known]
+        )
+        stage_done("domain", domain=domain_data)
+
+        # Calculate ATS score (OCR-aware)
+        ats_analysis = self.ats_scorer.calculate_score(
+            parsed_data,
+            skills_data,
+            domain_data,
+            parsing_method=parsing_method,
+            ocr_confidence=ocr_confidence,
+            include_suggestions=tier["suggestions"] and deadline.allow("suggestions"),
+            taxonomy=taxonomy
+        )
+        stage_done(
+            "score",
+            ats_score=ats_analysis["score"],
+            score_breakdown=ats_analysis["breakdown"],
+            score_category=ats_analysis["category"]
+        )
+
+        response = AnalysisResponse(
+            success=True,
+            candidate=parsed_data["candidate"],
+            ats_score=ats_analysis["score"],
+            score_breakdown=ats_analysis["breakdown"],
+            score_category=ats_analysis["category"],
+            domain=domain_data,
+            skills=skills_data,
+            projects=parsed_data["projects"],
+            experience=parsed_data["experience"],
+            education=parsed_data["education"],
+            issues=ats_analysis["issues"],
+            suggestions=ats_analysis["suggestions"],
+            keywords_analysis=ats_analysis["keywords_analysis"],
+            # OCR metadata
+            parsing_method=parsing_method,
+            ocr_confidence=ocr_confidence,
+            # Tier metadata
+            analysis_mode=effective_mode(mode, deadline.skipped),
+            requested_mode=mode,
+            skipped_stages=deadline.skipped,
+            provisional=parsed_data.get("ocr_deferred", False)
+        )
+        response.analysis_id = self.states.put({
+            "version": STATE_VERSION,
+            "taxonomy": taxonomy.source_sha256,
+            "mode": mode,
+            "skipped_stages": extraction_skipped,
+            "has_tables": parsed_data["formatting"]["has_tables"],
+            "has_images": parsed_data["formatting"]["has_images"],
+            "parsing_method": parsing_method,
+            "ocr_confidence": ocr_confidence,
+            "blocks": [
+                {"section": section, "text": block, "hash": digest, "skills": format(bits, "x"), "domain_terms": terms}
+                for (section, block), digest, bits, terms in zip(
+                    parsed_data["blocks"], hashes, block_bits, block_terms
+                )
+            ],
+            "extracted": {
+                section: {"hash": digest, "value": _dump_extracted(value)}
+                for section, (digest, value) in parsed_data["extracted"].items()
+            },
+            "features": ats_analysis["features"].to_dict(),
+        })
+        return response
@@ -0,0 +1,96 @@
+"""
+Analysis Store Service - Parse states of recent analyses, for incremental re-scoring
+"""
+import json
+import logging
+import os
+import sqlite3
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+_SERVICE_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+ANALYSIS_DB_PATH = os.environ.get(
+    "ANALYSIS_DB_PATH", os.path.join(_SERVICE_ROOT, "var", "analyses", "analyses.sqlite3")
+)
+# How long an analysis can be re-scored by its id; 0 stores nothing
+STATE_TTL_SECONDS = float(os.environ.get("ANALYSIS_STATE_TTL_SECONDS", 24 * 3600))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS analyses (
+    id TEXT PRIMARY KEY,
+    state TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    expires_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS analyses_expiry ON analyses (expires_at);
+"""
+
+
+class AnalysisStore:
+    """Parse states keyed by analysis id, shared by the API processes and job workers
+
+    A state holds a resume's text and what was extracted from it, so an
+    edited version can be re-scored without redoing the unchanged parts
+    (see AnalysisPipeline.rescore). States are immutable: every analysis and
+    rescore stores a new one. Expired states are deleted as new ones arrive.
+    """
+
+    def __init__(self, db_path: str = ANALYSIS_DB_PATH, ttl_seconds: float = STATE_TTL_SECONDS):
+        self.db_path = db_path
+        self.ttl_seconds = ttl_seconds
+        self._initialized = False
+
+    @contextmanager
+    def _connect(self):
+        # A connection per call: used from the threadpool and from several processes
+        if not self._initialized:
+            os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        # States can be recomputed, so commits skip the fsync (WAL stays consistent)
+        conn.execute("PRAGMA synchronous=NORMAL")
+        try:
+            if not self._initialized:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.executescript(_SCHEMA)
+                self._initialized = True
+            yield conn
+        finally:
+            conn.close()
+
+    def put(self, state: Dict[str, Any]) -> Optional[str]:
+        """Store a parse state and return its analysis id.
+
+        Returns None when storing is disabled or fails; the analysis itself
+        is still returned, it just cannot be re-scored by id.
+        """
+        if self.ttl_seconds <= 0:
+            return None
+        analysis_id = uuid.uuid4().hex
+        now = time.time()
+        try:
+            with self._connect() as conn:
+                conn.execute(
+                    "INSERT INTO analyses (id, state, created_at, expires_at) VALUES (?, ?, ?, ?)",
+                    (analysis_id, json.dumps(state), now, now + self.ttl_seconds)
+                )
+                conn.execute("DELETE FROM analyses WHERE expires_at <= ?", (now,))
+        except (sqlite3.Error, OSError):
+            logger.warning("Could not store the parse state of an analysis", exc_info=True)
+            return None
+        return analysis_id
+
+    def get(self, analysis_id: str) -> Optional[Dict[str, Any]]:
+        """Parse state of an analysis, or None if unknown or expired."""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT state FROM analyses WHERE id = ? AND expires_at > ?", (analysis_id, time.time())
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+
+analysis_store = AnalysisStore()
@@ -2,44 +2,95 @@
 ATS Scorer Service - Calculates ATS compatibility score and provides insights
 """
 import re
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional, Tuple
 from app.models.schemas import (
     SkillsData, DomainInfo, ScoreBreakdown, 
     ATSIssue, Suggestion, KeywordsAnalysis
 )
+from app.services.taxonomy import Taxonomy, TaxonomyStore, taxonomy_store
+from lib import tracing
+
+# Counted as bullet points by the structure check
+BULLET_CHARS = ('•', '●', '-')
+# Symbols that ATS parsers often garble
+SPECIAL_CHARS = ('→', '★', '☆', '✓', '✔', '✗', '❖', '◆')
+_TRACKED_CHARS = BULLET_CHARS + SPECIAL_CHARS
+
+
+def _field(data: Any, name: str, default: Any = None) -> Any:
+    """Field of a parsed-data model or of its dict form (read without dumping the model)"""
+    if isinstance(data, dict):
+        return data.get(name, default)
+    return getattr(data, name, default)
+
+
+class TextStats:
+    """Character and word statistics of a resume text
+    
+    Collected once per score and read by every formatting, issue and
+    keyword check instead of each re-scanning the text.
+    """
+    
+    __slots__ = ("lower", "word_count", "char_counts")
+    
+    def __init__(self, text: str):
+        self.lower = text.lower()
+        self.word_count = len(text.split())
+        if text.isascii():
+            # O(1) on str; every tracked character but '-' is non-ASCII
+            self.char_counts = dict.fromkeys(_TRACKED_CHARS, 0)
+            self.char_counts['-'] = text.count('-')
+        else:
+            self.char_counts = {char: text.count(char) for char in _TRACKED_CHARS}
+    
+    @property
+    def bullet_count(self) -> int:
+        return sum(self.char_counts[char] for char in BULLET_CHARS)
+    
+    @property
+    def special_chars(self) -> List[str]:
+        """SPECIAL_CHARS present in the text"""
+        return [char for char in SPECIAL_CHARS if self.char_counts[char]]
+
+
+class ScoreFeatures:
+    """What the ScoreBreakdown components of a resume are computed from
+    
+    Stored with the analysis' parse state, so a hypothetical edit updates
+    only the features it touches and only the components reading them are
+    re-evaluated (see ATSScorer.edited_features and score_features).
+    Read back from its to_dict() form by ScoreFeatures(**features).
+    """
+    
+    __slots__ = (
+        "domain", "phrases", "section_lengths", "has_email", "has_phone",
+        "has_tables", "has_images", "is_ocr", "word_count", "char_counts",
+        "skill_total", "skill_counts", "positions", "experience_quality", "project_scores"
+    )
+    
+    def __init__(self, **features: Any):
+        for name in self.__slots__:
+            setattr(self, name, features[name])
+        # Phrases the keyword score checks for (the domain's ATS keywords
+        # and action verbs) that are present in the text
+        self.phrases = frozenset(self.phrases)
+    
+    def replace(self, **changes: Any) -> "ScoreFeatures":
+        features = {name: getattr(self, name) for name in self.__slots__}
+        features.update(changes)
+        return ScoreFeatures(**features)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        features = {name: getattr(self, name) for name in self.__slots__}
+        features["phrases"] = sorted(self.phrases)
+        return features
 
 
 class ATSScorer:
     """Calculate ATS score and provide improvement suggestions"""
     
-    # Important keywords by domain
-    DOMAIN_KEYWORDS = {
-        'Software / IT': [
-            'developed', 'built', 'implemented', 'designed', 'architected',
-            'optimized', 'deployed', 'integrated', 'automated', 'tested',
-            'scalable', 'performance', 'api', 'database', 'cloud', 'agile'
-        ],
-        'Data / AI': [
-            'analyzed', 'modeled', 'predicted', 'visualized', 'processed',
-            'accuracy', 'precision', 'recall', 'f1', 'auc', 'training',
-            'dataset', 'feature', 'pipeline', 'insight', 'recommendation'
-        ],
-        'Marketing': [
-            'campaign', 'engagement', 'conversion', 'roi', 'reach',
-            'impression', 'click-through', 'brand', 'content', 'strategy',
-            'audience', 'growth', 'optimization', 'analytics', 'social'
-        ],
-        'Finance': [
-            'analyzed', 'forecasted', 'modeled', 'valued', 'audited',
-            'budgeted', 'reported', 'compliance', 'risk', 'revenue',
-            'cost reduction', 'profit', 'investment', 'portfolio', 'reconciled'
-        ],
-        'General': [
-            'managed', 'led', 'achieved', 'improved', 'increased',
-            'reduced', 'delivered', 'collaborated', 'created', 'developed',
-            'implemented', 'designed', 'analyzed', 'optimized', 'trained'
-        ]
-    }
+    # Keywords and commonly required skills per domain live in the taxonomy
+    # (app/data/taxonomy.json); see app.services.taxonomy
     
     # Required sections for a complete resume
     REQUIRED_SECTIONS = [
@@ -50,13 +101,47 @@ class ATSScorer:
         'summary', 'projects', 'certifications'
     ]
     
+    # General action verbs rewarded by the keyword score
+    ACTION_VERBS = [
+        'achieved', 'built', 'created', 'delivered', 'enhanced',
+        'generated', 'improved', 'launched', 'managed', 'optimized'
+    ]
+    
+    SKILL_CATEGORIES = ['programming_languages', 'frameworks', 'tools', 'databases', 'soft_skills']
+    
+    # Weight of each ScoreBreakdown component in the final score
+    WEIGHTS = {
+        'keyword_relevance': 0.20,
+        'section_completeness': 0.20,
+        'formatting_score': 0.15,
+        'skill_relevance': 0.20,
+        'experience_clarity': 0.15,
+        'project_impact': 0.10
+    }
+    
+    # ScoreFeatures each component reads
+    COMPONENT_FEATURES = {
+        'keyword_relevance': ('domain', 'phrases'),
+        'section_completeness': ('section_lengths', 'has_email', 'has_phone'),
+        'formatting_score': ('has_tables', 'has_images', 'is_ocr', 'word_count', 'char_counts'),
+        'skill_relevance': ('skill_total', 'skill_counts'),
+        'experience_clarity': ('positions', 'experience_quality'),
+        'project_impact': ('project_scores',)
+    }
+    
+    def __init__(self, store: TaxonomyStore = taxonomy_store):
+        self.store = store
+    
+    @tracing.traced("ATSScorer.calculate_score")
     def calculate_score(
         self, 
         parsed_data: Dict, 
         skills: SkillsData, 
         domain: DomainInfo,
         parsing_method: str = "standard",
-        ocr_confidence: str = None
+        ocr_confidence: str = None,
+        include_suggestions: bool = True,
+        taxonomy: Optional[Taxonomy] = None
     ) -> Dict[str, Any]:
         """Calculate comprehensive ATS score
         
@@ -66,12 +151,11 @@ class ATSScorer:
             domain: Classified domain
             parsing_method: "standard" | "ocr" | "ocr_unavailable"
             ocr_confidence: "low" | "medium" | "high" (only when OCR used)
+            include_suggestions: False for the fast tier, which skips suggestions
+            taxonomy: Taxonomy pinned for this request (default: the current one)
         """
-        
-        # OCR adjustment factors (reduce strictness for OCR text)
+        taxonomy = taxonomy or self.store.current()
         is_ocr = parsing_method == "ocr"
-        ocr_penalty_reduction = 0.7 if is_ocr else 1.0  # Reduce penalties by 30% for OCR
-        ocr_min_score_floor = 25 if is_ocr else 0  # Minimum score floor for OCR
         
         raw_text = parsed_data.get('raw_text', '')
         sections = parsed_data.get('sections', {})
@@ -79,56 +163,21 @@ class ATSScorer:
         candidate = parsed_data.get('candidate', {})
         experience = parsed_data.get('experience', {})
         projects = parsed_data.get('projects', [])
+        stats = TextStats(raw_text)
         
         # Calculate individual scores
-        keyword_score = self._calculate_keyword_score(raw_text, domain.primary)
-        section_score = self._calculate_section_score(sections, candidate)
-        formatting_score = self._calculate_formatting_score(
-            formatting, raw_text, is_ocr=is_ocr, penalty_factor=ocr_penalty_reduction
-        )
-        skill_score = self._calculate_skill_score(skills)
-        experience_score = self._calculate_experience_score(experience)
-        project_score = self._calculate_project_score(projects)
-        
-        # Create breakdown
-        breakdown = ScoreBreakdown(
-            keyword_relevance=keyword_score,
-            section_completeness=section_score,
-            formatting_score=formatting_score,
-            skill_relevance=skill_score,
-            experience_clarity=experience_score,
-            project_impact=project_score
+        features = self._extract_features(
+            stats, formatting, sections, candidate, skills, domain.primary,
+            experience, projects, is_ocr, taxonomy
         )
-        
-        # Calculate weighted final score
-        weights = {
-            'keyword_relevance': 0.20,
-            'section_completeness': 0.20,
-            'formatting_score': 0.15,
-            'skill_relevance': 0.20,
-            'experience_clarity': 0.15,
-            'project_impact': 0.10
-        }
-        
-        final_score = int(
-            keyword_score * weights['keyword_relevance'] +
-            section_score * weights['section_completeness'] +
-            formatting_score * weights['formatting_score'] +
-            skill_score * weights['skill_relevance'] +
-            experience_score * weights['experience_clarity'] +
-            project_score * weights['project_impact']
-        )
-        
-        # Apply OCR minimum score floor
-        if is_ocr and final_score < ocr_min_score_floor:
-            final_score = ocr_min_score_floor
+        final_score, breakdown = self.score_features(features, taxonomy)
         
         # Determine category
         category = self._get_score_category(final_score)
         
         # Identify issues
         issues = self._identify_issues(
-            raw_text, sections, formatting, 
+            raw_text, stats, sections, formatting,
             skills, candidate, experience
         )
         
@@ -143,36 +192,162 @@ class ATSScorer:
             issues.insert(0, ocr_notice)
         
         # Generate suggestions
-        suggestions = self._generate_suggestions(
-            raw_text, domain.primary, skills, 
-            sections, experience, projects
-        )
+        suggestions = []
+        if include_suggestions:
+            suggestions = self._generate_suggestions(
+                raw_text, stats, domain.primary, skills, 
+                sections, experience, projects, taxonomy
+            )
         
         # Keywords analysis
-        keywords_analysis = self._analyze_keywords(raw_text, domain.primary)
+        keywords_analysis = self._analyze_keywords(stats, domain.primary, taxonomy)
         
+        tracing.set_attributes(**{
+            "parsing_method": parsing_method,
+            "ats.score": final_score,
+            "ats.suggestions": include_suggestions,
+        })
         return {
             'score': final_score,
             'breakdown': breakdown,
             'category': category,
             'issues': issues,
             'suggestions': suggestions,
-            'keywords_analysis': keywords_analysis
+            'keywords_analysis': keywords_analysis,
+            'features': features
         }
     
-    def _calculate_keyword_score(self, text: str, domain: str) -> int:
+    def score_features(
+        self,
+        features: ScoreFeatures,
+        taxonomy: Optional[Taxonomy] = None,
+        base: Optional[Tuple[ScoreFeatures, ScoreBreakdown]] = None
+    ) -> Tuple[int, ScoreBreakdown]:
+        """Final score and breakdown of a resume's score features
+        
+        Args:
+            features: Score features of the resume
+            taxonomy: Taxonomy the features were extracted with
+            base: Features and breakdown of an earlier evaluation; only the
+                components reading a feature that differs are re-evaluated
+        """
+        taxonomy = taxonomy or self.store.current()
+        calculators = {
+            'keyword_relevance': lambda: self._calculate_keyword_score(features, taxonomy),
+            'section_completeness': lambda: self._calculate_section_score(features),
+            'formatting_score': lambda: self._calculate_formatting_score(features),
+            'skill_relevance': lambda: self._calculate_skill_score(features),
+            'experience_clarity': lambda: self._calculate_experience_score(features),
+            'project_impact': lambda: self._calculate_project_score(features)
+        }
+        scores = {}
+        for component, names in self.COMPONENT_FEATURES.items():
+            if base is not None and all(getattr(features, n) == getattr(base[0], n) for n in names):
+                scores[component] = getattr(base[1], component)
+            else:
+                scores[component] = calculators[component]()
+        
+        # Calculate weighted final score
+        final_score = int(sum(scores[component] * weight for component, weight in self.WEIGHTS.items()))
+        
+        # Minimum score floor for OCR
+        if features.is_ocr and final_score < 25:
+            final_score = 25
+        
+        return final_score, ScoreBreakdown(**scores)
+    
+    def edited_features(
+        self,
+        features: ScoreFeatures,
+        text: str,
+        added_text: str,
+        sections: Dict[str, str],
+        skills: SkillsData,
+        domain: str,
+        experience: Any,
+        projects: List,
+        taxonomy: Optional[Taxonomy] = None
+    ) -> ScoreFeatures:
+        """Score features after an edit that inserts whole lines into a resume
+        
+        Text statistics and keyword phrases are updated from the inserted
+        lines alone (no phrase spans a line break); the whole text is only
+        scanned when the edit changes the domain, and with it the keywords.
+        
+        Args:
+            features: Score features before the edit
+            text: The edited text
+            added_text: The inserted lines
+            sections: Contents of the sections the edit changed or added
+            skills, domain, experience, projects: Results for the edited text
+            taxonomy: Taxonomy the features were extracted with
+        """
+        taxonomy = taxonomy or self.store.current()
+        added = TextStats(added_text)
+        if domain == features.domain:
+            phrases = features.phrases.union(self._present_phrases(added.lower, domain, taxonomy))
+        else:
+            phrases = self._present_phrases(text.lower(), domain, taxonomy)
+        section_lengths = dict(features.section_lengths)
+        section_lengths.update((section, len(content.strip())) for section, content in sections.items())
+        return features.replace(
+            domain=domain,
+            phrases=phrases,
+            section_lengths=section_lengths,
+            word_count=features.word_count + added.word_count,
+            char_counts={char: count + added.char_counts[char] for char, count in features.char_counts.items()},
+            **self._skill_features(skills),
+            **self._result_features(experience, projects)
+        )
+    
+    def _extract_features(
+        self, stats: TextStats, formatting: Dict, sections: Dict, candidate: Any,
+        skills: SkillsData, domain: str, experience: Any, projects: List,
+        is_ocr: bool, taxonomy: Taxonomy
+    ) -> ScoreFeatures:
+        """Score features of a parsed resume"""
+        return ScoreFeatures(
+            domain=domain,
+            phrases=self._present_phrases(stats.lower, domain, taxonomy),
+            section_lengths={section: len(content.strip()) for section, content in sections.items()},
+            has_email=bool(_field(candidate, 'email')),
+            has_phone=bool(_field(candidate, 'phone')),
+            has_tables=bool(formatting.get('has_tables')),
+            has_images=bool(formatting.get('has_images')),
+            is_ocr=is_ocr,
+            word_count=formatting.get('word_count', stats.word_count),
+            char_counts=dict(stats.char_counts),
+            **self._skill_features(skills),
+            **self._result_features(experience, projects)
+        )
+    
+    def _present_phrases(self, text_lower: str, domain: str, taxonomy: Taxonomy) -> List[str]:
+        """Phrases the keyword score checks for in a domain that occur in the text"""
+        keywords = taxonomy.ats_keywords.get(domain, taxonomy.ats_keywords['General'])
+        return [phrase for phrase in keywords + self.ACTION_VERBS if phrase in text_lower]
+    
+    def _skill_features(self, skills: SkillsData) -> Dict[str, Any]:
+        return {
+            'skill_total': skills.total_count,
+            'skill_counts': {category: len(getattr(skills, category)) for category in self.SKILL_CATEGORIES}
+        }
+    
+    def _result_features(self, experience: Any, projects: List) -> Dict[str, Any]:
+        return {
+            'positions': len(_field(experience, 'positions', None) or []) if experience else 0,
+            'experience_quality': _field(experience, 'overall_quality', 0) if experience else 0,
+            'project_scores': [_field(project, 'score', 0) for project in (projects or [])[:5]]
+        }
+    
+    def _calculate_keyword_score(self, features: ScoreFeatures, taxonomy: Taxonomy) -> int:
         """Score based on keyword presence and relevance"""
-        text_lower = text.lower()
-        keywords = self.DOMAIN_KEYWORDS.get(domain, self.DOMAIN_KEYWORDS['General'])
+        phrases = features.phrases
+        keywords = taxonomy.ats_keywords.get(features.domain, taxonomy.ats_keywords['General'])
         
-        found = sum(1 for kw in keywords if kw in text_lower)
+        found = sum(1 for kw in keywords if kw in phrases)
         
         # Also check for general action verbs
-        action_verbs = [
-            'achieved', 'built', 'created', 'delivered', 'enhanced',
-            'generated', 'improved', 'launched', 'managed', 'optimized'
-        ]
-        verb_count = sum(1 for v in action_verbs if v in text_lower)
+        verb_count = sum(1 for v in self.ACTION_VERBS if v in phrases)
         
         keyword_ratio = found / len(keywords)
         verb_ratio = min(1.0, verb_count / 5)
@@ -180,57 +355,50 @@ class ATSScorer:
         score = int((keyword_ratio * 60) + (verb_ratio * 40))
         return min(100, score)
     
-    def _calculate_section_score(self, sections: Dict, candidate: Any) -> int:
+    def _calculate_section_score(self, features: ScoreFeatures) -> int:
         """Score based on section completeness"""
         score = 0
+        lengths = features.section_lengths
         
         # Required sections (60 points)
         for section in self.REQUIRED_SECTIONS:
-            if section in sections and len(sections[section].strip()) > 50:
+            if lengths.get(section, 0) > 50:
                 score += 20
         
         # Contact info (20 points)
-        candidate_dict = candidate.dict() if hasattr(candidate, 'dict') else candidate
-        if candidate_dict.get('email'):
+        if features.has_email:
             score += 10
-        if candidate_dict.get('phone'):
+        if features.has_phone:
             score += 10
         
         # Recommended sections (20 points)
         for section in self.RECOMMENDED_SECTIONS:
-            if section in sections and len(sections[section].strip()) > 20:
+            if lengths.get(section, 0) > 20:
                 score += 7
         
         return min(100, score)
     
-    def _calculate_formatting_score(
-        self, 
-        formatting: Dict, 
-        text: str,
-        is_ocr: bool = False,
-        penalty_factor: float = 1.0
-    ) -> int:
+    def _calculate_formatting_score(self, features: ScoreFeatures) -> int:
         """Score based on formatting quality
         
-        Args:
-            formatting: Formatting metadata
-            text: Raw resume text
-            is_ocr: Whether text was extracted via OCR
-            penalty_factor: Multiplier for penalties (reduced for OCR)
+        OCR text is scored more leniently: penalties are reduced by 30%
+        and checks that OCR itself distorts are relaxed or skipped.
         """
+        is_ocr = features.is_ocr
+        penalty_factor = 0.7 if is_ocr else 1.0
         score = 100
         
         # Penalize for tables (reduced for OCR since detection may be inaccurate)
-        if formatting.get('has_tables'):
+        if features.has_tables:
             score -= int(15 * penalty_factor)
         
         # Penalize for images (reduced for OCR)
-        if formatting.get('has_images'):
+        if features.has_images:
             score -= int(10 * penalty_factor)
         
         # Check word count (too short or too long)
         # More lenient for OCR since extraction may miss some text
-        word_count = formatting.get('word_count', len(text.split()))
+        word_count = features.word_count
         min_words = 150 if is_ocr else 200
         if word_count < min_words:
             score -= int(20 * penalty_factor)
@@ -239,7 +407,7 @@ class ATSScorer:
         
         # Check for good structure (bullet points)
         # More lenient for OCR since bullet detection may fail
-        bullet_count = text.count('•') + text.count('●') + text.count('-')
+        bullet_count = sum(features.char_counts[char] for char in BULLET_CHARS)
         min_bullets = 3 if is_ocr else 5
         if bullet_count < min_bullets:
             score -= int(10 * penalty_factor)
@@ -249,50 +417,44 @@ class ATSScorer:
         # Check for special characters that might cause issues
         # Skip this check for OCR since it introduces artifacts
         if not is_ocr:
-            special_chars = ['→', '★', '☆', '✓', '✔', '✗', '❖', '◆']
-            for char in special_chars:
-                if char in text:
-                    score -= 3
+            score -= 3 * sum(1 for char in SPECIAL_CHARS if features.char_counts[char])
         
         return max(0, min(100, score))
     
-    def _calculate_skill_score(self, skills: SkillsData) -> int:
+    def _calculate_skill_score(self, features: ScoreFeatures) -> int:
         """Score based on skills quality"""
         score = 0
+        counts = features.skill_counts
         
         # Base score on skill count
-        if skills.total_count >= 15:
+        if features.skill_total >= 15:
             score += 40
-        elif skills.total_count >= 10:
+        elif features.skill_total >= 10:
             score += 30
-        elif skills.total_count >= 5:
+        elif features.skill_total >= 5:
             score += 20
         else:
             score += 10
         
         # Bonus for technical skills
-        if skills.programming_languages:
+        if counts['programming_languages']:
             score += 15
-        if skills.frameworks:
+        if counts['frameworks']:
             score += 15
-        if skills.tools:
+        if counts['tools']:
             score += 10
-        if skills.databases:
+        if counts['databases']:
             score += 10
         
         # Bonus for soft skills
-        if skills.soft_skills:
+        if counts['soft_skills']:
             score += 10
         
         return min(100, score)
     
-    def _calculate_experience_score(self, experience: Any) -> int:
+    def _calculate_experience_score(self, features: ScoreFeatures) -> int:
         """Score based on experience quality"""
-        if not experience:
-            return 30
-        
-        exp_dict = experience.dict() if hasattr(experience, 'dict') else experience
-        positions = exp_dict.get('positions', [])
+        positions = features.positions
         
         if not positions:
             return 30
@@ -300,30 +462,27 @@ class ATSScorer:
         score = 30  # Base score
         
         # Score for number of positions
-        if len(positions) >= 3:
+        if positions >= 3:
             score += 20
-        elif len(positions) >= 2:
+        elif positions >= 2:
             score += 15
         else:
             score += 10
         
         # Score for bullet quality
-        avg_quality = exp_dict.get('overall_quality', 0)
-        score += int(avg_quality * 0.5)
+        score += int(features.experience_quality * 0.5)
         
         return min(100, score)
     
-    def _calculate_project_score(self, projects: List) -> int:
+    def _calculate_project_score(self, features: ScoreFeatures) -> int:
         """Score based on projects quality"""
-        if not projects:
+        if not features.project_scores:
             return 40  # No projects is not terrible
         
         score = 50  # Base score for having projects
         
-        # Score based on project count and quality
-        for project in projects[:5]:
-            project_dict = project.dict() if hasattr(project, 'dict') else project
-            project_score = project_dict.get('score', 0)
+        # Score based on quality of the first five projects
+        for project_score in features.project_scores:
             score += project_score * 0.1
         
         return min(100, int(score))
@@ -340,7 +499,7 @@ class ATSScorer:
             return 'Poor'
     
     def _identify_issues(
-        self, text: str, sections: Dict, formatting: Dict,
+        self, text: str, stats: TextStats, sections: Dict, formatting: Dict,
         skills: SkillsData, candidate: Any, experience: Any
     ) -> List[ATSIssue]:
         """Identify ATS compatibility issues"""
@@ -416,10 +575,9 @@ class ATSScorer:
             ))
         
         # Content issues
-        text_lower = text.lower()
-        word_count = len(text.split())
+        text_lower = stats.lower
         
-        if word_count < 200:
+        if stats.word_count < 200:
             issues.append(ATSIssue(
                 type='content',
                 severity='High',
@@ -454,15 +612,15 @@ class ATSScorer:
         return issues
     
     def _generate_suggestions(
-        self, text: str, domain: str, skills: SkillsData,
-        sections: Dict, experience: Any, projects: List
+        self, text: str, stats: TextStats, domain: str, skills: SkillsData,
+        sections: Dict, experience: Any, projects: List, taxonomy: Taxonomy
     ) -> List[Suggestion]:
         """Generate improvement suggestions"""
         suggestions = []
-        text_lower = text.lower()
+        text_lower = stats.lower
         
         # Skill suggestions
-        missing_skills = self._get_missing_skills(skills, domain)
+        missing_skills = self._get_missing_skills(skills, domain, taxonomy)
         if missing_skills:
             suggestions.append(Suggestion(
                 category='Skills',
@@ -522,7 +680,7 @@ class ATSScorer:
             ))
         
         # Keywords suggestions
-        domain_keywords = self.DOMAIN_KEYWORDS.get(domain, self.DOMAIN_KEYWORDS['General'])
+        domain_keywords = taxonomy.ats_keywords.get(domain, taxonomy.ats_keywords['General'])
         missing_keywords = [kw for kw in domain_keywords if kw not in text_lower][:5]
         if missing_keywords:
             suggestions.append(Suggestion(
@@ -535,40 +693,26 @@ class ATSScorer:
         
         return suggestions
     
-    def _get_missing_skills(self, skills: SkillsData, domain: str) -> List[str]:
+    def _get_missing_skills(self, skills: SkillsData, domain: str, taxonomy: Taxonomy) -> List[str]:
         """Get skills that are commonly required but missing"""
-        domain_skills = {
-            'Software / IT': ['Python', 'JavaScript', 'React', 'AWS', 'Docker', 'Git', 'SQL', 'REST API'],
-            'Data / AI': ['Python', 'SQL', 'TensorFlow', 'Pandas', 'Machine Learning', 'Statistics', 'Tableau'],
-            'Marketing': ['Google Analytics', 'SEO', 'Content Strategy', 'HubSpot', 'Social Media Marketing'],
-            'Finance': ['Excel', 'Financial Modeling', 'SQL', 'Power BI', 'Risk Analysis'],
-            'Design': ['Figma', 'Adobe XD', 'User Research', 'Prototyping', 'Design Systems'],
-            'HR': ['Workday', 'ATS', 'Recruiting', 'Employee Relations', 'HRIS'],
-            'Sales': ['Salesforce', 'CRM', 'Pipeline Management', 'Negotiation', 'Cold Calling']
-        }
-        
-        required = domain_skills.get(domain, domain_skills['Software / IT'])
-        current = set(
-            s.lower() for s in 
-            skills.programming_languages + skills.frameworks + 
-            skills.tools + skills.databases + skills.soft_skills
-        )
-        
-        missing = [s for s in required if s.lower() not in current]
-        return missing
+        tables = taxonomy.ats_skill_tables
+        entries, _ = tables.get(domain, tables['Software / IT'])
+        vocabulary = taxonomy.vocabulary
+        current_bits = vocabulary.skills_bits(skills)
+        return vocabulary.select(entries, current_bits, present=False)
     
-    def _analyze_keywords(self, text: str, domain: str) -> KeywordsAnalysis:
+    def _analyze_keywords(self, stats: TextStats, domain: str, taxonomy: Taxonomy) -> KeywordsAnalysis:
         """Analyze keyword presence and recommendations"""
-        text_lower = text.lower()
+        text_lower = stats.lower
         
         # Get domain keywords
-        domain_keywords = self.DOMAIN_KEYWORDS.get(domain, self.DOMAIN_KEYWORDS['General'])
+        domain_keywords = taxonomy.ats_keywords.get(domain, taxonomy.ats_keywords['General'])
         
         found = [kw for kw in domain_keywords if kw in text_lower]
         missing = [kw for kw in domain_keywords if kw not in text_lower]
         
         # Recommended keywords from other domains that might be relevant
-        general_keywords = self.DOMAIN_KEYWORDS['General']
+        general_keywords = taxonomy.ats_keywords['General']
         recommended = [kw for kw in general_keywords if kw not in text_lower and kw not in missing]
         
         return KeywordsAnalysis(
@@ -0,0 +1,95 @@
+"""
+Job Matcher Service - Scores one resume against a batch of job postings
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+from app.services.skill_vocabulary import SkillVocabulary, popcount
+from app.services.taxonomy import TaxonomyStore, taxonomy_store
+from lib.metrics import CACHE_LOOKUPS
+
+
+class JobMatcher:
+    """Rank job postings by skill overlap with a resume
+
+    Each posting is reduced to a skill bitset over the shared vocabulary;
+    resume/job overlap is then an AND plus a popcount per job. Posting
+    bitsets are cached by content hash, since the same cached LinkedIn and
+    Indeed results are matched against many resumes. The cache is dropped
+    when the taxonomy is reloaded, since skill ids may change.
+    """
+
+    MAX_CACHED_JOBS = 5000
+
+    def __init__(self, store: TaxonomyStore = taxonomy_store):
+        self.store = store
+        self._job_bits: "OrderedDict[str, int]" = OrderedDict()
+        self._cached_vocabulary: Optional[SkillVocabulary] = None
+        self._lock = threading.Lock()
+
+    def job_bits(self, text: str, vocabulary: SkillVocabulary) -> int:
+        """Skill bitset for a posting's text (cached by content hash)"""
+        key = hashlib.sha1(text.encode("utf-8")).hexdigest()
+        with self._lock:
+            if vocabulary is not self._cached_vocabulary:
+                self._job_bits.clear()
+                self._cached_vocabulary = vocabulary
+            bits = self._job_bits.get(key)
+            if bits is not None:
+                self._job_bits.move_to_end(key)
+                CACHE_LOOKUPS.inc("job_bits", "hit")
+                return bits
+        CACHE_LOOKUPS.inc("job_bits", "miss")
+        bits = vocabulary.extract_bits(text)
+        with self._lock:
+            if vocabulary is not self._cached_vocabulary:
+                return bits
+            self._job_bits[key] = bits
+            while len(self._job_bits) > self.MAX_CACHED_JOBS:
+                self._job_bits.popitem(last=False)
+        return bits
+
+    def rank(self, resume_text: str, jobs: List[Dict], top_k: Optional[int] = None) -> Dict:
+        """Score every job in the batch and return them best-first
+
+        Args:
+            resume_text: Plain resume text
+            jobs: Dicts with optional id and title, and a description
+            top_k: Return only the best `top_k` jobs (default: all)
+
+        Returns:
+            Dict with ranked jobs and the resume's detected skills
+        """
+        vocabulary = self.store.current().vocabulary
+        resume_bits = vocabulary.extract_bits(resume_text)
+
+        scored = []
+        for index, job in enumerate(jobs):
+            text = f"{job.get('title') or ''}\n{job.get('description') or ''}"
+            bits = self.job_bits(text, vocabulary)
+            required = popcount(bits)
+            overlap = bits & resume_bits
+            score = round(100.0 * popcount(overlap) / required, 1) if required else 0.0
+            scored.append((score, popcount(overlap), index, bits, overlap))
+
+        scored.sort(key=lambda x: (-x[0], -x[1], x[2]))
+        if top_k is not None:
+            scored = scored[:top_k]
+
+        decode = vocabulary.decode
+        return {
+            "jobs": [
+                {
+                    "id": jobs[index].get("id"),
+                    "title": jobs[index].get("title"),
+                    "match_score": score,
+                    "matched_skills": decode(overlap),
+                    "missing_skills": decode(bits & ~resume_bits),
+                }
+                for score, _, index, bits, overlap in scored
+            ],
+            "total_jobs": len(jobs),
+            "resume_skills": decode(resume_bits),
+        }
@@ -0,0 +1,224 @@
+"""
+Job Queue Service - SQLite-backed queue for asynchronous resume analysis
+"""
+import json
+import os
+import sqlite3
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Any, Dict, Optional
+
+_SERVICE_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Queue database and uploaded files waiting to be analyzed
+JOB_DATA_DIR = os.environ.get("JOB_DATA_DIR", os.path.join(_SERVICE_ROOT, "var", "jobs"))
+JOB_DB_PATH = os.environ.get("JOB_DB_PATH", os.path.join(JOB_DATA_DIR, "jobs.sqlite3"))
+# A claimed job whose worker has not finished it within the lease is handed
+# to another worker (the first one is presumed dead); keep it above the
+# slowest tier's deadline plus the parse sandbox timeout
+LEASE_SECONDS = float(os.environ.get("JOB_LEASE_SECONDS", 180))
+MAX_ATTEMPTS = int(os.environ.get("JOB_MAX_ATTEMPTS", 3))
+RETRY_BASE_SECONDS = float(os.environ.get("JOB_RETRY_BASE_SECONDS", 5))
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    status TEXT NOT NULL,
+    file_path TEXT,
+    file_ext TEXT,
+    options TEXT NOT NULL DEFAULT '{}',
+    callback_url TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL,
+    available_at REAL NOT NULL,
+    lease_expires_at REAL,
+    worker TEXT,
+    result TEXT,
+    error TEXT,
+    callback_status TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    finished_at REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_ready ON jobs (status, available_at);
+"""
+
+
+class JobQueue:
+    """Durable job queue shared by the API processes and the worker pool
+
+    Every state change is a single SQLite transaction, so jobs survive
+    restarts of either side: queued jobs stay queued, and running jobs whose
+    worker died are reclaimed once their lease expires. Failures are retried
+    with exponential backoff up to `max_attempts`.
+    """
+
+    def __init__(self, db_path: str = JOB_DB_PATH):
+        self.db_path = db_path
+        self._initialized = False
+
+    @contextmanager
+    def _connect(self):
+        # A connection per call: used from the threadpool and from several processes.
+        # Autocommit mode; multi-statement changes use explicit transactions.
+        if not self._initialized:
+            os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            if not self._initialized:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.executescript(_SCHEMA)
+                self._initialized = True
+            yield conn
+        except BaseException:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    def file_path_for(self, job_id: str, file_ext: str) -> str:
+        """Where a job's upload is kept until the job finishes."""
+        directory = os.path.join(os.path.dirname(self.db_path), "files")
+        os.makedirs(directory, exist_ok=True)
+        return os.path.join(directory, job_id + file_ext)
+
+    def new_id(self) -> str:
+        return uuid.uuid4().hex
+
+    def enqueue(
+        self,
+        job_id: str,
+        kind: str,
+        file_path: Optional[str] = None,
+        file_ext: Optional[str] = None,
+        options: Optional[Dict[str, Any]] = None,
+        callback_url: Optional[str] = None,
+        max_attempts: int = MAX_ATTEMPTS
+    ) -> Dict[str, Any]:
+        """Persist a new queued job and return it."""
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO jobs (id, kind, status, file_path, file_ext, options, callback_url,"
+                " max_attempts, available_at, created_at, updated_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (job_id, kind, QUEUED, file_path, file_ext, json.dumps(options or {}),
+                 callback_url, max_attempts, now, now, now)
+            )
+        return self.get(job_id)
+
+    def claim(self, worker: str, lease_seconds: float = LEASE_SECONDS) -> Optional[Dict[str, Any]]:
+        """Lease the oldest runnable job to `worker`, or return None.
+
+        Runnable means queued and past its backoff, or running with an
+        expired lease. A job that has used up its attempts is failed instead.
+        """
+        now = time.time()
+        with self._connect() as conn:
+            while True:
+                conn.execute("BEGIN IMMEDIATE")
+                row = conn.execute(
+                    "SELECT * FROM jobs WHERE (status = ? AND available_at <= ?)"
+                    " OR (status = ? AND lease_expires_at <= ?)"
+                    " ORDER BY created_at LIMIT 1",
+                    (QUEUED, now, RUNNING, now)
+                ).fetchone()
+                if row is None:
+                    conn.execute("COMMIT")
+                    return None
+                if row["attempts"] >= row["max_attempts"]:
+                    # Its last attempt's worker died mid-job
+                    self._finish(conn, row["id"], FAILED, error="Worker lost while running the job.")
+                    conn.execute("COMMIT")
+                    continue
+                conn.execute(
+                    "UPDATE jobs SET status = ?, attempts = attempts + 1, worker = ?,"
+                    " lease_expires_at = ?, updated_at = ? WHERE id = ?",
+                    (RUNNING, worker, now + lease_seconds, now, row["id"])
+                )
+                conn.execute("COMMIT")
+                return self._job(conn.execute("SELECT * FROM jobs WHERE id = ?", (row["id"],)).fetchone())
+
+    def complete(self, job_id: str, worker: str, result: Dict[str, Any]) -> bool:
+        """Store a job's result; False if the lease was lost to another worker."""
+        with self._connect() as conn:
+            return self._finish(conn, job_id, SUCCEEDED, worker=worker, result=result)
+
+    def fail(self, job_id: str, worker: str, error: str, retry: bool = True) -> Dict[str, Any]:
+        """Record a failed attempt: requeue with backoff, or fail for good."""
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if row is not None and row["worker"] == worker and row["status"] == RUNNING:
+                if retry and row["attempts"] < row["max_attempts"]:
+                    delay = RETRY_BASE_SECONDS * 2 ** (row["attempts"] - 1)
+                    conn.execute(
+                        "UPDATE jobs SET status = ?, available_at = ?, lease_expires_at = NULL,"
+                        " error = ?, updated_at = ? WHERE id = ?",
+                        (QUEUED, now + delay, error, now, job_id)
+                    )
+                else:
+                    self._finish(conn, job_id, FAILED, worker=worker, error=error)
+            conn.execute("COMMIT")
+        return self.get(job_id)
+
+    def set_callback_status(self, job_id: str, status: str) -> None:
+        with self._connect() as conn:
+            conn.execute("UPDATE jobs SET callback_status = ? WHERE id = ?", (status, job_id))
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._connect() as conn:
+            return self._job(conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone())
+
+    def counts(self) -> Dict[str, int]:
+        """Number of jobs per status."""
+        with self._connect() as conn:
+            rows = conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        return {status: count for status, count in rows}
+
+    def _finish(
+        self,
+        conn: sqlite3.Connection,
+        job_id: str,
+        status: str,
+        worker: Optional[str] = None,
+        result: Optional[Dict[str, Any]] = None,
+        error: Optional[str] = None
+    ) -> bool:
+        now = time.time()
+        query = (
+            "UPDATE jobs SET status = ?, result = ?, error = ?, lease_expires_at = NULL,"
+            " updated_at = ?, finished_at = ? WHERE id = ? AND status = ?"
+        )
+        params = [status, json.dumps(result) if result is not None else None, error, now, now, job_id, RUNNING]
+        if worker is not None:
+            query += " AND worker = ?"
+            params.append(worker)
+        updated = conn.execute(query, params).rowcount == 1
+        if updated:
+            path = conn.execute("SELECT file_path FROM jobs WHERE id = ?", (job_id,)).fetchone()[0]
+            if path and os.path.exists(path):
+                os.unlink(path)
+        return updated
+
+    @staticmethod
+    def _job(row: Optional[sqlite3.Row]) -> Optional[Dict[str, Any]]:
+        if row is None:
+            return None
+        job = dict(row)
+        job["options"] = json.loads(job["options"])
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+
+job_queue = JobQueue()
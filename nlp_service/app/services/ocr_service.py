@@ -6,12 +6,16 @@ import re
 import io
 import signal
 import threading
+import contextvars
 from typing import Optional, Tuple, Dict, Any
 from contextlib import contextmanager
 
+from lib import memory_tracking, tracing
+from lib.metrics import OCR_DEGRADED, STAGE_SECONDS
+
 # OCR dependencies - optional imports with fallback
 try:
-    from pdf2image import convert_from_path
+    from pdf2image import convert_from_bytes, convert_from_path
     from PIL import Image, ImageEnhance, ImageFilter
     import pytesseract
     OCR_AVAILABLE = True
@@ -35,6 +39,8 @@ class OCRService:
     - Confidence scoring
     - Hard timeout protection (30 seconds)
     - Max 5 pages to prevent overload
+    - Scales down (page by page, lower DPI, fewer pages) near the soft
+      memory ceiling instead of getting the container OOM-killed
     """
     
     # OCR Quality thresholds
@@ -43,6 +49,8 @@ class OCRService:
     MAX_OCR_PAGES = 5
     OCR_TIMEOUT_SECONDS = 30
     OCR_DPI = 300
+    # Tried in order when a page at OCR_DPI does not fit under the memory ceiling
+    DEGRADED_DPIS = (200, 150)
     
     # Email and phone patterns for quality detection
     EMAIL_PATTERN = r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}'
@@ -78,29 +86,45 @@ class OCRService:
         Returns:
             True if OCR should be attempted
         """
+        return self.ocr_reason(text, email=email, phone=phone) is not None
+    
+    def ocr_reason(
+        self, 
+        text: str, 
+        email: Optional[str] = None, 
+        phone: Optional[str] = None
+    ) -> Optional[str]:
+        """
+        First rule of needs_ocr that triggers OCR for the text
+        
+        Returns:
+            "short_text", "low_word_count", "no_email", "no_phone" or None
+        """
         # Check text length
         if len(text.strip()) < self.MIN_TEXT_LENGTH:
-            return True
+            return "short_text"
         
         # Check word count
         word_count = len(text.split())
         if word_count < self.MIN_WORD_COUNT:
-            return True
+            return "low_word_count"
         
         # Check for email
         if not email and not re.search(self.EMAIL_PATTERN, text):
-            return True
+            return "no_email"
         
         # Check for phone
         if not phone and not re.search(self.PHONE_PATTERN, text):
-            return True
+            return "no_phone"
         
-        return False
+        return None
     
+    @tracing.traced("OCRService.extract_text_with_ocr")
     def extract_text_with_ocr(
         self, 
         pdf_path: str,
-        max_pages: Optional[int] = None
+        max_pages: Optional[int] = None,
+        timeout: Optional[float] = None
     ) -> Tuple[Optional[str], str, str]:
         """
         Extract text from PDF using Tesseract OCR
@@ -108,6 +132,7 @@ class OCRService:
         Args:
             pdf_path: Path to the PDF file
             max_pages: Maximum pages to OCR (default: MAX_OCR_PAGES)
+            timeout: Seconds allowed for OCR (default: OCR_TIMEOUT_SECONDS)
             
         Returns:
             Tuple of (extracted_text, parsing_method, ocr_confidence)
@@ -119,12 +144,19 @@ class OCRService:
             return None, "ocr_unavailable", "low"
         
         max_pages = max_pages or self.MAX_OCR_PAGES
+        plan = self._ocr_plan(max_pages)
+        if plan is None:
+            tracing.set_attributes(**{"ocr.outcome": "memory"})
+            return None, "ocr_unavailable", "low"
+        dpi, page_by_page = plan
+        tracing.set_attributes(**{"ocr.dpi": dpi, "ocr.max_pages": max_pages, "ocr.page_by_page": page_by_page})
         
         try:
             # Run OCR with timeout protection
-            result = self._run_ocr_with_timeout(pdf_path, max_pages)
+            result = self._run_ocr_with_timeout(pdf_path, max_pages, timeout, dpi, page_by_page)
             
             if result is None:
+                tracing.set_attributes(**{"ocr.outcome": "too_many_pages"})
                 return None, "ocr_unavailable", "low"
             
             extracted_text, page_count = result
@@ -135,19 +167,30 @@ class OCRService:
             # Calculate confidence
             confidence = self._calculate_ocr_confidence(cleaned_text)
             
+            tracing.set_attributes(**{
+                "ocr.outcome": "ok",
+                "ocr.page_count": page_count,
+                "ocr.confidence": confidence,
+                "text.length": len(cleaned_text),
+            })
             return cleaned_text, "ocr", confidence
             
         except TimeoutError:
+            tracing.set_attributes(**{"ocr.outcome": "timeout"})
             return None, "ocr_unavailable", "low"
         except Exception as e:
             # Log error but don't crash
             print(f"OCR Error: {str(e)}")
+            tracing.set_attributes(**{"ocr.outcome": "error", "ocr.error": str(e)})
             return None, "ocr_unavailable", "low"
     
     def _run_ocr_with_timeout(
         self, 
         pdf_path: str, 
-        max_pages: int
+        max_pages: int,
+        timeout: Optional[float] = None,
+        dpi: int = OCR_DPI,
+        page_by_page: bool = False
     ) -> Optional[Tuple[str, int]]:
         """
         Run OCR with a hard timeout to prevent hanging
@@ -155,6 +198,9 @@ class OCRService:
         Args:
             pdf_path: Path to PDF
             max_pages: Maximum pages to process
+            timeout: Seconds to wait (default: OCR_TIMEOUT_SECONDS)
+            dpi: Render resolution
+            page_by_page: Render one page at a time instead of all at once
             
         Returns:
             Tuple of (text, page_count) or None if timeout/error
@@ -163,31 +209,37 @@ class OCRService:
         
         def ocr_worker():
             try:
-                # Convert PDF pages to images
-                images = convert_from_path(
-                    pdf_path,
-                    dpi=self.OCR_DPI,
-                    first_page=1,
-                    last_page=max_pages
-                )
-                
-                if len(images) > max_pages:
-                    # PDF has too many pages
-                    result["error"] = "too_many_pages"
-                    return
+                if page_by_page:
+                    images = self._render_pages(pdf_path, max_pages, dpi)
+                else:
+                    # Convert PDF pages to images
+                    with STAGE_SECONDS.time("ocr_render"), memory_tracking.stage("ocr_render"):
+                        images = convert_from_path(
+                            pdf_path,
+                            dpi=dpi,
+                            first_page=1,
+                            last_page=max_pages
+                        )
+                    
+                    if len(images) > max_pages:
+                        # PDF has too many pages
+                        result["error"] = "too_many_pages"
+                        return
+                    images = images[:max_pages]
                 
                 all_text = []
                 
-                for i, image in enumerate(images[:max_pages]):
+                for image in images:
                     # Preprocess image for better OCR
                     processed_image = self._preprocess_image(image)
                     
                     # Run Tesseract OCR
-                    page_text = pytesseract.image_to_string(
-                        processed_image,
-                        lang='eng',
-                        config='--oem 3 --psm 6'
-                    )
+                    with STAGE_SECONDS.time("ocr_recognize"), memory_tracking.stage("ocr_recognize"):
+                        page_text = pytesseract.image_to_string(
+                            processed_image,
+                            lang='eng',
+                            config='--oem 3 --psm 6'
+                        )
                     
                     all_text.append(page_text)
                     
@@ -196,16 +248,16 @@ class OCRService:
                     del image
                 
                 result["text"] = '\n\n'.join(all_text)
-                result["pages"] = len(images)
+                result["pages"] = len(all_text)
                 
             except Exception as e:
                 result["error"] = str(e)
         
-        # Run OCR in a thread with timeout
-        thread = threading.Thread(target=ocr_worker)
+        # Run OCR in a thread with timeout (in this context, so stages count toward the request)
+        thread = threading.Thread(target=contextvars.copy_context().run, args=(ocr_worker,))
         thread.daemon = True
         thread.start()
-        thread.join(timeout=self.OCR_TIMEOUT_SECONDS)
+        thread.join(timeout=min(timeout, self.OCR_TIMEOUT_SECONDS) if timeout is not None else self.OCR_TIMEOUT_SECONDS)
         
         if thread.is_alive():
             # Timeout occurred
@@ -221,6 +273,113 @@ class OCRService:
         
         return result["text"], result["pages"]
     
+    @tracing.traced("OCRService.extract_page_text")
+    def extract_page_text(
+        self,
+        source,
+        page_number: int,
+        timeout: Optional[float] = None
+    ) -> Optional[str]:
+        """
+        OCR a single PDF page (used for per-page OCR in the thorough tier)
+        
+        Args:
+            source: Path to the PDF file, or the raw PDF bytes
+            page_number: 1-based page number
+            timeout: Seconds allowed for this page (default: OCR_TIMEOUT_SECONDS)
+            
+        Returns:
+            Cleaned page text, or None if OCR failed or timed out
+        """
+        if not self.ocr_available:
+            return None
+        plan = self._ocr_plan(1)
+        if plan is None:
+            tracing.set_attributes(**{"ocr.outcome": "memory", "pdf.page_number": page_number})
+            return None
+        dpi = plan[0]
+        tracing.set_attributes(**{"ocr.dpi": dpi, "pdf.page_number": page_number})
+        
+        result = {"text": None}
+        
+        def page_worker():
+            try:
+                convert = convert_from_bytes if isinstance(source, (bytes, bytearray, memoryview)) else convert_from_path
+                with STAGE_SECONDS.time("ocr_render"), memory_tracking.stage("ocr_render"):
+                    images = convert(
+                        bytes(source) if isinstance(source, memoryview) else source,
+                        dpi=dpi,
+                        first_page=page_number,
+                        last_page=page_number
+                    )
+                if images:
+                    processed_image = self._preprocess_image(images[0])
+                    with STAGE_SECONDS.time("ocr_recognize"), memory_tracking.stage("ocr_recognize"):
+                        result["text"] = pytesseract.image_to_string(
+                            processed_image,
+                            lang='eng',
+                            config='--oem 3 --psm 6'
+                        )
+            except Exception as e:
+                print(f"OCR Error (page {page_number}): {str(e)}")
+        
+        thread = threading.Thread(target=contextvars.copy_context().run, args=(page_worker,))
+        thread.daemon = True
+        thread.start()
+        thread.join(timeout=min(timeout, self.OCR_TIMEOUT_SECONDS) if timeout is not None else self.OCR_TIMEOUT_SECONDS)
+        
+        if thread.is_alive() or result["text"] is None:
+            return None
+        return self._clean_ocr_text(result["text"])
+    
+    def _page_bytes(self, dpi: int) -> int:
+        """Memory to OCR one letter-size page at `dpi`: the RGB bitmap plus
+        the grayscale copies made by preprocessing"""
+        return int(8.5 * 11 * dpi * dpi * (3 + 2))
+    
+    def _ocr_plan(self, max_pages: int) -> Optional[Tuple[int, bool]]:
+        """
+        Choose OCR settings that fit under the soft memory ceiling
+        
+        With room for every page at OCR_DPI, pages are rendered together as
+        usual. Otherwise they are rendered one at a time, at the highest DPI
+        whose page still fits.
+        
+        Args:
+            max_pages: Pages that would be OCR'd
+            
+        Returns:
+            Tuple of (dpi, page_by_page), or None when not even one page at
+            the lowest DPI fits and OCR should be skipped
+        """
+        headroom = memory_tracking.headroom_bytes()
+        if headroom is None or headroom >= self._page_bytes(self.OCR_DPI) * max_pages:
+            return self.OCR_DPI, False
+        for dpi in (self.OCR_DPI,) + self.DEGRADED_DPIS:
+            if self._page_bytes(dpi) <= headroom:
+                OCR_DEGRADED.inc("page_by_page" if dpi == self.OCR_DPI else "lower_dpi")
+                return dpi, max_pages > 1
+        OCR_DEGRADED.inc("skipped")
+        return None
+    
+    def _render_pages(self, pdf_path: str, max_pages: int, dpi: int):
+        """
+        Render PDF pages one at a time, so only one bitmap is alive
+        
+        Stops early (fewer pages) when the next page would no longer fit
+        under the soft memory ceiling.
+        """
+        page_count = min(self.get_pdf_page_count(pdf_path), max_pages)
+        for page_number in range(1, page_count + 1):
+            headroom = memory_tracking.headroom_bytes()
+            if page_number > 1 and headroom is not None and headroom < self._page_bytes(dpi):
+                OCR_DEGRADED.inc("fewer_pages")
+                return
+            with STAGE_SECONDS.time("ocr_render"), memory_tracking.stage("ocr_render"):
+                images = convert_from_path(pdf_path, dpi=dpi, first_page=page_number, last_page=page_number)
+            if images:
+                yield images[0]
+    
     def _preprocess_image(self, image: 'Image.Image') -> 'Image.Image':
         """
         Preprocess image for better OCR accuracy
@@ -1,12 +1,28 @@
 """
 Resume Parser Service - Extracts text and structured data from PDF/DOCX
 """
+import hashlib
 import re
-from pypdf import PdfReader
-from docx import Document
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 from app.models.schemas import CandidateInfo, Project, Experience, ExperienceSummary, Education
-from app.services.ocr_service import ocr_service
+from lib.analysis_modes import ANALYSIS_MODES, DEFAULT_MODE, Deadline
+from contextlib import contextmanager
+from lib import memory_tracking, tracing
+from lib.metrics import OCR_TRIGGERS, STAGE_SECONDS
+from lib.pdf_utils import detect_column_split, reflow_columns
+from lib.sandbox import TIMEOUT_SECONDS as PARSE_TIMEOUT_SECONDS, run_sandboxed
+
+
+def text_hash(text: str) -> str:
+    """Stable digest of a text, for spotting unchanged sections between parses"""
+    return hashlib.sha256(text.encode('utf-8', 'surrogatepass')).hexdigest()
+
+
+@contextmanager
+def _stage(name: str):
+    """Time, trace and memory-account one extraction step as stage `name`"""
+    with STAGE_SECONDS.time(name), tracing.span(f"ResumeParser.{name}"), memory_tracking.stage(name):
+        yield
 
 
 class ResumeParser:
@@ -17,6 +33,9 @@ class ResumeParser:
     PARSING_OCR = "ocr"
     PARSING_OCR_UNAVAILABLE = "ocr_unavailable"
     
+    # Pages with less native text than this are OCR'd in the thorough tier
+    MIN_PAGE_TEXT_LENGTH = 100
+    
     # Regex patterns
     EMAIL_PATTERN = r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}'
     PHONE_PATTERN = r'(?:\+?1[-.\s]?)?(?:\(?\d{3}\)?[-.\s]?)?\d{3}[-.\s]?\d{4}|\+\d{1,3}[-.\s]?\d{6,14}'
@@ -33,6 +52,12 @@ class ResumeParser:
         'certifications': ['certifications', 'certificates', 'credentials', 'licenses'],
         'summary': ['summary', 'profile', 'objective', 'about', 'professional summary', 'career objective']
     }
+    # Every header, and every "header:" / "header " prefix, for a quick rejection of ordinary lines
+    _HEADERS = frozenset(h for headers in SECTION_HEADERS.values() for h in headers)
+    _HEADER_PREFIXES = tuple(h + sep for headers in SECTION_HEADERS.values() for h in headers for sep in (':', ' '))
+    
+    # Section extractors, whose results a parse of edited text can reuse
+    SECTION_EXTRACTORS = ('experience', 'projects', 'education')
     
     # Action verbs for experience analysis
     ACTION_VERBS = [
@@ -46,58 +71,256 @@ class ResumeParser:
         'spearheaded', 'streamlined', 'supervised', 'transformed', 'upgraded'
     ]
     
-    def parse(self, file_path: str, file_ext: str) -> Dict[str, Any]:
-        """Main parsing method with OCR fallback for scanned PDFs"""
-        # Initialize parsing metadata
-        parsing_method = self.PARSING_STANDARD
-        ocr_confidence = None
+    @tracing.traced("ResumeParser.parse")
+    def parse(
+        self,
+        file_path: str,
+        file_ext: str,
+        mode: str = DEFAULT_MODE,
+        deadline: Optional[Deadline] = None,
+        defer_ocr: bool = False
+    ) -> Dict[str, Any]:
+        """Main parsing method with OCR fallback for scanned PDFs
         
-        # Extract raw text
-        if file_ext == '.pdf':
-            raw_text = self._extract_pdf_text(file_path)
-            has_tables = self._check_pdf_tables(file_path)
-            has_images = self._check_pdf_images(file_path)
-            
-            # Check if we need OCR fallback (only for PDFs)
-            raw_text, parsing_method, ocr_confidence = self._apply_ocr_if_needed(
-                file_path, raw_text
-            )
-        else:
-            # DOCX files are always text-based, never OCR
-            raw_text = self._extract_docx_text(file_path)
-            has_tables = self._check_docx_tables(file_path)
-            has_images = self._check_docx_images(file_path)
+        Args:
+            file_path: Path to the uploaded resume
+            file_ext: ".pdf" or ".docx"
+            mode: Analysis tier ("fast" | "balanced" | "thorough")
+            deadline: Shared latency budget; optional stages are skipped once spent
+            defer_ocr: Return the native text even when OCR would replace it,
+                with "ocr_deferred" set so the caller can run OCR later
+        """
+        deadline = deadline or Deadline.for_mode(mode)
+        tracing.set_attributes(**{"file.ext": file_ext, "analysis.mode": mode})
+        
+        # Extract raw text in a resource-limited child process; a pathological
+        # document raises SandboxError instead of hanging or exhausting the worker
+        extracted = run_sandboxed(
+            self._extract_document, file_path, file_ext, mode, deadline, defer_ocr,
+            timeout=deadline.remaining() + PARSE_TIMEOUT_SECONDS
+        )
+        # Stages the child skipped count against this request's tier
+        deadline.skipped[:] = extracted["skipped_stages"]
+        raw_text = extracted["raw_text"]
+        tracing.set_attributes(**{
+            "text.length": len(raw_text),
+            "parsing_method": extracted["parsing_method"],
+            "ocr.confidence": extracted["ocr_confidence"] or "",
+            "ocr.deferred": extracted["ocr_deferred"],
+        })
+        
+        parsed = self.parse_text(raw_text, extracted["has_tables"], extracted["has_images"])
+        parsed.update(
+            parsing_method=extracted["parsing_method"],
+            ocr_confidence=extracted["ocr_confidence"],
+            ocr_deferred=extracted["ocr_deferred"]
+        )
+        return parsed
+    
+    def parse_text(
+        self,
+        raw_text: str,
+        has_tables: bool,
+        has_images: bool,
+        blocks: Optional[List[Tuple[Optional[str], str]]] = None,
+        previous: Optional[Dict[str, Tuple[str, Any]]] = None
+    ) -> Dict[str, Any]:
+        """Sections and structured data of a resume's extracted text
         
-        # Parse sections
-        sections = self._identify_sections(raw_text)
+        Args:
+            raw_text: Document text
+            has_tables, has_images: Formatting flags found during extraction
+            blocks: _split_blocks(raw_text), if already known
+            previous: "extracted" of an earlier parse; a section extractor
+                whose input text hashes the same reuses its result
+        
+        Returns:
+            Parsed data without the extraction metadata (parsing_method etc.);
+            "extracted" maps each of SECTION_EXTRACTORS to (input hash, result)
+        """
+        if blocks is None:
+            blocks = self._split_blocks(raw_text)
+        sections = self.sections_of(blocks)
         
         # Extract structured data
         candidate = self._extract_candidate_info(raw_text)
-        experience = self._extract_experience(raw_text, sections.get('experience', ''))
-        projects = self._extract_projects(raw_text, sections.get('projects', ''))
-        education = self._extract_education(raw_text, sections.get('education', ''))
+        extracted = self.extract_sections(raw_text, sections, previous)
         
         return {
             "raw_text": raw_text,
             "candidate": candidate,
-            "experience": experience,
-            "projects": projects,
-            "education": education,
+            "experience": extracted['experience'][1],
+            "projects": extracted['projects'][1],
+            "education": extracted['education'][1],
             "sections": sections,
+            "blocks": blocks,
+            "extracted": extracted,
             "formatting": {
                 "has_tables": has_tables,
                 "has_images": has_images,
                 "word_count": len(raw_text.split()),
                 "line_count": len(raw_text.split('\n'))
-            },
+            }
+        }
+    
+    def extract_sections(
+        self,
+        raw_text: str,
+        sections: Dict[str, str],
+        previous: Optional[Dict[str, Tuple[str, Any]]] = None
+    ) -> Dict[str, Tuple[str, Any]]:
+        """Results of SECTION_EXTRACTORS, as (input hash, result) by extractor
+        
+        Args:
+            raw_text: Document text
+            sections: sections_of() the document's blocks
+            previous: Results of an earlier call; an extractor whose input
+                text hashes the same reuses its result
+        """
+        extractors = {
+            'experience': self._extract_experience,
+            'projects': self._extract_projects,
+            'education': self._extract_education,
+        }
+        extracted = {}
+        for name in self.SECTION_EXTRACTORS:
+            section = sections.get(name, '')
+            # Each extractor falls back to the whole text without its section
+            digest = text_hash(section or raw_text)
+            if previous and name in previous and previous[name][0] == digest:
+                extracted[name] = previous[name]
+            else:
+                extracted[name] = (digest, extractors[name](raw_text, section))
+        return extracted
+    
+    def _extract_document(
+        self,
+        file_path: str,
+        file_ext: str,
+        mode: str,
+        deadline: Deadline,
+        defer_ocr: bool = False
+    ) -> Dict[str, Any]:
+        """Text and formatting flags of a PDF/DOCX (runs inside the parse sandbox)
+        
+        Returns:
+            Dict with raw_text, has_tables, has_images, parsing_method,
+            ocr_confidence, ocr_deferred and skipped_stages
+        """
+        tier = ANALYSIS_MODES[mode]
+        if defer_ocr:
+            # Per-page OCR is deferred too; the whole-document check below decides
+            tier = dict(tier, page_ocr=False)
+        
+        # Initialize parsing metadata
+        parsing_method = self.PARSING_STANDARD
+        ocr_confidence = None
+        ocr_deferred = False
+        has_tables = False
+        has_images = False
+        
+        # Extract raw text
+        if file_ext == '.pdf':
+            page_ocr_used = False
+            if tier['pdfplumber'] and deadline.allow('pdfplumber'):
+                # Per-page tables and OCR are included in this stage's time
+                with _stage("pdf_extraction"):
+                    raw_text, has_tables, page_ocr_used = self._extract_pdf_text_thorough(
+                        file_path, tier, deadline
+                    )
+                    tracing.set_attributes(**{
+                        "extractor": "pdfplumber", "text.length": len(raw_text), "page_ocr": page_ocr_used
+                    })
+            else:
+                with _stage("pdf_extraction"):
+                    raw_text = self._extract_pdf_text(file_path)
+                    tracing.set_attributes(**{"text.length": len(raw_text)})
+                if tier['tables'] and deadline.allow('tables'):
+                    with _stage("table_check"):
+                        has_tables = self._check_pdf_tables(file_path)
+                        tracing.set_attributes(has_tables=has_tables)
+            if tier['images'] and deadline.allow('images'):
+                with _stage("image_check"):
+                    has_images = self._check_pdf_images(file_path)
+                    tracing.set_attributes(has_images=has_images)
+            
+            if page_ocr_used:
+                parsing_method = self.PARSING_OCR
+                from app.services.ocr_service import ocr_service
+                ocr_confidence = ocr_service._calculate_ocr_confidence(raw_text)
+            elif defer_ocr and tier['ocr']:
+                ocr_deferred = self._ocr_fallback_method(file_path, raw_text)[0] == self.PARSING_OCR
+            elif tier['ocr'] and deadline.allow('ocr'):
+                # Check if we need OCR fallback (only for PDFs)
+                raw_text, parsing_method, ocr_confidence = self._apply_ocr_if_needed(
+                    file_path, raw_text, timeout=deadline.remaining()
+                )
+        else:
+            # DOCX files are always text-based, never OCR
+            with _stage("docx_extraction"):
+                raw_text = self._extract_docx_text(file_path)
+                tracing.set_attributes(**{"text.length": len(raw_text)})
+            if tier['tables']:
+                with _stage("table_check"):
+                    has_tables = self._check_docx_tables(file_path)
+                    tracing.set_attributes(has_tables=has_tables)
+            if tier['images']:
+                with _stage("image_check"):
+                    has_images = self._check_docx_images(file_path)
+                    tracing.set_attributes(has_images=has_images)
+        
+        return {
+            "raw_text": raw_text,
+            "has_tables": has_tables,
+            "has_images": has_images,
             "parsing_method": parsing_method,
-            "ocr_confidence": ocr_confidence
+            "ocr_confidence": ocr_confidence,
+            "ocr_deferred": ocr_deferred,
+            "skipped_stages": deadline.skipped
         }
     
+    def _ocr_fallback_method(self, file_path: str, standard_text: str) -> tuple:
+        """Decision half of _apply_ocr_if_needed: the parsing method it would report
+        
+        PARSING_OCR means OCR would run; PARSING_STANDARD that the native
+        text is kept; PARSING_OCR_UNAVAILABLE that the PDF is too large.
+        
+        Returns:
+            Tuple of (parsing_method, reason): the needs_ocr rule that
+            triggered OCR, or None
+        """
+        # OCR stack (pdf2image, PIL, pytesseract) is heavy; load on demand
+        from app.services.ocr_service import ocr_service
+        
+        # Check if OCR service is available
+        if not ocr_service.is_available():
+            return self.PARSING_STANDARD, None
+        
+        # Quick check for email and phone in standard text
+        email_match = re.search(self.EMAIL_PATTERN, standard_text)
+        phone_match = re.search(self.PHONE_PATTERN, standard_text)
+        
+        # Determine if OCR is needed
+        reason = ocr_service.ocr_reason(
+            standard_text, 
+            email=email_match.group() if email_match else None,
+            phone=phone_match.group() if phone_match else None
+        )
+        if reason is None:
+            # Standard extraction is good enough
+            return self.PARSING_STANDARD, None
+        
+        # Check if PDF is too large for OCR
+        if ocr_service.should_skip_ocr(file_path):
+            # PDF has too many pages, skip OCR
+            return self.PARSING_OCR_UNAVAILABLE, reason
+        return self.PARSING_OCR, reason
+    
     def _apply_ocr_if_needed(
         self, 
         file_path: str, 
-        standard_text: str
+        standard_text: str,
+        timeout: Optional[float] = None
     ) -> tuple:
         """
         Apply OCR fallback if standard extraction is insufficient
@@ -113,35 +336,22 @@ class ResumeParser:
         Args:
             file_path: Path to PDF file
             standard_text: Text extracted via pypdf
+            timeout: Seconds left for OCR in the request's latency budget
             
         Returns:
             Tuple of (text, parsing_method, ocr_confidence)
         """
-        # Check if OCR service is available
-        if not ocr_service.is_available():
-            return standard_text, self.PARSING_STANDARD, None
-        
-        # Quick check for email and phone in standard text
-        email_match = re.search(self.EMAIL_PATTERN, standard_text)
-        phone_match = re.search(self.PHONE_PATTERN, standard_text)
-        
-        # Determine if OCR is needed
-        if not ocr_service.needs_ocr(
-            standard_text, 
-            email=email_match.group() if email_match else None,
-            phone=phone_match.group() if phone_match else None
-        ):
-            # Standard extraction is good enough
-            return standard_text, self.PARSING_STANDARD, None
+        method, reason = self._ocr_fallback_method(file_path, standard_text)
+        if method != self.PARSING_OCR:
+            return standard_text, method, None
+        OCR_TRIGGERS.inc(reason)
+        tracing.set_attributes(**{"ocr.reason": reason})
         
-        # Check if PDF is too large for OCR
-        if ocr_service.should_skip_ocr(file_path):
-            # PDF has too many pages, skip OCR
-            return standard_text, self.PARSING_OCR_UNAVAILABLE, None
+        from app.services.ocr_service import ocr_service
         
         # Attempt OCR extraction
         ocr_text, parsing_method, confidence = ocr_service.extract_text_with_ocr(
-            file_path
+            file_path, timeout=timeout
         )
         
         if ocr_text and parsing_method == self.PARSING_OCR:
@@ -163,7 +373,9 @@ class ResumeParser:
 
         # First try pypdf
         try:
+            from pypdf import PdfReader
             reader = PdfReader(file_path)
+            tracing.set_attributes(**{"pdf.page_count": len(reader.pages), "extractor": "pypdf"})
             for page in reader.pages:
                 page_text = page.extract_text()
                 if page_text:
@@ -183,6 +395,7 @@ class ResumeParser:
 
             parts = []
             with pdfplumber.open(file_path) as pdf:
+                tracing.set_attributes(**{"pdf.page_count": len(pdf.pages), "extractor": "pdfplumber"})
                 for page in pdf.pages:
                     page_text = page.extract_text()
                     if page_text:
@@ -195,10 +408,84 @@ class ResumeParser:
             # If both extractors fail, raise a clear error
             raise Exception(f"Error parsing PDF (pypdf: {parse_error_msg}; pdfplumber: {str(e)})")
     
+    def _extract_pdf_text_thorough(
+        self,
+        file_path: str,
+        tier: Dict[str, Any],
+        deadline: Deadline
+    ) -> tuple:
+        """Thorough-tier PDF extraction: pdfplumber layout analysis per page.
+        
+        Per page, falls back to pdfplumber text where pypdf finds little, reflows
+        multi-column layouts into reading order and OCRs pages that carry
+        no usable text layer.
+        
+        Returns:
+            Tuple of (text, has_tables, page_ocr_used)
+        """
+        import pdfplumber
+        from app.services.ocr_service import ocr_service
+        
+        try:
+            from pypdf import PdfReader
+            reader = PdfReader(file_path)
+            native_pages = [page.extract_text() or "" for page in reader.pages]
+        except Exception:
+            native_pages = []
+        
+        pages = []
+        has_tables = False
+        page_ocr_used = False
+        with pdfplumber.open(file_path) as pdf:
+            tracing.set_attributes(**{"pdf.page_count": len(pdf.pages)})
+            for index, page in enumerate(pdf.pages):
+                text = native_pages[index] if index < len(native_pages) else ""
+                if len(text.strip()) < self.MIN_PAGE_TEXT_LENGTH:
+                    plumber_text = page.extract_text() or ""
+                    if len(plumber_text.strip()) > len(text.strip()):
+                        text = plumber_text
+                
+                if tier['tables'] and not has_tables and deadline.allow('tables'):
+                    try:
+                        tables = page.extract_tables()
+                        has_tables = bool(tables and any(len(t) > 0 for t in tables))
+                    except Exception:
+                        pass
+                
+                if tier['column_reflow'] and deadline.allow('column_reflow'):
+                    words = page.extract_words() or []
+                    split_x = detect_column_split(words)
+                    if split_x is not None:
+                        text = reflow_columns(words, split_x)
+                
+                if (
+                    tier['page_ocr']
+                    and len(text.strip()) < self.MIN_PAGE_TEXT_LENGTH
+                    and ocr_service.is_available()
+                    and deadline.allow('page_ocr')
+                ):
+                    OCR_TRIGGERS.inc("page_without_text")
+                    ocr_text = ocr_service.extract_page_text(
+                        file_path, index + 1, timeout=deadline.remaining()
+                    )
+                    if ocr_text and len(ocr_text.strip()) > len(text.strip()):
+                        text = ocr_text
+                        page_ocr_used = True
+                
+                if text:
+                    pages.append(text)
+        
+        text = "\n".join(pages)
+        if not text.strip():
+            # Nothing usable from the layout pass; fall back to the standard path
+            text = self._extract_pdf_text(file_path)
+        return text, has_tables, page_ocr_used
+    
     def _extract_docx_text(self, file_path: str) -> str:
         """Extract text from DOCX"""
         text = ""
         try:
+            from docx import Document
             doc = Document(file_path)
             for para in doc.paragraphs:
                 text += para.text + "\n"
@@ -217,6 +504,7 @@ class ResumeParser:
         # pypdf doesn't have built-in table detection
         # We'll use a heuristic: check for table-like patterns in text
         try:
+            from pypdf import PdfReader
             reader = PdfReader(file_path)
             for page in reader.pages:
                 text = page.extract_text() or ""
@@ -235,6 +523,7 @@ class ResumeParser:
     def _check_pdf_images(self, file_path: str) -> bool:
         """Check if PDF contains images"""
         try:
+            from pypdf import PdfReader
             reader = PdfReader(file_path)
             for page in reader.pages:
                 if '/XObject' in page.get('/Resources', {}):
@@ -250,6 +539,7 @@ class ResumeParser:
     def _check_docx_tables(self, file_path: str) -> bool:
         """Check if DOCX contains tables"""
         try:
+            from docx import Document
             doc = Document(file_path)
             return len(doc.tables) > 0
         except:
@@ -258,6 +548,7 @@ class ResumeParser:
     def _check_docx_images(self, file_path: str) -> bool:
         """Check if DOCX contains images"""
         try:
+            from docx import Document
             doc = Document(file_path)
             for rel in doc.part.rels.values():
                 if "image" in rel.reltype:
@@ -268,34 +559,116 @@ class ResumeParser:
     
     def _identify_sections(self, text: str) -> Dict[str, str]:
         """Identify and extract resume sections"""
-        sections = {}
-        lines = text.split('\n')
-        current_section = None
-        current_content = []
-        
-        for line in lines:
-            line_lower = line.lower().strip()
-            section_found = None
-            
-            for section_type, headers in self.SECTION_HEADERS.items():
-                for header in headers:
-                    if line_lower == header or line_lower.startswith(header + ':') or line_lower.startswith(header + ' '):
-                        section_found = section_type
-                        break
-                if section_found:
-                    break
-            
-            if section_found:
-                if current_section:
-                    sections[current_section] = '\n'.join(current_content)
-                current_section = section_found
-                current_content = []
-            elif current_section:
-                current_content.append(line)
+        return self.sections_of(self._split_blocks(text))
+    
+    def _section_header(self, line: str) -> Optional[str]:
+        """Section type whose header starts `line`, or None"""
+        line_lower = line.lower().strip()
+        if line_lower not in self._HEADERS and not line_lower.startswith(self._HEADER_PREFIXES):
+            return None
+        for section_type, headers in self.SECTION_HEADERS.items():
+            for header in headers:
+                if line_lower == header or line_lower.startswith(header + ':') or line_lower.startswith(header + ' '):
+                    return section_type
+        return None
+    
+    def _split_blocks(self, text: str) -> List[Tuple[Optional[str], str]]:
+        """Split text into blocks of whole lines, each starting at a section header
         
-        if current_section:
-            sections[current_section] = '\n'.join(current_content)
+        Lines before the first header form a block of section None. Joining
+        the block texts with newlines gives back `text`.
         
+        Returns:
+            List of (section type, block text including its header line)
+        """
+        blocks = []
+        section = None
+        lines = []
+        for line in text.split('\n'):
+            header = self._section_header(line)
+            if header:
+                if lines:
+                    blocks.append((section, '\n'.join(lines)))
+                section = header
+                lines = []
+            lines.append(line)
+        blocks.append((section, '\n'.join(lines)))
+        return blocks
+    
+    def replace_sections(
+        self, blocks: List[Tuple[Optional[str], str]], contents: Dict[str, str]
+    ) -> List[Tuple[Optional[str], str]]:
+        """Blocks of a document with the contents of some sections replaced
+
+        A section's content is everything after its header line; of a
+        repeated section, the last block (the one _identify_sections keeps)
+        is replaced. New content containing a section header changes the
+        document's structure, so the result is then split again.
+
+        Raises:
+            ValueError: Unknown section type, or one the document lacks
+        """
+        blocks = list(blocks)
+        last_block = {section: i for i, (section, _) in enumerate(blocks) if section}
+        resplit = False
+        for section, content in contents.items():
+            if section not in self.SECTION_HEADERS:
+                raise ValueError(
+                    f"Unknown section '{section}'. Sections: {', '.join(self.SECTION_HEADERS)}"
+                )
+            if section not in last_block:
+                raise ValueError(f"The resume has no '{section}' section; send the full text instead.")
+            i = last_block[section]
+            header = blocks[i][1].partition('\n')[0]
+            blocks[i] = (section, f"{header}\n{content}" if content else header)
+            resplit = resplit or any(self._section_header(line) for line in content.split('\n'))
+        if resplit:
+            return self._split_blocks('\n'.join(block for _, block in blocks))
+        return blocks
+
+    def insert_lines(
+        self, blocks: List[Tuple[Optional[str], str]], section: str, lines: str
+    ) -> Tuple[List[Tuple[Optional[str], str]], str]:
+        """Blocks of a document with lines added to the end of a section
+
+        The lines go after the last non-blank line of the section's last
+        block; a section the document lacks is added at its end, under a
+        header line of its own. As with replace_sections, lines containing
+        a section header make the result split again.
+
+        Returns:
+            Tuple of (blocks, the inserted text: the lines, preceded by the
+            new header line when the section was added)
+
+        Raises:
+            ValueError: Unknown section type
+        """
+        if section not in self.SECTION_HEADERS:
+            raise ValueError(
+                f"Unknown section '{section}'. Sections: {', '.join(self.SECTION_HEADERS)}"
+            )
+        blocks = list(blocks)
+        last_block = {name: i for i, (name, _) in enumerate(blocks) if name}
+        if section in last_block:
+            i = last_block[section]
+            block_lines = blocks[i][1].split('\n')
+            end = max(j for j, line in enumerate(block_lines) if j == 0 or line.strip()) + 1
+            blocks[i] = (section, '\n'.join(block_lines[:end] + [lines] + block_lines[end:]))
+            inserted = lines
+        else:
+            inserted = f"{section.title()}\n{lines}"
+            blocks.append((section, inserted))
+        if any(self._section_header(line) for line in lines.split('\n')):
+            return self._split_blocks('\n'.join(block for _, block in blocks)), inserted
+        return blocks, inserted
+
+    @staticmethod
+    def sections_of(blocks: List[Tuple[Optional[str], str]]) -> Dict[str, str]:
+        """Section contents (without header lines); a repeated section keeps its last block"""
+        sections = {}
+        for section, block in blocks:
+            if section:
+                sections[section] = block.partition('\n')[2]
         return sections
     
     def _extract_candidate_info(self, text: str) -> CandidateInfo:
@@ -520,7 +893,7 @@ class ResumeParser:
         
         for entry in entries[:5]:  # Limit to 5 projects
             project = self._parse_project_entry(entry)
-            if project.title:
+            if project:
                 projects.append(project)
         
         return projects
@@ -544,8 +917,8 @@ class ResumeParser:
         
         return entries
     
-    def _parse_project_entry(self, entry: str) -> Project:
-        """Parse a single project entry"""
+    def _parse_project_entry(self, entry: str) -> Optional[Project]:
+        """Parse a single project entry; None if it has no title line"""
         lines = entry.strip().split('\n')
         
         title = None
@@ -569,6 +942,9 @@ class ResumeParser:
                 else:
                     description.append(line)
         
+        if not title:
+            return None
+        
         # Calculate project score
         score = 50  # Base score
         if technologies:
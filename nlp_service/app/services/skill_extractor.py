@@ -1,181 +1,78 @@
 """
 Skill Extractor Service - Identifies and categorizes skills from resume text
 """
-import re
-from typing import Dict, List, Set
+from typing import Dict, List, Optional, Sequence, Tuple
 from app.models.schemas import SkillsData, SkillCategory
+from app.services.skill_vocabulary import SkillVocabulary
+from app.services.taxonomy import Taxonomy, TaxonomyStore, taxonomy_store
+from lib import tracing
 
 
 class SkillExtractor:
     """Extract and categorize skills from resume text"""
     
-    # Comprehensive skill databases
-    PROGRAMMING_LANGUAGES = {
-        'python', 'java', 'javascript', 'typescript', 'c++', 'c#', 'c',
-        'ruby', 'go', 'golang', 'rust', 'swift', 'kotlin', 'scala', 'php',
-        'perl', 'r', 'matlab', 'julia', 'dart', 'lua', 'haskell', 'elixir',
-        'clojure', 'f#', 'objective-c', 'groovy', 'vb.net', 'visual basic',
-        'assembly', 'cobol', 'fortran', 'pascal', 'shell', 'bash', 'powershell',
-        'sql', 'plsql', 'tsql', 'html', 'css', 'sass', 'scss', 'less'
-    }
+    # Skill lists, aliases and per-domain suggestions live in the taxonomy
+    # (app/data/taxonomy.json); see app.services.taxonomy
     
-    FRAMEWORKS = {
-        # Frontend
-        'react', 'reactjs', 'react.js', 'angular', 'angularjs', 'vue', 'vuejs',
-        'vue.js', 'svelte', 'next.js', 'nextjs', 'nuxt', 'nuxtjs', 'gatsby',
-        'ember', 'backbone', 'jquery', 'bootstrap', 'tailwind', 'tailwindcss',
-        'material-ui', 'mui', 'chakra', 'ant design', 'styled-components',
-        # Backend
-        'node.js', 'nodejs', 'express', 'expressjs', 'fastapi', 'django', 'flask',
-        'spring', 'spring boot', 'springboot', '.net', 'asp.net', 'rails',
-        'ruby on rails', 'laravel', 'symfony', 'fastify', 'koa', 'nest',
-        'nestjs', 'hapi', 'gin', 'echo', 'fiber', 'actix', 'rocket',
-        # Mobile
-        'react native', 'flutter', 'ionic', 'xamarin', 'swiftui', 'jetpack compose',
-        # Data/ML
-        'tensorflow', 'pytorch', 'keras', 'scikit-learn', 'sklearn', 'pandas',
-        'numpy', 'scipy', 'matplotlib', 'seaborn', 'plotly', 'opencv',
-        'nltk', 'spacy', 'huggingface', 'transformers', 'xgboost', 'lightgbm',
-        # Testing
-        'jest', 'mocha', 'jasmine', 'pytest', 'junit', 'selenium', 'cypress',
-        'playwright', 'puppeteer', 'testng', 'rspec'
-    }
+    def __init__(self, store: TaxonomyStore = taxonomy_store):
+        self.store = store
     
-    TOOLS = {
-        # DevOps & Cloud
-        'docker', 'kubernetes', 'k8s', 'aws', 'azure', 'gcp', 'google cloud',
-        'heroku', 'vercel', 'netlify', 'digitalocean', 'terraform', 'ansible',
-        'jenkins', 'circleci', 'travis', 'github actions', 'gitlab ci',
-        'bamboo', 'teamcity', 'argo', 'helm', 'prometheus', 'grafana',
-        'datadog', 'new relic', 'splunk', 'elk', 'elasticsearch', 'logstash',
-        'kibana', 'cloudwatch', 'cloudformation', 'pulumi', 'vagrant',
-        # Version Control
-        'git', 'github', 'gitlab', 'bitbucket', 'svn', 'mercurial',
-        # IDEs & Editors
-        'vscode', 'visual studio code', 'intellij', 'pycharm', 'eclipse',
-        'sublime', 'vim', 'neovim', 'emacs', 'atom', 'webstorm', 'android studio',
-        'xcode',
-        # Project Management
-        'jira', 'confluence', 'trello', 'asana', 'notion', 'monday', 'linear',
-        'clickup', 'basecamp', 'azure devops',
-        # Design
-        'figma', 'sketch', 'adobe xd', 'invision', 'zeplin', 'photoshop',
-        'illustrator', 'canva', 'after effects', 'premiere pro', 'indesign',
-        # Communication
-        'slack', 'teams', 'discord', 'zoom',
-        # API & Testing Tools
-        'postman', 'insomnia', 'swagger', 'graphql', 'rest', 'grpc', 'soap',
-        # Data & BI
-        'webpack', 'vite', 'parcel', 'rollup', 'babel', 'eslint', 'prettier',
-        'nginx', 'apache', 'redis', 'rabbitmq', 'kafka', 'celery', 'airflow',
-        'spark', 'hadoop', 'hive', 'databricks', 'snowflake', 'dbt', 'looker',
-        'tableau', 'power bi', 'metabase', 'superset', 'alteryx',
-        # Marketing Tools
-        'google analytics', 'hubspot', 'marketo', 'mailchimp', 'semrush',
-        'ahrefs', 'moz', 'hootsuite', 'buffer', 'sprout social',
-        # Finance Tools
-        'bloomberg', 'reuters', 'sap', 'oracle', 'quickbooks', 'xero',
-        'netsuite', 'sage', 'factset', 'capital iq',
-        # HR Tools
-        'workday', 'successfactors', 'bamboohr', 'adp', 'greenhouse',
-        'lever', 'linkedin recruiter', 'ultipro', 'paychex', 'gusto',
-        # Healthcare Tools
-        'epic', 'cerner', 'meditech', 'allscripts', 'athenahealth',
-        # Engineering Tools
-        'solidworks', 'autocad', 'catia', 'creo', 'nx', 'ansys',
-        'matlab', 'simulink', 'revit', 'civil 3d', 'etabs',
-        'altium', 'eagle', 'kicad', 'orcad', 'labview',
-        # Legal Tools
-        'westlaw', 'lexisnexis', 'relativity', 'clio',
-        # Real Estate Tools
-        'mls', 'yardi', 'costar', 'argus',
-        # Security Tools
-        'splunk', 'wireshark', 'nmap', 'metasploit', 'burp suite',
-        'crowdstrike', 'palo alto', 'okta', 'qualys', 'nessus'
-    }
-    
-    DATABASES = {
-        'mysql', 'postgresql', 'postgres', 'mongodb', 'sqlite', 'oracle',
-        'sql server', 'mssql', 'mariadb', 'cassandra', 'dynamodb', 'firebase',
-        'firestore', 'couchdb', 'neo4j', 'redis', 'memcached', 'elasticsearch',
-        'supabase', 'planetscale', 'cockroachdb', 'timescaledb', 'influxdb',
-        'arangodb', 'fauna', 'prisma', 'mongoose', 'sequelize', 'typeorm',
-        'sqlalchemy', 'drizzle', 'knex'
-    }
-    
-    SOFT_SKILLS = {
-        'leadership', 'communication', 'teamwork', 'team player', 'collaboration',
-        'problem solving', 'problem-solving', 'analytical', 'critical thinking',
-        'creativity', 'adaptability', 'flexibility', 'time management',
-        'project management', 'agile', 'scrum', 'kanban', 'public speaking',
-        'presentation', 'negotiation', 'conflict resolution', 'mentoring',
-        'coaching', 'decision making', 'decision-making', 'strategic thinking',
-        'attention to detail', 'detail-oriented', 'self-motivated', 'initiative',
-        'customer service', 'stakeholder management', 'cross-functional',
-        'remote work', 'distributed teams', 'empathy', 'emotional intelligence',
-        'active listening', 'interpersonal skills', 'organizational skills',
-        'multitasking', 'work ethic', 'patience', 'cultural awareness',
-        'networking', 'persuasion', 'accountability', 'resourcefulness'
-    }
+    @tracing.traced("SkillExtractor.extract")
+    def extract(self, text: str, taxonomy: Optional[Taxonomy] = None) -> SkillsData:
+        """Extract skills from resume text"""
+        vocabulary = (taxonomy or self.store.current()).vocabulary
+        
+        # Single automaton pass over the text (word-boundary matching);
+        # aliases such as "reactjs" fold into their canonical skill
+        skills_data = self._from_bits(vocabulary.extract_bits(text), vocabulary)
+        tracing.set_attributes(**{"text.length": len(text), "skills.count": skills_data.total_count})
+        return skills_data
     
-    # Industry-specific certifications
-    CERTIFICATIONS = {
-        # Technology
-        'aws certified', 'azure certified', 'gcp certified', 'cka', 'ckad',
-        'cissp', 'ceh', 'oscp', 'comptia', 'ccna', 'ccnp',
-        # Project Management
-        'pmp', 'prince2', 'csm', 'psm', 'safe', 'capm',
-        # Data
-        'google data analytics', 'databricks certified', 'snowflake certified',
-        # Finance
-        'cfa', 'cpa', 'cma', 'frm', 'series 7', 'series 63',
-        # HR
-        'shrm-cp', 'shrm-scp', 'phr', 'sphr',
-        # Healthcare
-        'bls', 'acls', 'rn', 'lpn', 'cna',
-        # Quality
-        'six sigma', 'lean six sigma', 'iso', 'pmp',
-        # Marketing
-        'google ads certified', 'hubspot certified', 'facebook blueprint'
-    }
+    @tracing.traced("SkillExtractor.extract_blocks")
+    def extract_blocks(
+        self,
+        blocks: Sequence[str],
+        taxonomy: Optional[Taxonomy] = None,
+        known_bits: Optional[Sequence[Optional[int]]] = None
+    ) -> Tuple[SkillsData, List[int]]:
+        """Extract skills from a text split into blocks of whole lines
+        
+        No skill name spans a line break, so the skills of the text are the
+        union of its blocks' and equal extract() of the joined text.
+        
+        Args:
+            blocks: Block texts
+            known_bits: Skill bitset per block from an earlier extraction,
+                None where the block has to be scanned
+        
+        Returns:
+            Tuple of (SkillsData, skill bitset of each block)
+        """
+        vocabulary = (taxonomy or self.store.current()).vocabulary
+        known_bits = known_bits or [None] * len(blocks)
+        block_bits = [
+            vocabulary.extract_bits(block) if bits is None else bits
+            for block, bits in zip(blocks, known_bits)
+        ]
+        bits = 0
+        for block_skills in block_bits:
+            bits |= block_skills
+        skills_data = self._from_bits(bits, vocabulary)
+        tracing.set_attributes(**{
+            "blocks.scanned": sum(known is None for known in known_bits), "skills.count": skills_data.total_count
+        })
+        return skills_data, block_bits
     
-    def __init__(self):
-        # Create lowercase versions for matching
-        self.all_skills = {
-            'programming_languages': {s.lower() for s in self.PROGRAMMING_LANGUAGES},
-            'frameworks': {s.lower() for s in self.FRAMEWORKS},
-            'tools': {s.lower() for s in self.TOOLS},
-            'databases': {s.lower() for s in self.DATABASES},
-            'soft_skills': {s.lower() for s in self.SOFT_SKILLS}
-        }
-    
-    def extract(self, text: str) -> SkillsData:
-        """Extract skills from resume text"""
-        text_lower = text.lower()
+    def _from_bits(self, bits: int, vocabulary: SkillVocabulary) -> SkillsData:
+        """SkillsData for the skills in a bitset from SkillVocabulary.extract_bits"""
+        bits &= vocabulary.extractable_mask
         
+        # Display strings are decoded per category, already sorted by id
         found_skills = {
-            'programming_languages': [],
-            'frameworks': [],
-            'tools': [],
-            'databases': [],
-            'soft_skills': [],
-            'other': []
+            category: vocabulary.decode(bits & vocabulary.category_masks[category])
+            for category in vocabulary.CATEGORIES
         }
-        
-        # Extract skills from each category
-        for category, skills_set in self.all_skills.items():
-            for skill in skills_set:
-                # Use word boundary matching to avoid partial matches
-                pattern = r'\b' + re.escape(skill) + r'\b'
-                if re.search(pattern, text_lower):
-                    # Get original case version
-                    original = self._get_original_case(skill, category)
-                    if original not in found_skills[category]:
-                        found_skills[category].append(original)
-        
-        # Sort skills
-        for category in found_skills:
-            found_skills[category].sort()
+        found_skills['other'] = []
         
         # Calculate total count
         total_count = sum(len(skills) for skills in found_skills.values())
@@ -183,7 +80,7 @@ class SkillExtractor:
         # Create skill categories with strength
         skill_categories = self._create_skill_categories(found_skills)
         
-        return SkillsData(
+        skills_data = SkillsData(
             programming_languages=found_skills['programming_languages'],
             frameworks=found_skills['frameworks'],
             tools=found_skills['tools'],
@@ -193,22 +90,9 @@ class SkillExtractor:
             total_count=total_count,
             skill_categories=skill_categories
         )
-    
-    def _get_original_case(self, skill: str, category: str) -> str:
-        """Get the properly cased version of a skill"""
-        skill_maps = {
-            'programming_languages': self.PROGRAMMING_LANGUAGES,
-            'frameworks': self.FRAMEWORKS,
-            'tools': self.TOOLS,
-            'databases': self.DATABASES,
-            'soft_skills': self.SOFT_SKILLS
-        }
-        
-        source_set = skill_maps.get(category, set())
-        for s in source_set:
-            if s.lower() == skill:
-                return s
-        return skill.title()
+        skills_data._skill_bits = bits
+        skills_data._skill_vocabulary = vocabulary
+        return skills_data
     
     def _create_skill_categories(self, found_skills: Dict[str, List[str]]) -> List[SkillCategory]:
         """Create categorized skill entries with strength ratings"""
@@ -254,60 +138,16 @@ class SkillExtractor:
         else:
             return 'Weak'
     
-    def get_skill_suggestions(self, found_skills: SkillsData, domain: str) -> List[str]:
+    def get_skill_suggestions(
+        self,
+        found_skills: SkillsData,
+        domain: str,
+        taxonomy: Optional[Taxonomy] = None
+    ) -> List[str]:
         """Get skill suggestions based on domain - covers 25+ industries"""
-        domain_skills = {
-            # Technology
-            'Software / IT': ['Python', 'JavaScript', 'React', 'Node.js', 'Docker', 'AWS', 'Git', 'TypeScript'],
-            'Data Science / AI': ['Python', 'TensorFlow', 'PyTorch', 'SQL', 'Pandas', 'Machine Learning', 'Statistics', 'Tableau'],
-            'Cybersecurity': ['Splunk', 'SIEM', 'Penetration Testing', 'Firewalls', 'Security Frameworks', 'CISSP', 'Kali Linux'],
-            
-            # Business
-            'Marketing': ['Google Analytics', 'SEO', 'Content Strategy', 'Social Media', 'HubSpot', 'Marketing Automation', 'Google Ads'],
-            'Finance / Banking': ['Excel', 'Financial Modeling', 'SQL', 'Bloomberg', 'Risk Analysis', 'Python', 'VBA', 'CFA'],
-            'Sales': ['CRM', 'Salesforce', 'Pipeline Management', 'Negotiation', 'Lead Generation', 'Cold Calling', 'HubSpot'],
-            'Human Resources': ['HRIS', 'ATS', 'Recruiting', 'Employee Relations', 'Compliance', 'Workday', 'LinkedIn Recruiter'],
-            'Operations / Supply Chain': ['SAP', 'Lean Six Sigma', 'Inventory Management', 'Procurement', 'ERP', 'Excel', 'Project Management'],
-            'Consulting': ['PowerPoint', 'Excel', 'Financial Modeling', 'Stakeholder Management', 'Strategy', 'Problem Solving'],
-            'Project Management': ['Jira', 'PMP', 'Agile', 'Scrum', 'MS Project', 'Risk Management', 'Stakeholder Communication'],
-            
-            # Healthcare
-            'Healthcare / Medical': ['Epic', 'Cerner', 'HIPAA', 'Medical Terminology', 'EMR/EHR', 'Patient Care', 'Clinical Documentation'],
-            'Pharmaceutical / Biotech': ['SAS', 'R', 'Clinical Trials', 'GMP', 'Regulatory Affairs', 'FDA', 'Quality Assurance'],
-            
-            # Creative
-            'Design / UX': ['Figma', 'Adobe Creative Suite', 'UI/UX', 'Prototyping', 'Design Systems', 'User Research', 'Sketch'],
-            'Content / Media': ['WordPress', 'SEO Writing', 'Adobe Premiere', 'Content Strategy', 'Social Media', 'Copywriting'],
-            
-            # Engineering
-            'Mechanical Engineering': ['SolidWorks', 'AutoCAD', 'CATIA', 'ANSYS', 'GD&T', 'FEA', 'Manufacturing'],
-            'Electrical / Electronics': ['Altium', 'MATLAB', 'Embedded C', 'PCB Design', 'FPGA', 'Verilog', 'Circuit Analysis'],
-            'Civil / Construction': ['AutoCAD', 'Revit', 'Civil 3D', 'Primavera', 'Structural Analysis', 'Project Management'],
-            
-            # Other Industries
-            'Legal': ['Westlaw', 'LexisNexis', 'Contract Management', 'Legal Research', 'Drafting', 'Compliance'],
-            'Education / Academia': ['Curriculum Development', 'LMS', 'Assessment Design', 'Classroom Management', 'Google Classroom'],
-            'Hospitality / Tourism': ['Opera PMS', 'Customer Service', 'Event Planning', 'Reservation Systems', 'Revenue Management'],
-            'Retail / E-commerce': ['Shopify', 'Inventory Management', 'POS Systems', 'Merchandising', 'Google Analytics', 'Customer Service'],
-            'Government / Public Sector': ['Policy Analysis', 'Grant Writing', 'Public Speaking', 'Compliance', 'Stakeholder Engagement'],
-            'Non-Profit / NGO': ['Grant Writing', 'Donor Management', 'Fundraising', 'Volunteer Coordination', 'Salesforce Nonprofit'],
-            'Real Estate': ['MLS', 'Property Management', 'CoStar', 'Financial Analysis', 'Contract Negotiation', 'CRM'],
-            
-            # Entry Level
-            'Student / Fresher': ['Microsoft Office', 'Communication', 'Problem Solving', 'Teamwork', 'Time Management', 'Adaptability']
-        }
-        
-        current_skills = set(
-            s.lower() for s in 
-            found_skills.programming_languages + found_skills.frameworks + 
-            found_skills.tools + found_skills.databases
-        )
-        
-        suggestions = []
-        domain_recommended = domain_skills.get(domain, domain_skills.get('Student / Fresher', []))
-        
-        for skill in domain_recommended:
-            if skill.lower() not in current_skills:
-                suggestions.append(skill)
-        
-        return suggestions[:5]
+        taxonomy = taxonomy or self.store.current()
+        tables = taxonomy.suggestion_tables
+        entries, _ = tables.get(domain, tables['Student / Fresher'])
+        vocabulary = taxonomy.vocabulary
+        current_bits = vocabulary.skills_bits(found_skills, vocabulary.TECHNICAL_CATEGORIES)
+        return vocabulary.select(entries, current_bits, present=False)[:5]
@@ -0,0 +1,171 @@
+"""
+Skill Vocabulary Service - Stable integer ids and bitsets for known skills
+"""
+from array import array
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from app.models.schemas import SkillsData
+from lib.skill_matcher import Automaton
+
+
+def popcount(bits: int) -> int:
+    """Number of skills in a bitset"""
+    return bin(bits).count("1")
+
+
+class SkillVocabulary:
+    """Assign every canonical skill an integer id and match text to skill bitsets
+
+    A set of skills is an int whose bit `i` is set when skill id `i` is
+    present, so matched/missing computations are single ANDs. Aliases
+    ("reactjs", "react.js") fold into their canonical skill ("react") both
+    when matching text and when resolving names from lookup tables.
+    """
+
+    CATEGORIES = ('programming_languages', 'frameworks', 'tools', 'databases', 'soft_skills')
+    TECHNICAL_CATEGORIES = ('programming_languages', 'frameworks', 'tools', 'databases')
+
+    def __init__(
+        self,
+        categories: Dict[str, Iterable[str]],
+        aliases: Optional[Dict[str, Iterable[str]]] = None,
+        extra_skills: Iterable[str] = ()
+    ):
+        """
+        Args:
+            categories: Extractable skills per SkillsData category
+            aliases: Canonical skill -> alternative spellings
+            extra_skills: Skills referenced by lookup tables (suggestions,
+                domain profiles) that need ids but are not extracted
+        """
+        alias_of: Dict[str, str] = {}
+        for canonical, forms in (aliases or {}).items():
+            for form in forms:
+                alias_of[form.lower()] = canonical.lower()
+
+        display: Dict[str, str] = {}
+        for skills in categories.values():
+            for skill in skills:
+                key = alias_of.get(skill.lower(), skill.lower())
+                display.setdefault(key, key)
+        for canonical in (aliases or {}):
+            display.setdefault(canonical.lower(), canonical.lower())
+        for skill in extra_skills:
+            key = alias_of.get(skill.lower(), skill.lower())
+            display.setdefault(key, skill)
+
+        # Sorted so ids are stable across processes and deploys
+        keys = sorted(display)
+        self.names: List[str] = [display[k] for k in keys]
+        self.ids: Dict[str, int] = {k: i for i, k in enumerate(keys)}
+        for form, canonical in alias_of.items():
+            self.ids[form] = self.ids[canonical]
+
+        self.category_masks: Dict[str, int] = {
+            category: self.to_bits(categories.get(category, ()))
+            for category in self.CATEGORIES
+        }
+        self.extractable_mask = self.mask(self.CATEGORIES)
+
+        # Every surface form is a pattern; map pattern ids back to skill ids
+        self.automaton = Automaton()
+        self._pattern_skill = array("I")
+        for form in sorted(self.ids):
+            self.automaton.add(form)
+            self._pattern_skill.append(self.ids[form])
+        self.automaton.build()
+
+    def to_sections(self) -> Dict:
+        """Id tables and compiled automaton for a taxonomy snapshot"""
+        sections = {
+            "vocabulary.names": self.names,
+            "vocabulary.ids": self.ids,
+            "vocabulary.category_masks": {
+                category: format(bits, "x") for category, bits in self.category_masks.items()
+            },
+            "vocabulary.pattern_skill": self._pattern_skill,
+        }
+        sections.update(self.automaton.to_sections("vocabulary.automaton"))
+        return sections
+
+    @classmethod
+    def from_snapshot(cls, snapshot) -> "SkillVocabulary":
+        """Vocabulary over a mapped snapshot; nothing is recompiled"""
+        vocabulary = cls.__new__(cls)
+        vocabulary.names = snapshot.section("vocabulary.names")
+        vocabulary.ids = snapshot.section("vocabulary.ids")
+        vocabulary.category_masks = {
+            category: int(bits, 16)
+            for category, bits in snapshot.section("vocabulary.category_masks").items()
+        }
+        vocabulary.extractable_mask = vocabulary.mask(cls.CATEGORIES)
+        vocabulary.automaton = Automaton.from_snapshot(snapshot, "vocabulary.automaton")
+        vocabulary._pattern_skill = snapshot.section("vocabulary.pattern_skill")
+        return vocabulary
+
+    def mask(self, categories: Iterable[str]) -> int:
+        bits = 0
+        for category in categories:
+            bits |= self.category_masks[category]
+        return bits
+
+    def id_of(self, skill: str) -> Optional[int]:
+        return self.ids.get(skill.lower())
+
+    def to_bits(self, skills: Iterable[str]) -> int:
+        """Bitset for known skills in `skills` (unknown names are ignored)"""
+        bits = 0
+        for skill in skills:
+            skill_id = self.ids.get(skill.lower())
+            if skill_id is not None:
+                bits |= 1 << skill_id
+        return bits
+
+    def extract_bits(self, text: str) -> int:
+        """Bitset of skills mentioned in `text` (one pass, word boundaries)"""
+        bits = 0
+        pattern_skill = self._pattern_skill
+        for pattern_id in self.automaton.find(text.lower()):
+            bits |= 1 << pattern_skill[pattern_id]
+        return bits
+
+    def decode(self, bits: int) -> List[str]:
+        """Skill names for a bitset, in id (alphabetical) order"""
+        names = []
+        while bits:
+            lowest = bits & -bits
+            names.append(self.names[lowest.bit_length() - 1])
+            bits ^= lowest
+        return names
+
+    def table(self, skills: Iterable[str]) -> Tuple[Tuple[Tuple[str, int], ...], int]:
+        """Precompile a display-ordered lookup table into (entries, mask)
+
+        Entries keep the table's own display strings and order; skills the
+        vocabulary does not know get no bit and are never considered present.
+        """
+        entries = []
+        mask = 0
+        for skill in skills:
+            skill_id = self.id_of(skill)
+            bit = 0 if skill_id is None else 1 << skill_id
+            entries.append((skill, bit))
+            mask |= bit
+        return tuple(entries), mask
+
+    @staticmethod
+    def select(entries: Tuple[Tuple[str, int], ...], bits: int, present: bool = True) -> List[str]:
+        """Display strings from a precompiled table whose bit is (not) in `bits`"""
+        if present:
+            return [skill for skill, bit in entries if bit & bits]
+        return [skill for skill, bit in entries if not bit & bits]
+
+    def skills_bits(self, skills: SkillsData, categories: Iterable[str] = CATEGORIES) -> int:
+        """Bitset for a SkillsData, restricted to `categories`"""
+        bits = skills.skill_bits(self)
+        if bits is None:
+            bits = self.to_bits(
+                s for category in categories for s in getattr(skills, category)
+            )
+        return bits & self.mask(categories)
+
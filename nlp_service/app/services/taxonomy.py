@@ -0,0 +1,237 @@
+"""
+Taxonomy Service - Versioned skill and domain taxonomy with compiled snapshots
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from app.services.skill_vocabulary import SkillVocabulary
+from lib.snapshot import Snapshot, SnapshotError, build_lock, write_snapshot
+
+_DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data")
+
+TAXONOMY_PATH = os.environ.get("TAXONOMY_PATH", os.path.join(_DATA_DIR, "taxonomy.json"))
+SNAPSHOT_PATH = os.environ.get("TAXONOMY_SNAPSHOT_PATH", os.path.join(_DATA_DIR, "taxonomy.snap"))
+# How often a worker checks whether the snapshot file was replaced (0 disables)
+REFRESH_SECONDS = float(os.environ.get("TAXONOMY_REFRESH_SECONDS", 5))
+
+
+def _file_sha256(path: str) -> str:
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+class Taxonomy:
+    """One immutable version of the taxonomy plus everything compiled from it
+
+    Services read skill lists, domain keywords and lookup tables from a
+    Taxonomy instead of class constants. A request pins one instance for its
+    whole lifetime, so a reload never mixes two versions in one analysis.
+    """
+
+    def __init__(
+        self,
+        data: Dict,
+        vocabulary: SkillVocabulary,
+        source_sha256: str,
+        origin: str,
+        snapshot: Optional[Snapshot] = None
+    ):
+        self.version = data.get("version")
+        self.source_sha256 = source_sha256
+        self.origin = origin
+        self.vocabulary = vocabulary
+        # Keeps the mapping alive for as long as this version is in use
+        self.snapshot = snapshot
+
+        self.domains = data["domains"]
+        self.skill_suggestions = data["skill_suggestions"]
+        self.ats_keywords = data["ats_keywords"]
+        self.ats_domain_skills = data["ats_domain_skills"]
+
+        # Lookup tables precompiled to (display, bit) entries
+        table = vocabulary.table
+        self.suggestion_tables = {d: table(s) for d, s in self.skill_suggestions.items()}
+        self.domain_skill_tables = {d: table(v["skills"]) for d, v in self.domains.items()}
+        self.ats_skill_tables = {d: table(s) for d, s in self.ats_domain_skills.items()}
+        # Every domain keyword and title, each once
+        self.domain_terms = tuple(sorted({
+            term for v in self.domains.values() for term in v["keywords"] + v["titles"]
+        }))
+
+    @classmethod
+    def from_data(cls, data: Dict, source_sha256: str = "", origin: str = "json") -> "Taxonomy":
+        """Compile a taxonomy from its JSON document"""
+        extra = []
+        for skills in data["skill_suggestions"].values():
+            extra.extend(skills)
+        for domain in data["domains"].values():
+            extra.extend(domain["skills"])
+        for skills in data["ats_domain_skills"].values():
+            extra.extend(skills)
+
+        vocabulary = SkillVocabulary(
+            {c: data["skills"].get(c, []) for c in SkillVocabulary.CATEGORIES},
+            aliases=data.get("aliases", {}),
+            extra_skills=extra
+        )
+        return cls(data, vocabulary, source_sha256, origin)
+
+    @classmethod
+    def from_json(cls, path: str = TAXONOMY_PATH) -> "Taxonomy":
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return cls.from_data(data, _file_sha256(path), origin=path)
+
+    @classmethod
+    def from_snapshot(cls, snapshot: Snapshot) -> "Taxonomy":
+        """Taxonomy over a mapped snapshot (automaton and id tables are not rebuilt)"""
+        return cls(
+            snapshot.section("taxonomy"),
+            SkillVocabulary.from_snapshot(snapshot),
+            snapshot.meta.get("source_sha256", ""),
+            origin=snapshot.path,
+            snapshot=snapshot
+        )
+
+    def lookup_data(self) -> Dict:
+        """Document parts services read directly; skill lists and aliases are
+        only needed to compile the vocabulary, which a snapshot already holds"""
+        return {
+            "version": self.version,
+            "domains": self.domains,
+            "skill_suggestions": self.skill_suggestions,
+            "ats_keywords": self.ats_keywords,
+            "ats_domain_skills": self.ats_domain_skills,
+        }
+
+    def info(self) -> Dict:
+        return {
+            "version": self.version,
+            "source_sha256": self.source_sha256,
+            "origin": self.origin,
+            "skills": len(self.vocabulary.names),
+            "domains": len(self.domains),
+            "snapshot_bytes": self.snapshot.size if self.snapshot else None,
+        }
+
+
+def build_snapshot(source_path: str = TAXONOMY_PATH, snapshot_path: str = SNAPSHOT_PATH) -> Taxonomy:
+    """Compile taxonomy JSON and atomically write it as a snapshot
+
+    Returns:
+        The compiled Taxonomy
+    """
+    taxonomy = Taxonomy.from_json(source_path)
+    sections = {"taxonomy": taxonomy.lookup_data()}
+    sections.update(taxonomy.vocabulary.to_sections())
+    write_snapshot(snapshot_path, {
+        "kind": "taxonomy",
+        "version": taxonomy.version,
+        "source_sha256": taxonomy.source_sha256,
+        "built_at": int(time.time()),
+    }, sections)
+    return taxonomy
+
+
+def _fresh_snapshot(source_path: str, snapshot_path: str) -> Optional[Snapshot]:
+    """Map the snapshot if it exists and was built from the deployed JSON"""
+    try:
+        snapshot = Snapshot(snapshot_path)
+    except SnapshotError:
+        return None
+    if snapshot.meta.get("kind") != "taxonomy":
+        return None
+    if os.path.exists(source_path) and \
+            snapshot.meta.get("source_sha256") != _file_sha256(source_path):
+        return None
+    return snapshot
+
+
+def load_taxonomy(source_path: str = TAXONOMY_PATH, snapshot_path: str = SNAPSHOT_PATH) -> Taxonomy:
+    """Map the compiled snapshot, building it first if it is missing or stale
+
+    Workers starting together serialize on a lock file: the first one builds
+    and atomically renames the snapshot into place, the rest find it fresh
+    and only map it. If the data directory is read-only the JSON is compiled
+    in memory instead.
+    """
+    snapshot = _fresh_snapshot(source_path, snapshot_path)
+    if snapshot is None:
+        try:
+            with build_lock(snapshot_path):
+                snapshot = _fresh_snapshot(source_path, snapshot_path)
+                if snapshot is None:
+                    build_snapshot(source_path, snapshot_path)
+                    snapshot = _fresh_snapshot(source_path, snapshot_path)
+        except OSError:
+            snapshot = None
+
+    if snapshot is None:
+        return Taxonomy.from_json(source_path)
+    return Taxonomy.from_snapshot(snapshot)
+
+
+class TaxonomyStore:
+    """Holds the active Taxonomy and swaps it atomically on reload
+
+    Readers call current() once per request and keep that reference, so a
+    swap only affects requests that start after it. Other worker processes
+    notice a replaced snapshot file within REFRESH_SECONDS and load it too.
+    """
+
+    def __init__(
+        self,
+        source_path: str = TAXONOMY_PATH,
+        snapshot_path: str = SNAPSHOT_PATH,
+        refresh_seconds: float = REFRESH_SECONDS
+    ):
+        self.source_path = source_path
+        self.snapshot_path = snapshot_path
+        self.refresh_seconds = refresh_seconds
+        self._lock = threading.Lock()
+        self._taxonomy: Optional[Taxonomy] = None
+        self._snapshot_stamp = None
+        self._next_check = 0.0
+
+    def _stamp(self) -> Optional[Tuple[int, int, int]]:
+        try:
+            st = os.stat(self.snapshot_path)
+        except OSError:
+            return None
+        return (st.st_ino, st.st_size, st.st_mtime_ns)
+
+    def current(self) -> Taxonomy:
+        taxonomy = self._taxonomy
+        if taxonomy is None:
+            return self.reload()
+        if self.refresh_seconds and time.monotonic() >= self._next_check:
+            self._next_check = time.monotonic() + self.refresh_seconds
+            if self._stamp() != self._snapshot_stamp:
+                return self.reload()
+        return taxonomy
+
+    def reload(self, rebuild: bool = False) -> Taxonomy:
+        """Load (optionally recompiling the snapshot first) and swap in the result"""
+        with self._lock:
+            if rebuild:
+                with build_lock(self.snapshot_path):
+                    build_snapshot(self.source_path, self.snapshot_path)
+            stamp = self._stamp()
+            taxonomy = load_taxonomy(self.source_path, self.snapshot_path)
+            self._taxonomy = taxonomy
+            self._snapshot_stamp = stamp
+            self._next_check = time.monotonic() + self.refresh_seconds
+            return taxonomy
+
+    def swap(self, taxonomy: Taxonomy) -> Taxonomy:
+        """Install an already-built taxonomy; returns the previous one"""
+        with self._lock:
+            previous, self._taxonomy = self._taxonomy, taxonomy
+            return previous
+
+
+taxonomy_store = TaxonomyStore()
@@ -0,0 +1,86 @@
+"""
+Upload Limits - Reject oversized uploads while the request body streams in
+"""
+import json
+from typing import Dict
+
+
+class _BodyTooLarge(Exception):
+    pass
+
+
+class UploadLimitMiddleware:
+    """ASGI middleware that caps request bodies on upload routes
+
+    Starlette spools multipart files as the body arrives. This stops that
+    early: a declared Content-Length over the route's limit is refused
+    before anything is read, and a body that grows past the limit while
+    streaming (chunked or lying Content-Length) aborts the request with 413
+    instead of being buffered to the end.
+    """
+
+    def __init__(self, app, limits: Dict[str, int], detail: str = "File size exceeds limit"):
+        """
+        Args:
+            app: Wrapped ASGI application
+            limits: Request path -> largest accepted body in bytes
+            detail: Error message for the 413 response
+        """
+        self.app = app
+        self.limits = limits
+        self.detail = detail
+
+    async def __call__(self, scope, receive, send):
+        limit = self.limits.get(scope.get("path")) if scope["type"] == "http" else None
+        if limit is None:
+            await self.app(scope, receive, send)
+            return
+
+        for name, value in scope.get("headers", []):
+            if name == b"content-length" and value.isdigit() and int(value) > limit:
+                await self._reject(send)
+                return
+
+        received = 0
+        exceeded = False
+        response_started = False
+
+        async def limited_receive():
+            nonlocal received, exceeded
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    exceeded = True
+                    raise _BodyTooLarge()
+            return message
+
+        async def guarded_send(message):
+            nonlocal response_started
+            if exceeded:
+                # Whatever the app makes of the aborted body is replaced by the 413
+                return
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, guarded_send)
+        except Exception:
+            if not exceeded:
+                raise
+        if exceeded and not response_started:
+            await self._reject(send)
+
+    async def _reject(self, send) -> None:
+        body = json.dumps({"detail": self.detail}).encode("utf-8")
+        await send({
+            "type": "http.response.start",
+            "status": 413,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode("ascii")),
+                (b"connection", b"close"),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
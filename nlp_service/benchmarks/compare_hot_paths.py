@@ -0,0 +1,171 @@
+"""
+Regression gate: run the hot-path microbenchmarks and compare with the baseline.
+
+Each case is compared with the baseline by its fastest repeat: the repeats
+of one run share a process (its caches, heap layout and CPU frequency), so
+they are not independent samples, and noise on a busy machine only ever
+makes a repeat slower. A case regresses when its fastest repeat is more
+than --threshold slower than the baseline's. Regressions are re-timed in
+--processes fresh interpreters before they count, and a case only fails
+the gate if even the fastest of those repeats is still regressed.
+
+Only the hot paths (HOT_PATHS) fail the gate by default; other cases are
+reported but informational unless --all is given. Cases missing from the
+baseline (e.g. page OCR on a machine with Tesseract) are shown as "new".
+Timings depend on the machine, so compare with a baseline recorded on the
+same hardware (python benchmarks/hot_paths.py --update-baseline).
+
+Run with:
+    python benchmarks/compare_hot_paths.py                 # run the suite and compare
+    python benchmarks/compare_hot_paths.py --threshold 0.2 # allow 20% slower
+    python benchmarks/compare_hot_paths.py --current results.json   # compare a saved run
+Exits 1 when a gated case regresses.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import hot_paths  # noqa: E402
+
+# Case name prefixes that fail the gate when they regress
+HOT_PATHS = (
+    "skill_extractor.extract",
+    "domain_classifier.classify",
+    "ats_scorer.calculate_score",
+    "ats_layout_from_pdf",
+    "resume_parser._extract_pdf_text",
+    "resume_parser._extract_docx_text",
+    "ocr_service.extract_page_text",
+    "ocr_service._preprocess_image",
+)
+
+
+def is_hot(name: str) -> bool:
+    return name.startswith(HOT_PATHS)
+
+
+def compare_case(baseline: dict, current: dict, threshold: float) -> dict:
+    base_min, cur_min = min(baseline["samples_us"]), min(current["samples_us"])
+    ratio = cur_min / base_min
+    if ratio > 1 + threshold:
+        verdict = "REGRESSED"
+    elif ratio < 1 / (1 + threshold):
+        verdict = "improved"
+    else:
+        verdict = "ok"
+    return {
+        "baseline_us": base_min,
+        "current_us": cur_min,
+        "change": ratio - 1,
+        "median_change": statistics.median(current["samples_us"]) / statistics.median(baseline["samples_us"]) - 1,
+        "verdict": verdict,
+    }
+
+
+def compare(baseline: dict, current: dict, threshold: float) -> dict:
+    """{case: comparison row} for every case in either run."""
+    rows = {}
+    for name in list(current["cases"]) + [n for n in baseline["cases"] if n not in current["cases"]]:
+        if name not in baseline["cases"]:
+            rows[name] = {"current_us": min(current["cases"][name]["samples_us"]), "verdict": "new"}
+        elif name not in current["cases"]:
+            rows[name] = {"baseline_us": min(baseline["cases"][name]["samples_us"]), "verdict": "not run"}
+        else:
+            rows[name] = compare_case(baseline["cases"][name], current["cases"][name], threshold)
+    return rows
+
+
+def retime(names, min_time: float, repeats: int, processes: int) -> dict:
+    """{case: timings} pooled from `processes` fresh runs of hot_paths.py over `names`."""
+    pooled = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        output = os.path.join(tmp, "retime.json")
+        command = [
+            sys.executable, os.path.abspath(hot_paths.__file__),
+            "--min-time", str(min_time), "--repeats", str(repeats), "--output", output,
+        ]
+        for name in names:
+            command += ["--case", name]
+        for _ in range(processes):
+            subprocess.run(command, check=True, stdout=subprocess.DEVNULL)
+            with open(output, "r", encoding="utf-8") as f:
+                run = json.load(f)
+            for name, result in run["cases"].items():
+                pooled.setdefault(name, []).append(result)
+    cases = {}
+    for name, results in pooled.items():
+        samples = [sample for result in results for sample in result["samples_us"]]
+        cases[name] = {
+            "loops": results[0]["loops"],
+            "median_us": round(statistics.median(samples), 2),
+            "min_us": round(min(samples), 2),
+            "stdev_us": round(statistics.stdev(samples), 2) if len(samples) > 1 else 0.0,
+            "samples_us": samples,
+        }
+    return cases
+
+
+def print_table(rows: dict) -> None:
+    print(f"\n{'case':58} {'baseline':>10} {'current':>10} {'change':>8} {'median':>8}  verdict")
+    for name, row in rows.items():
+        baseline = hot_paths.format_us(row["baseline_us"]) if "baseline_us" in row else "-"
+        current = hot_paths.format_us(row["current_us"]) if "current_us" in row else "-"
+        change = f"{row['change']:+.1%}" if "change" in row else "-"
+        median_change = f"{row['median_change']:+.1%}" if "median_change" in row else "-"
+        marker = "*" if is_hot(name) else " "
+        print(f"{name:58} {baseline:>10} {current:>10} {change:>8} {median_change:>8}  {row['verdict']}{marker}")
+    print("(* hot path; baseline, current and change are the fastest repeat, median the change in medians)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--baseline", default=hot_paths.BASELINE_PATH, help="baseline results JSON")
+    parser.add_argument("--current", help="compare this saved run instead of running the suite")
+    parser.add_argument("--threshold", type=float, default=0.15, help="allowed slowdown (0.15 = 15%%)")
+    parser.add_argument(
+        "--processes", type=int, default=5, help="fresh processes re-timing a regressed case"
+    )
+    parser.add_argument("--filter", default="", help="only run cases whose name contains this")
+    parser.add_argument("--all", action="store_true", help="gate every case, not only the hot paths")
+    parser.add_argument("--output", help="write the current run's results JSON here")
+    args = parser.parse_args()
+
+    with open(args.baseline, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    if args.current:
+        with open(args.current, "r", encoding="utf-8") as f:
+            current = json.load(f)
+    else:
+        current = hot_paths.run_suite(args.filter, baseline["min_time"], baseline["repeats"])
+    if args.filter:
+        baseline = dict(baseline, cases={n: c for n, c in baseline["cases"].items() if args.filter in n})
+
+    rows = compare(baseline, current, args.threshold)
+    gated = [name for name, row in rows.items() if row["verdict"] == "REGRESSED" and (args.all or is_hot(name))]
+    if gated and not args.current:
+        print(f"\nRe-timing {len(gated)} regressed case(s) in {args.processes} fresh processes to rule out noise...")
+        retry = retime(gated, baseline["min_time"], baseline["repeats"], args.processes)
+        for name in gated:
+            current["cases"][name] = retry[name]
+            rows[name] = compare_case(baseline["cases"][name], retry[name], args.threshold)
+        gated = [name for name in gated if rows[name]["verdict"] == "REGRESSED"]
+
+    print_table(rows)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(current, f, indent=2)
+            f.write("\n")
+        print(f"Wrote {args.output}")
+    for name in gated:
+        print(f"FAIL {name}: {rows[name]['change']:+.1%} (fastest repeat)")
+    sys.exit(1 if gated else 0)
+
+
+if __name__ == "__main__":
+    main()
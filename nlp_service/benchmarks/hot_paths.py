@@ -0,0 +1,241 @@
+"""
+Microbenchmarks for the service hot paths, recorded against a JSON baseline.
+
+Each case times one function on a document from the synthetic resume corpus
+(benchmarks/resume_corpus.py), in-process and outside the parse sandbox:
+skill extraction, domain classification, ATS scoring, every ResumeParser
+extraction step, the OCR text cleaner and image preprocessing, the layout
+check, re-scoring an edited resume (without storing its state) and
+simulating the score impact of suggested edits. The loop count is
+calibrated so one repeat takes about --min-time seconds; every repeat's
+per-call time is kept, so later runs can be compared with more than a
+single number.
+
+Run with:
+    python benchmarks/hot_paths.py                     # print timings
+    python benchmarks/hot_paths.py --filter ats_scorer # only matching cases
+    python benchmarks/hot_paths.py --update-baseline   # rewrite hot_paths_baseline.json
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCH_DIR = os.path.join(ROOT, "benchmarks")
+BASELINE_PATH = os.path.join(BENCH_DIR, "hot_paths_baseline.json")
+
+sys.path.insert(0, ROOT)
+sys.path.insert(0, BENCH_DIR)
+
+import resume_corpus  # noqa: E402
+
+
+def _read(path: str) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def build_cases(corpus: dict) -> dict:
+    """{case name: zero-argument callable}; inputs are prepared up front, not timed.
+
+    Page OCR is only included where Tesseract and Poppler are installed.
+    """
+    from app.services.analysis_pipeline import AnalysisPipeline
+    from app.services.analysis_store import AnalysisStore
+    from app.services.ats_scorer import ATSScorer
+    from app.services.domain_classifier import DomainClassifier
+    from app.services.ocr_service import ocr_service
+    from app.services.resume_parser import ResumeParser
+    from app.services.skill_extractor import SkillExtractor
+    from lib.analysis_modes import ANALYSIS_MODES, Deadline
+    from lib.pdf_utils import ats_layout_from_pdf
+
+    parser = ResumeParser()
+    extractor = SkillExtractor()
+    classifier = DomainClassifier()
+    scorer = ATSScorer()
+
+    cases = {}
+    for doc in ("short", "long"):
+        parsed = parser.parse(corpus[doc], ".pdf")
+        text = parsed["raw_text"]
+        skills = extractor.extract(text)
+        domain = classifier.classify(text, skills)
+        sections = parser._identify_sections(text)
+        cases[f"skill_extractor.extract[{doc}]"] = lambda t=text: extractor.extract(t)
+        cases[f"domain_classifier.classify[{doc}]"] = lambda t=text, s=skills: classifier.classify(t, s)
+        cases[f"ats_scorer.calculate_score[{doc}]"] = (
+            lambda p=parsed, s=skills, d=domain: scorer.calculate_score(p, s, d)
+        )
+        cases[f"resume_parser._identify_sections[{doc}]"] = lambda t=text: parser._identify_sections(t)
+        cases[f"resume_parser._extract_candidate_info[{doc}]"] = (
+            lambda t=text: parser._extract_candidate_info(t)
+        )
+        cases[f"resume_parser._extract_experience[{doc}]"] = (
+            lambda t=text, s=sections: parser._extract_experience(t, s.get("experience", ""))
+        )
+        cases[f"resume_parser._extract_projects[{doc}]"] = (
+            lambda t=text, s=sections: parser._extract_projects(t, s.get("projects", ""))
+        )
+        cases[f"resume_parser._extract_education[{doc}]"] = (
+            lambda t=text, s=sections: parser._extract_education(t, s.get("education", ""))
+        )
+
+    for doc in ("short", "long", "two_column", "table_heavy"):
+        cases[f"resume_parser._extract_pdf_text[{doc}]"] = lambda p=corpus[doc]: parser._extract_pdf_text(p)
+    cases["resume_parser._extract_pdf_text_thorough[two_column]"] = (
+        lambda: parser._extract_pdf_text_thorough(
+            corpus["two_column"], ANALYSIS_MODES["thorough"], Deadline.for_mode("thorough")
+        )
+    )
+    cases["resume_parser._check_pdf_tables[table_heavy]"] = lambda: parser._check_pdf_tables(corpus["table_heavy"])
+    cases["resume_parser._check_pdf_images[scanned]"] = lambda: parser._check_pdf_images(corpus["scanned"])
+    cases["resume_parser._extract_docx_text[docx]"] = lambda: parser._extract_docx_text(corpus["docx"])
+    cases["resume_parser._check_docx_tables[docx]"] = lambda: parser._check_docx_tables(corpus["docx"])
+    cases["resume_parser._check_docx_images[docx]"] = lambda: parser._check_docx_images(corpus["docx"])
+
+    ocr_text = _read(corpus["ocr_text"]).decode("utf-8")
+    # pdf2image yields RGB pages; 150 dpi is narrow enough to take the resize path
+    page = resume_corpus.scanned_page_image(dpi=150).convert("RGB")
+    cases["ocr_service._clean_ocr_text[ocr_text]"] = lambda: ocr_service._clean_ocr_text(ocr_text)
+    cases["ocr_service._preprocess_image[scanned_page]"] = lambda: ocr_service._preprocess_image(page)
+
+    if ocr_service.is_available() and shutil.which("tesseract") and shutil.which("pdftoppm"):
+        scanned = _read(corpus["scanned"])
+        cases["ocr_service.extract_page_text[scanned]"] = lambda: ocr_service.extract_page_text(scanned, 1)
+
+    # A one-line edit to the experience section of an analyzed resume
+    store = AnalysisStore(db_path=os.path.join(os.path.dirname(corpus["long"]), "analyses.sqlite3"))
+    pipeline = AnalysisPipeline(parser, extractor, classifier, scorer, states=store)
+    state = store.get(pipeline.run(corpus["long"], ".pdf").analysis_id)
+    pipeline.states = AnalysisStore(ttl_seconds=0)
+    text = "\n".join(block["text"] for block in state["blocks"])
+    experience = parser._identify_sections(text)["experience"]
+    edited = text.replace(experience, "• Reduced build times 40% by caching dependencies\n" + experience)
+    cases["analysis_pipeline.rescore[long]"] = lambda: pipeline.rescore(state, text=edited)
+    # What-if scores of the edits its suggestions point at
+    edits = [
+        {"type": "add_skill", "value": "Kubernetes"},
+        {"type": "add_keyword", "value": "stakeholder"},
+        {"type": "add_metrics"},
+        {"type": "add_section", "value": "certifications", "text": "AWS Certified Solutions Architect"},
+    ]
+    cases["analysis_pipeline.simulate[long]"] = lambda: pipeline.simulate(state, edits)
+
+    for mode, doc in (("fast", "two_column"), ("balanced", "two_column"), ("balanced", "table_heavy")):
+        raw = _read(corpus[doc])
+        cases[f"ats_layout_from_pdf[{mode},{doc}]"] = lambda r=raw, m=mode: ats_layout_from_pdf(r, m)
+    return cases
+
+
+def time_case(func, min_time: float, repeats: int) -> dict:
+    """Per-call timings of func: `repeats` runs of a loop lasting about min_time each."""
+    func()  # warm caches and lazy imports
+    loops = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(loops):
+            func()
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_time / 5 or loops >= 1_000_000:
+            break
+        loops *= 10
+    loops = max(1, int(loops * min_time / max(elapsed, 1e-9)))
+
+    samples = []
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeats):
+            started = time.perf_counter()
+            for _ in range(loops):
+                func()
+            samples.append((time.perf_counter() - started) / loops * 1e6)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    return {
+        "loops": loops,
+        "median_us": round(statistics.median(samples), 2),
+        "min_us": round(min(samples), 2),
+        "stdev_us": round(statistics.stdev(samples), 2) if len(samples) > 1 else 0.0,
+        "samples_us": [round(sample, 2) for sample in samples],
+    }
+
+
+def run_suite(
+    name_filter: str = "",
+    min_time: float = 0.2,
+    repeats: int = 5,
+    verbose: bool = True,
+    names=None
+) -> dict:
+    """Time every case whose name contains name_filter (and is in `names`, if given).
+
+    Returns:
+        Results document: environment, settings and per-case timings
+    """
+    corpus = resume_corpus.write_corpus()
+    cases = build_cases(corpus)
+    results = {}
+    for name, func in cases.items():
+        if name_filter not in name or (names is not None and name not in names):
+            continue
+        results[name] = time_case(func, min_time, repeats)
+        if verbose:
+            result = results[name]
+            print(f"{name:58} {format_us(result['median_us']):>10}  ±{format_us(result['stdev_us']):>9}"
+                  f"  ({result['loops']} loops x {repeats})")
+    return {
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "min_time": min_time,
+        "repeats": repeats,
+        "cases": results,
+    }
+
+
+def format_us(us: float) -> str:
+    if us >= 1000:
+        return f"{us / 1000:.2f} ms"
+    return f"{us:.1f} us"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--filter", default="", help="only run cases whose name contains this")
+    parser.add_argument("--case", action="append", help="only run this case (exact name; repeatable)")
+    parser.add_argument("--min-time", type=float, default=0.2, help="seconds per repeat")
+    parser.add_argument("--repeats", type=int, default=5, help="timed repeats per case")
+    parser.add_argument("--quick", action="store_true", help="shorthand for --min-time 0.05 --repeats 3")
+    parser.add_argument("--output", help="write the results JSON here")
+    parser.add_argument(
+        "--update-baseline", action="store_true", help=f"rewrite {os.path.basename(BASELINE_PATH)}"
+    )
+    args = parser.parse_args()
+    if args.quick:
+        args.min_time, args.repeats = 0.05, 3
+
+    names = set(args.case) if args.case else None
+    results = run_suite(args.filter, args.min_time, args.repeats, names=names)
+    paths = [args.output] if args.output else []
+    if args.update_baseline:
+        if args.filter or args.case:
+            parser.error("--update-baseline records every case; drop --filter and --case")
+        paths.append(BASELINE_PATH)
+    for path in paths:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+            f.write("\n")
+        print(f"Wrote {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,475 @@
+"""
+End-to-end load harness: throughput, tail latency and memory under load.
+
+Boots the FastAPI app with uvicorn on a free local port (or targets --url)
+and drives /api/analyze, /layout-check, /extract-text and /analyze with a
+weighted mix of endpoints and documents from the synthetic resume corpus
+(benchmarks/resume_corpus.py). Two load models:
+
+    --concurrency N   closed loop: N clients, each sending its next request
+                      as soon as the previous one answers
+    --rps R           open loop: requests start on a fixed schedule whether
+                      or not earlier ones finished; latency is measured
+                      from the scheduled start, so a stalled server shows up
+                      in the tail instead of silently lowering the load
+
+Reports requests, throughput, p50/p95/p99/max latency and error rate per
+endpoint, and the peak resident memory of every server process (API
+workers, job workers, the parse-sandbox forkserver and its children),
+sampled from /proc while the test runs.
+
+Run with:
+    python benchmarks/load_test.py --concurrency 8 --duration 30
+    python benchmarks/load_test.py --rps 20 --workers 2 --mix api/analyze=3,analyze=1
+    python benchmarks/load_test.py --url http://127.0.0.1:8000 --concurrency 4   # running server
+Exits 1 when the error rate is above --max-error-rate.
+"""
+import argparse
+import http.client
+import json
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import urllib.parse
+import uuid
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCH_DIR = os.path.join(ROOT, "benchmarks")
+
+sys.path.insert(0, ROOT)
+sys.path.insert(0, BENCH_DIR)
+
+import resume_corpus  # noqa: E402
+from lib.process_stats import memory_kb  # noqa: E402
+
+ENDPOINTS = ("api/analyze", "layout-check", "extract-text", "analyze")
+# Endpoints that only accept PDFs
+_PDF_ONLY = {"layout-check", "extract-text"}
+_UPLOAD_CASES = ("short", "long", "two_column", "table_heavy", "scanned", "docx")
+_CONTENT_TYPES = {
+    ".pdf": "application/pdf",
+    ".docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+}
+# Job role sent with /analyze bodies
+_ROLE_SKILLS = ["Python", "SQL", "Docker", "Kubernetes", "AWS", "React", "PostgreSQL", "Kafka",
+                "Terraform", "GraphQL", "Go", "Spark"]
+
+DEFAULT_MIX = "api/analyze=4,layout-check=2,extract-text=2,analyze=2"
+# "scanned" is left out by default: an image-only PDF fails /api/analyze with
+# 500 (both text extractors raise before the OCR fallback); add it with --docs
+DEFAULT_DOCS = "short=4,long=2,two_column=2,table_heavy=1,docx=1"
+
+
+def parse_weights(spec: str, allowed) -> dict:
+    """"a=3,b=1" -> {"a": 3.0, "b": 1.0}, rejecting unknown names."""
+    weights = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        name, _, weight = item.partition("=")
+        name = name.strip().strip("/")
+        if name not in allowed:
+            raise ValueError(f"unknown name '{name}' (expected one of: {', '.join(allowed)})")
+        weights[name] = float(weight) if weight else 1.0
+    if not weights or sum(weights.values()) <= 0:
+        raise ValueError(f"'{spec}' selects nothing")
+    return weights
+
+
+def _multipart(filename: str, data: bytes, content_type: str) -> tuple:
+    boundary = uuid.uuid4().hex
+    body = (
+        f"--{boundary}\r\n"
+        f'Content-Disposition: form-data; name="file"; filename="{filename}"\r\n'
+        f"Content-Type: {content_type}\r\n\r\n"
+    ).encode("ascii") + data + f"\r\n--{boundary}--\r\n".encode("ascii")
+    return body, f"multipart/form-data; boundary={boundary}"
+
+
+class Workload:
+    """Pre-encoded requests, drawn by endpoint and document weights."""
+
+    def __init__(self, mix: dict, docs: dict, mode: str, seed: int = 0):
+        corpus = resume_corpus.write_corpus()
+        self.rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.requests = {}  # endpoint -> ([(path, body, content type)], [weight])
+        for endpoint, weight in mix.items():
+            choices, weights = [], []
+            for case, doc_weight in docs.items():
+                ext = os.path.splitext(corpus[case])[1]
+                if endpoint in _PDF_ONLY and ext != ".pdf":
+                    continue
+                if endpoint == "analyze":
+                    text = "\n".join(resume_corpus.resume_lines(
+                        resume_corpus.resume_content(random.Random(f"{seed}:{case}"))
+                    ))
+                    body = json.dumps({"resume_text": text, "job_role_skills": _ROLE_SKILLS}).encode("utf-8")
+                    choices.append(("/analyze", body, "application/json"))
+                else:
+                    with open(corpus[case], "rb") as f:
+                        body, content_type = _multipart(case + ext, f.read(), _CONTENT_TYPES[ext])
+                    path = f"/{endpoint}" if endpoint == "extract-text" else f"/{endpoint}?mode={mode}"
+                    choices.append((path, body, content_type))
+                weights.append(doc_weight)
+            if choices:
+                self.requests[endpoint] = (choices, weights)
+        self.endpoints = list(self.requests)
+        self.endpoint_weights = [mix[endpoint] for endpoint in self.endpoints]
+
+    def draw(self) -> tuple:
+        with self._lock:
+            endpoint = self.rng.choices(self.endpoints, self.endpoint_weights)[0]
+            choices, weights = self.requests[endpoint]
+            return (endpoint,) + self.rng.choices(choices, weights)[0]
+
+
+class Recorder:
+    """Latency and status of every completed request, by endpoint."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies = defaultdict(list)  # endpoint -> [seconds]
+        self.statuses = defaultdict(Counter)  # endpoint -> {status or error name: count}
+        self.started = None
+        self.finished = None
+
+    def add(self, endpoint: str, seconds: float, status) -> None:
+        with self._lock:
+            self.latencies[endpoint].append(seconds)
+            self.statuses[endpoint][status] += 1
+
+
+class _Client(threading.local):
+    """One keep-alive connection per client thread."""
+
+    def __init__(self, host: str, port: int, timeout: float):
+        self.host, self.port, self.timeout = host, port, timeout
+        self.conn = None
+
+    def send(self, path: str, body: bytes, content_type: str):
+        for attempt in range(2):
+            if self.conn is None:
+                self.conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+            try:
+                self.conn.request("POST", path, body=body, headers={"Content-Type": content_type})
+                response = self.conn.getresponse()
+                response.read()
+                return response.status
+            except (ConnectionError, http.client.RemoteDisconnected, http.client.BadStatusLine):
+                # The server may close an idle keep-alive connection; retry once on a new one
+                self.conn.close()
+                self.conn = None
+                if attempt:
+                    raise
+            except Exception:
+                self.conn.close()
+                self.conn = None
+                raise
+
+
+def _issue(client: _Client, workload: Workload, recorder: Recorder, scheduled: float, record: bool) -> None:
+    endpoint, path, body, content_type = workload.draw()
+    try:
+        status = client.send(path, body, content_type)
+    except Exception as e:
+        status = type(e).__name__
+    if record:
+        recorder.add(endpoint, time.perf_counter() - scheduled, status)
+
+
+def run_closed(client, workload, recorder, concurrency: int, warmup: float, duration: float) -> None:
+    record_from = time.perf_counter() + warmup
+    stop_at = record_from + duration
+
+    def loop():
+        while True:
+            started = time.perf_counter()
+            if started >= stop_at:
+                return
+            _issue(client, workload, recorder, started, started >= record_from)
+
+    threads = [threading.Thread(target=loop, daemon=True) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    recorder.started = record_from
+    for thread in threads:
+        thread.join()
+    recorder.finished = time.perf_counter()
+
+
+def run_open(client, workload, recorder, rps: float, max_inflight: int, warmup: float, duration: float) -> None:
+    interval = 1.0 / rps
+    started = time.perf_counter()
+    record_from = started + warmup
+    stop_at = record_from + duration
+    recorder.started = record_from
+    with ThreadPoolExecutor(max_workers=max_inflight) as pool:
+        index = 0
+        while True:
+            scheduled = started + index * interval
+            if scheduled >= stop_at:
+                break
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            # Latency counts from `scheduled`, including any wait for a free client
+            pool.submit(_issue, client, workload, recorder, scheduled, scheduled >= record_from)
+            index += 1
+    recorder.finished = time.perf_counter()
+
+
+def _descendants(root: int) -> dict:
+    """{pid: parent pid} for root and every process below it."""
+    parents = {}
+    for entry in os.listdir("/proc"):
+        if entry.isdigit():
+            try:
+                with open(f"/proc/{entry}/stat", "r") as f:
+                    # The command name may contain spaces; fields resume after its ")"
+                    parents[int(entry)] = int(f.read().rsplit(")", 1)[1].split()[1])
+            except (OSError, IndexError, ValueError):
+                continue
+    tree, frontier = {root: parents.get(root, 0)}, [root]
+    while frontier:
+        parent = frontier.pop()
+        for pid, ppid in parents.items():
+            if ppid == parent and pid not in tree:
+                tree[pid] = parent
+                frontier.append(pid)
+    return tree
+
+
+def _cmdline(pid: int) -> str:
+    try:
+        with open(f"/proc/{pid}/cmdline", "rb") as f:
+            return f.read().replace(b"\0", b" ").decode("utf-8", "replace")
+    except OSError:
+        return ""
+
+
+class MemorySampler:
+    """Peak RSS of every process in the server's tree, sampled from /proc."""
+
+    def __init__(self, root: int, workers: int, interval: float = 0.2):
+        self.root = root
+        self.workers = workers
+        self.interval = interval
+        self.processes = {}  # pid -> {"role", "peak_kb", "rss_kb"}
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="memory-sampler", daemon=True)
+
+    def start(self) -> "MemorySampler":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _role(self, pid: int, tree: dict) -> str:
+        cmdline = _cmdline(pid)
+        if "resource_tracker" in cmdline:
+            return "resource tracker"
+        if "forkserver" in cmdline:
+            # Sandbox children are forked from the forkserver and keep its command line
+            return "sandbox child" if "forkserver" in _cmdline(tree.get(pid, 0)) else "sandbox forkserver"
+        if pid == self.root:
+            return "api worker" if self.workers == 1 else "supervisor"
+        if self.workers > 1 and tree.get(pid) == self.root:
+            return "api worker"
+        return "job worker" if "spawn_main" in cmdline else "other"
+
+    def _run(self) -> None:
+        while True:
+            tree = _descendants(self.root)
+            for pid in tree:
+                memory = memory_kb(pid)
+                if not memory:
+                    continue
+                process = self.processes.get(pid)
+                if process is None:
+                    process = self.processes[pid] = {"role": self._role(pid, tree), "peak_kb": 0}
+                process["rss_kb"] = memory.get("rss_kb", 0)
+                process["peak_kb"] = max(process["peak_kb"], memory.get("peak_rss_kb", 0), process["rss_kb"])
+            if self._stop.wait(self.interval):
+                return
+
+    def summary(self) -> list:
+        """Rows of (role, pid or count, peak MB); sandbox children are folded into one row."""
+        rows, children = [], []
+        for pid, process in sorted(self.processes.items()):
+            if process["role"] == "sandbox child":
+                children.append(process["peak_kb"])
+            else:
+                rows.append({"role": process["role"], "pid": pid, "peak_rss_mb": round(process["peak_kb"] / 1024, 1)})
+        if children:
+            rows.append({
+                "role": "sandbox child",
+                "count": len(children),
+                "peak_rss_mb": round(max(children) / 1024, 1),
+            })
+        return rows
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(workers: int, port: int, timeout: float = 60.0) -> subprocess.Popen:
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning"],
+        cwd=ROOT
+    )
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"server exited with code {server.returncode} during startup")
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=2)
+            conn.request("GET", "/health")
+            if conn.getresponse().status == 200:
+                return server
+        except OSError:
+            pass
+        time.sleep(0.2)
+    server.terminate()
+    raise RuntimeError(f"server not healthy after {timeout:.0f}s")
+
+
+def stop_server(server: subprocess.Popen) -> None:
+    server.terminate()
+    try:
+        server.wait(timeout=15)
+    except subprocess.TimeoutExpired:
+        server.kill()
+        server.wait()
+
+
+def _percentile(ordered: list, q: float) -> float:
+    """Nearest-rank percentile of an ascending list."""
+    return ordered[max(0, min(len(ordered) - 1, int(round(q / 100 * len(ordered) + 0.5)) - 1))]
+
+
+def summarize(recorder: Recorder) -> dict:
+    wall = max(recorder.finished - recorder.started, 1e-9)
+    endpoints = {}
+    for name in list(recorder.latencies) + ["total"]:
+        if name == "total":
+            latencies = [s for values in recorder.latencies.values() for s in values]
+            statuses = sum(recorder.statuses.values(), Counter())
+        else:
+            latencies, statuses = recorder.latencies[name], recorder.statuses[name]
+        if not latencies:
+            continue
+        ordered = sorted(latencies)
+        errors = sum(count for status, count in statuses.items() if not (isinstance(status, int) and status < 400))
+        endpoints[name] = {
+            "requests": len(ordered),
+            "throughput_rps": round(len(ordered) / wall, 2),
+            "error_rate": round(errors / len(ordered), 4),
+            "p50_ms": round(_percentile(ordered, 50) * 1000, 1),
+            "p95_ms": round(_percentile(ordered, 95) * 1000, 1),
+            "p99_ms": round(_percentile(ordered, 99) * 1000, 1),
+            "max_ms": round(ordered[-1] * 1000, 1),
+            "mean_ms": round(statistics.fmean(ordered) * 1000, 1),
+            "statuses": {str(status): count for status, count in sorted(statuses.items(), key=str)},
+        }
+    return {"wall_seconds": round(wall, 2), "endpoints": endpoints}
+
+
+def print_report(results: dict) -> None:
+    print(f"\n{'endpoint':14} {'requests':>8} {'rps':>8} {'errors':>7} "
+          f"{'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}  statuses")
+    for name, row in results["endpoints"].items():
+        statuses = " ".join(f"{status}:{count}" for status, count in row["statuses"].items())
+        print(f"{name:14} {row['requests']:>8} {row['throughput_rps']:>8.2f} {row['error_rate']:>7.2%} "
+              f"{row['p50_ms']:>9.1f} {row['p95_ms']:>9.1f} {row['p99_ms']:>9.1f} {row['max_ms']:>9.1f}  {statuses}")
+    if results.get("memory"):
+        print(f"\n{'process':20} {'pid':>8} {'peak RSS':>10}")
+        for row in results["memory"]:
+            ident = row["pid"] if "pid" in row else f"{row['count']}x"
+            print(f"{row['role']:20} {ident:>8} {row['peak_rss_mb']:>7.1f} MB")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    load = parser.add_mutually_exclusive_group()
+    load.add_argument("--concurrency", type=int, default=4, help="closed-loop clients (default)")
+    load.add_argument("--rps", type=float, help="open-loop request rate instead of --concurrency")
+    parser.add_argument("--max-inflight", type=int, default=64, help="open loop: most concurrent requests")
+    parser.add_argument("--duration", type=float, default=20.0, help="measured seconds")
+    parser.add_argument("--warmup", type=float, default=3.0, help="unmeasured seconds before that")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"endpoint weights (default {DEFAULT_MIX})")
+    parser.add_argument("--docs", default=DEFAULT_DOCS, help=f"document weights (default {DEFAULT_DOCS})")
+    parser.add_argument("--mode", default="balanced", help="analysis mode for /api/analyze and /layout-check")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes to boot")
+    parser.add_argument("--url", help="load an already running server instead of booting one")
+    parser.add_argument("--timeout", type=float, default=120.0, help="per-request timeout in seconds")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write the results JSON here")
+    parser.add_argument("--max-error-rate", type=float, default=0.01, help="exit 1 above this overall rate")
+    args = parser.parse_args()
+
+    try:
+        workload = Workload(
+            parse_weights(args.mix, ENDPOINTS), parse_weights(args.docs, _UPLOAD_CASES), args.mode, args.seed
+        )
+    except ValueError as e:
+        parser.error(str(e))
+
+    server = sampler = None
+    if args.url:
+        target = urllib.parse.urlsplit(args.url)
+        host, port = target.hostname, target.port or 80
+    else:
+        host, port = "127.0.0.1", _free_port()
+        print(f"Starting {args.workers} uvicorn worker(s) on port {port}...")
+        server = start_server(args.workers, port)
+        sampler = MemorySampler(server.pid, args.workers).start()
+
+    client = _Client(host, port, args.timeout)
+    recorder = Recorder()
+    load_desc = f"{args.rps} rps" if args.rps else f"concurrency {args.concurrency}"
+    print(f"Load: {load_desc}, {args.warmup:.0f}s warmup + {args.duration:.0f}s, mode {args.mode}")
+    try:
+        if args.rps:
+            run_open(client, workload, recorder, args.rps, args.max_inflight, args.warmup, args.duration)
+        else:
+            run_closed(client, workload, recorder, args.concurrency, args.warmup, args.duration)
+    finally:
+        if sampler is not None:
+            sampler.stop()
+        if server is not None:
+            stop_server(server)
+
+    results = summarize(recorder)
+    results["load"] = {"rps": args.rps} if args.rps else {"concurrency": args.concurrency}
+    results.update(mode=args.mode, workers=args.workers, mix=args.mix, docs=args.docs)
+    results["memory"] = sampler.summary() if sampler is not None else []
+    print_report(results)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+            f.write("\n")
+        print(f"Wrote {args.output}")
+
+    total = results["endpoints"].get("total")
+    if total is None:
+        print("FAIL no requests completed")
+        sys.exit(1)
+    if total["error_rate"] > args.max_error_rate:
+        print(f"FAIL error rate {total['error_rate']:.2%} above {args.max_error_rate:.2%}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""
+Regression benchmark for sandboxed document parsing.
+
+Runs every case of the pathological PDF corpus (benchmarks/pdf_corpus.py)
+through the sandboxed parsers the service uses and checks, per case, that
+parsing ends within its time budget with an expected outcome. The parent
+process must stay alive and its memory must not grow with the corpus.
+
+Run with:
+    python benchmarks/parse_sandbox.py            # check against parse_sandbox_budget.json
+    python benchmarks/parse_sandbox.py --report   # also rewrite parse_sandbox_report.txt
+Exits 1 when a case is over budget, ends with an unexpected outcome or the
+parent's RSS grows more than allowed.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCH_DIR = os.path.join(ROOT, "benchmarks")
+BUDGET_PATH = os.path.join(BENCH_DIR, "parse_sandbox_budget.json")
+REPORT_PATH = os.path.join(BENCH_DIR, "parse_sandbox_report.txt")
+
+sys.path.insert(0, ROOT)
+sys.path.insert(0, BENCH_DIR)
+
+with open(BUDGET_PATH, "r", encoding="utf-8") as f:
+    BUDGET = json.load(f)
+# lib.sandbox reads its limits at import time
+for key, value in BUDGET["limits"].items():
+    os.environ.setdefault(key, str(value))
+
+from pdf_corpus import write_corpus  # noqa: E402
+from lib.analysis_modes import Deadline  # noqa: E402
+from lib.pdf_utils import ats_layout_from_pdf, extract_pdf_text  # noqa: E402
+from lib.process_stats import memory_kb  # noqa: E402
+from lib.sandbox import SandboxError, run_sandboxed  # noqa: E402
+from app.services.resume_parser import ResumeParser  # noqa: E402
+
+
+def _extract_text(path: str) -> None:
+    with open(path, "rb") as f:
+        run_sandboxed(extract_pdf_text, f.read())
+
+
+def _layout_check(path: str) -> None:
+    with open(path, "rb") as f:
+        run_sandboxed(ats_layout_from_pdf, f.read(), "balanced")
+
+
+def _resume_parser(path: str) -> None:
+    ResumeParser().parse(path, ".pdf", mode="balanced", deadline=Deadline(0))
+
+
+# The sandboxed call each service entrypoint makes for an upload
+_PARSERS = {
+    "extract-text": _extract_text,
+    "layout-check": _layout_check,
+    "resume-parser": _resume_parser,
+}
+
+
+def run_case(parser: str, path: str) -> tuple:
+    """(outcome, milliseconds): "ok", "error" (parser raised) or a SandboxError reason."""
+    started = time.perf_counter()
+    try:
+        _PARSERS[parser](path)
+        outcome = "ok"
+    except SandboxError as e:
+        outcome = e.reason
+    except Exception:
+        outcome = "error"
+    return outcome, round((time.perf_counter() - started) * 1000, 1)
+
+
+def measure(paths: dict) -> dict:
+    results = {}
+    for case, path in paths.items():
+        for parser in _PARSERS:
+            results[f"{case} {parser}"] = run_case(parser, path)
+    return results
+
+
+def check(results: dict, budget: dict, rss_growth_kb: int) -> list:
+    """Return one message per budget violation."""
+    failures = []
+    for key, (outcome, ms) in results.items():
+        case = key.split()[0]
+        limits = budget["cases"][case]
+        if outcome not in limits["outcomes"]:
+            failures.append(f"{key}: outcome {outcome}, expected one of {limits['outcomes']}")
+        if ms > limits["max_ms"]:
+            failures.append(f"{key}: {ms} ms exceeds budget {limits['max_ms']} ms")
+    if rss_growth_kb > budget["max_parent_rss_growth_kb"]:
+        failures.append(
+            f"parent RSS grew {rss_growth_kb} kB (budget {budget['max_parent_rss_growth_kb']} kB)"
+        )
+    return failures
+
+
+def write_report(results: dict, rss_growth_kb: int) -> None:
+    lines = [
+        "# Sandboxed parsing of the pathological PDF corpus",
+        f"# python {sys.version.split()[0]}; limits {BUDGET['limits']}",
+        "# regenerate with: python benchmarks/parse_sandbox.py --report",
+        "",
+    ]
+    for key, (outcome, ms) in results.items():
+        lines.append(f"{key:36} {outcome:8} {ms:9.1f} ms")
+    lines.append("")
+    lines.append(f"parent RSS growth: {rss_growth_kb} kB")
+    with open(REPORT_PATH, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--corpus", default=None, help="corpus directory (default: benchmarks/corpus/)")
+    parser.add_argument("--report", action="store_true", help=f"rewrite {os.path.basename(REPORT_PATH)}")
+    args = parser.parse_args()
+
+    paths = write_corpus(args.corpus) if args.corpus else write_corpus()
+    # Warm the sandbox on the control document so startup is not billed to a case
+    run_case("extract-text", paths["control"])
+    rss_before = memory_kb().get("rss_kb", 0)
+    results = measure(paths)
+    rss_growth_kb = memory_kb().get("rss_kb", 0) - rss_before
+
+    for key, (outcome, ms) in results.items():
+        limit = BUDGET["cases"].get(key.split()[0], {}).get("max_ms", "-")
+        print(f"{key:36} {outcome:8} {ms:9.1f} ms  (budget {limit} ms)")
+    print(f"parent RSS growth: {rss_growth_kb} kB")
+    if args.report:
+        write_report(results, rss_growth_kb)
+        print(f"Wrote {REPORT_PATH}")
+
+    failures = check(results, BUDGET, rss_growth_kb)
+    for failure in failures:
+        print(f"FAIL {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+"""
+Pathological PDF corpus for the parse sandbox benchmark.
+
+Every case is generated deterministically, so the corpus is not checked in.
+Each targets a known way to make pypdf / pdfminer spin or allocate without
+bound; a well-formed control document is included so the sandbox overhead
+on normal uploads is measured too.
+
+Run with:
+    python benchmarks/pdf_corpus.py [OUTPUT_DIR]   # default: benchmarks/corpus/
+"""
+import os
+import sys
+import zlib
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CORPUS_DIR = os.path.join(ROOT, "benchmarks", "corpus")
+
+_FONT = b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"
+
+
+def _pdf(objects: list, root: int = 1, trailer_extra: bytes = b"") -> bytes:
+    """Assemble numbered objects (1-based, in order) with a valid xref table."""
+    out = bytearray(b"%PDF-1.7\n%\xe2\xe3\xcf\xd3\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for offset in offsets:
+        out += b"%010d 00000 n \n" % offset
+    out += b"trailer\n<< /Size %d /Root %d 0 R %s>>\nstartxref\n%d\n%%%%EOF\n" % (
+        len(objects) + 1, root, trailer_extra, xref
+    )
+    return bytes(out)
+
+
+def _stream(data: bytes, compress: bool = False) -> bytes:
+    if compress:
+        data = zlib.compress(data, 9)
+        return b"<< /Length %d /Filter /FlateDecode >>\nstream\n" % len(data) + data + b"\nendstream"
+    return b"<< /Length %d >>\nstream\n" % len(data) + data + b"\nendstream"
+
+
+def _single_page(content: bytes, resources: bytes = b"<< /Font << /F1 4 0 R >> >>") -> list:
+    return [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Resources %s /Contents 5 0 R >>"
+        % resources,
+        _FONT,
+        content,
+    ]
+
+
+def control() -> bytes:
+    """A small, valid one-page resume."""
+    lines = [
+        "Jane Doe", "jane.doe@example.com | (555) 010-0000", "Experience",
+        "Senior Engineer - Built data pipelines in Python and SQL", "Education", "BSc Computer Science",
+    ]
+    ops = b"BT /F1 11 Tf 72 720 Td 14 TL " + b" ".join(
+        b"(%s) Tj T*" % line.encode("latin-1") for line in lines
+    ) + b" ET"
+    return _pdf(_single_page(_stream(ops)))
+
+
+def flate_bomb(expanded_mb: int = 512) -> bytes:
+    """Content stream that inflates from ~0.5MB to `expanded_mb` of whitespace."""
+    compressor = zlib.compressobj(9)
+    block = b" " * (16 * 1024 * 1024)
+    data = bytearray()
+    for _ in range(expanded_mb // 16):
+        data += compressor.compress(block)
+    data += compressor.flush()
+    body = b"<< /Length %d /Filter /FlateDecode >>\nstream\n" % len(data) + bytes(data) + b"\nendstream"
+    return _pdf(_single_page(body))
+
+
+def operator_flood(operations: int = 400_000) -> bytes:
+    """A few kB of compressed content that expands to hundreds of thousands of glyphs."""
+    ops = b"BT /F1 1 Tf " + b"1 0 Td (x) Tj " * operations + b"ET"
+    return _pdf(_single_page(_stream(ops, compress=True)))
+
+
+def nested_arrays(depth: int = 200_000) -> bytes:
+    """Resources dictionary nested far beyond any recursion limit."""
+    nested = b"[" * depth + b"]" * depth
+    return _pdf(_single_page(_stream(b"BT ET"), resources=b"<< /Nest %s /Font << /F1 4 0 R >> >>" % nested))
+
+
+def page_tree_cycle() -> bytes:
+    """Pages node that lists itself as a kid."""
+    objects = _single_page(_stream(b"BT /F1 11 Tf 72 720 Td (loop) Tj ET"))
+    objects[1] = b"<< /Type /Pages /Kids [3 0 R 2 0 R] /Count 2 >>"
+    return _pdf(objects)
+
+
+def xref_prev_loop() -> bytes:
+    """Trailer whose /Prev points back at its own xref section."""
+    base = _pdf(_single_page(_stream(b"BT /F1 11 Tf 72 720 Td (prev) Tj ET")))
+    startxref = int(base.rsplit(b"startxref\n", 1)[1].split(b"\n", 1)[0])
+    return base.replace(b"/Root 1 0 R ", b"/Root 1 0 R /Prev %d " % startxref)
+
+
+def many_pages(pages: int = 20_000) -> bytes:
+    """Thousands of pages sharing one content stream."""
+    kids = b" ".join(b"%d 0 R" % (5 + i) for i in range(pages))
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, pages),
+        _stream(b"BT /F1 11 Tf 72 720 Td (Page of a very long resume) Tj ET"),
+        _FONT,
+    ]
+    page = b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Resources << /Font << /F1 4 0 R >> >> /Contents 3 0 R >>"
+    objects.extend(page for _ in range(pages))
+    return _pdf(objects)
+
+
+def huge_object_stream() -> bytes:
+    """Object stream that claims ten million embedded objects."""
+    objects = _single_page(_stream(b"BT /F1 11 Tf 72 720 Td (objstm) Tj ET"))
+    header = b"6 0 "
+    data = zlib.compress(header + b"<< /Filler true >>")
+    objects.append(
+        b"<< /Type /ObjStm /N 10000000 /First %d /Length %d /Filter /FlateDecode >>\nstream\n"
+        % (len(header), len(data)) + data + b"\nendstream"
+    )
+    return _pdf(objects)
+
+
+def truncated() -> bytes:
+    """Valid header followed by a cut-off body and no xref."""
+    return control()[:400]
+
+
+CASES = {
+    "control": control,
+    "flate_bomb": flate_bomb,
+    "operator_flood": operator_flood,
+    "nested_arrays": nested_arrays,
+    "page_tree_cycle": page_tree_cycle,
+    "xref_prev_loop": xref_prev_loop,
+    "many_pages": many_pages,
+    "huge_object_stream": huge_object_stream,
+    "truncated": truncated,
+}
+
+
+def write_corpus(directory: str = CORPUS_DIR) -> dict:
+    """Write every case to `directory`; return {case: path}."""
+    os.makedirs(directory, exist_ok=True)
+    paths = {}
+    for name, build in CASES.items():
+        path = os.path.join(directory, f"{name}.pdf")
+        if not os.path.exists(path):
+            with open(path, "wb") as f:
+                f.write(build())
+        paths[name] = path
+    return paths
+
+
+if __name__ == "__main__":
+    for name, path in write_corpus(sys.argv[1] if len(sys.argv) > 1 else CORPUS_DIR).items():
+        print(f"{name:20} {os.path.getsize(path):>10} bytes  {path}")
@@ -0,0 +1,270 @@
+"""
+Synthetic resume corpus for the hot-path benchmarks and the load harness.
+
+Every document is generated deterministically (fixed seed), so the corpus is
+not checked in. Cases cover the layouts the parser treats differently:
+
+    short         one-page single-column PDF
+    long          four-page single-column PDF
+    two_column    two-column PDF (sidebar of skills next to the experience)
+    table_heavy   PDF whose experience and skills are ruled tables
+    scanned       image-only PDF (no text layer; what OCR sees)
+    docx          Word document with a skills table
+    ocr_text      noisy Tesseract-style output of the scanned case (.txt)
+
+Run with:
+    python benchmarks/resume_corpus.py [OUTPUT_DIR]   # default: benchmarks/corpus/resumes/
+"""
+import io
+import os
+import random
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CORPUS_DIR = os.path.join(ROOT, "benchmarks", "corpus", "resumes")
+
+_SEED = 2024
+
+_NAMES = ["Jane Doe", "Arjun Mehta", "Sara Lindqvist", "Omar Haddad", "Mei Chen", "Lucas Moreau"]
+_TITLES = ["Senior Software Engineer", "Data Scientist", "Backend Developer", "DevOps Engineer",
+           "Full Stack Developer", "Machine Learning Engineer"]
+_COMPANIES = ["Acme Corp", "Northwind Labs", "Globex", "Initech", "Umbrella Analytics", "Stark Systems"]
+_SKILLS = ["Python", "JavaScript", "TypeScript", "Java", "Go", "SQL", "React", "Node.js", "Django",
+           "FastAPI", "Flask", "Spring Boot", "Docker", "Kubernetes", "AWS", "GCP", "Terraform",
+           "PostgreSQL", "MongoDB", "Redis", "Kafka", "Spark", "Pandas", "TensorFlow", "PyTorch",
+           "Git", "Jenkins", "GraphQL", "REST APIs", "Linux", "Agile", "Scrum", "Leadership",
+           "Communication", "Mentoring"]
+_VERBS = ["Developed", "Designed", "Led", "Built", "Optimized", "Automated", "Migrated", "Implemented",
+          "Reduced", "Improved", "Architected", "Delivered", "Scaled", "Mentored", "Streamlined"]
+_OBJECTS = ["a payment processing service", "the data ingestion pipeline", "customer-facing REST APIs",
+            "the CI/CD workflow", "a recommendation engine", "internal analytics dashboards",
+            "the search indexing cluster", "microservices on Kubernetes", "the mobile backend",
+            "real-time event streaming"]
+_RESULTS = ["cutting latency by {n}%", "serving {n}k daily users", "saving ${n}k per year",
+            "improving throughput by {n}%", "reducing incidents by {n}%", "for a team of {n} engineers"]
+
+
+def resume_content(rng: random.Random, jobs: int = 3, bullets: int = 4, projects: int = 2) -> dict:
+    """Sections of one synthetic resume, as plain strings."""
+    name = rng.choice(_NAMES)
+    first, last = name.lower().split()
+    years = sorted(rng.sample(range(2008, 2024), jobs * 2), reverse=True)
+    experience = []
+    for index in range(jobs):
+        experience.append({
+            "title": rng.choice(_TITLES),
+            "company": rng.choice(_COMPANIES),
+            "dates": f"Jan {years[index * 2 + 1]} - {'Present' if index == 0 else f'Dec {years[index * 2]}'}",
+            "bullets": [
+                f"{rng.choice(_VERBS)} {rng.choice(_OBJECTS)} using {', '.join(rng.sample(_SKILLS, 2))}, "
+                + rng.choice(_RESULTS).format(n=rng.randint(10, 90))
+                for _ in range(bullets)
+            ],
+        })
+    return {
+        "name": name,
+        "contact": f"{first}.{last}@example.com | (555) {rng.randint(100, 999)}-{rng.randint(1000, 9999)}"
+                   f" | linkedin.com/in/{first}{last} | github.com/{first}{last}",
+        "summary": f"{rng.choice(_TITLES)} with {rng.randint(3, 15)} years of experience building reliable, "
+                   "scalable systems and leading cross-functional delivery.",
+        "experience": experience,
+        "education": [
+            "Bachelor of Science in Computer Science",
+            f"State University {years[-1] - 4} - {years[-1]} GPA: 3.{rng.randint(2, 9)}",
+        ],
+        "skills": rng.sample(_SKILLS, 18),
+        "projects": [
+            {
+                "name": f"{rng.choice(['Resume', 'Chat', 'Budget', 'Fleet', 'Recipe'])} "
+                        f"{rng.choice(['Analyzer', 'Tracker', 'Planner', 'Hub'])}",
+                "tech": ", ".join(rng.sample(_SKILLS, 3)),
+                "bullet": f"{rng.choice(_VERBS)} features used by {rng.randint(2, 50)}00 users",
+            }
+            for _ in range(projects)
+        ],
+    }
+
+
+def resume_lines(content: dict) -> list:
+    """Single-column reading order of a resume, one string per line."""
+    lines = [content["name"], content["contact"], "", "Summary", content["summary"], "", "Experience"]
+    for job in content["experience"]:
+        lines += [job["title"], f"{job['company']} {job['dates']}"]
+        lines += [f"- {bullet}" for bullet in job["bullets"]]
+    lines += ["", "Education"] + content["education"]
+    lines += ["", "Skills", ", ".join(content["skills"]), "", "Projects"]
+    for project in content["projects"]:
+        lines += [project["name"], f"Tech: {project['tech']}", f"- {project['bullet']}"]
+    return lines
+
+
+def _canvas(buffer):
+    from reportlab.lib.pagesizes import letter
+    from reportlab.pdfgen import canvas
+    return canvas.Canvas(buffer, pagesize=letter), letter
+
+
+def _write_lines(pdf, lines: list, x: float, top: float, width_chars: int, size: float = 9.5) -> None:
+    """Draw lines top-down from `top`, wrapping and starting new pages as needed."""
+    import textwrap
+    y = top
+    for line in lines:
+        for part in textwrap.wrap(line, width_chars) or [""]:
+            if y < 54:
+                pdf.showPage()
+                y = top
+            pdf.setFont("Helvetica-Bold" if part in ("Summary", "Experience", "Education", "Skills", "Projects")
+                         else "Helvetica", size)
+            pdf.drawString(x, y, part)
+            y -= size * 1.45
+
+
+def short() -> bytes:
+    buffer = io.BytesIO()
+    pdf, (width, height) = _canvas(buffer)
+    _write_lines(pdf, resume_lines(resume_content(random.Random(_SEED))), 54, height - 54, 105)
+    pdf.save()
+    return buffer.getvalue()
+
+
+def long() -> bytes:
+    buffer = io.BytesIO()
+    pdf, (width, height) = _canvas(buffer)
+    content = resume_content(random.Random(_SEED + 1), jobs=7, bullets=8, projects=6)
+    _write_lines(pdf, resume_lines(content), 54, height - 54, 105)
+    pdf.save()
+    return buffer.getvalue()
+
+
+def two_column() -> bytes:
+    buffer = io.BytesIO()
+    pdf, (width, height) = _canvas(buffer)
+    content = resume_content(random.Random(_SEED + 2), jobs=4, bullets=5)
+    sidebar = ["Contact"] + content["contact"].split(" | ") + ["", "Skills"] + content["skills"]
+    sidebar += ["", "Education"] + content["education"]
+    main = [content["name"], "", "Summary", content["summary"], "", "Experience"]
+    for job in content["experience"]:
+        main += [job["title"], f"{job['company']} {job['dates']}"] + [f"- {b}" for b in job["bullets"]]
+    _write_lines(pdf, sidebar, 36, height - 54, 32)
+    _write_lines(pdf, main, 230, height - 54, 70)
+    pdf.save()
+    return buffer.getvalue()
+
+
+def table_heavy() -> bytes:
+    buffer = io.BytesIO()
+    pdf, (width, height) = _canvas(buffer)
+    content = resume_content(random.Random(_SEED + 3), jobs=5, bullets=2)
+    _write_lines(pdf, [content["name"], content["contact"], "", "Experience"], 54, height - 54, 105)
+    y = height - 130
+    rows = [("Role", "Company", "Dates")] + [(j["title"], j["company"], j["dates"]) for j in content["experience"]]
+    rows += [("Skill", "Level", "Years")] + [
+        (skill, random.Random(skill).choice(["Expert", "Advanced", "Intermediate"]), str(len(skill) % 7 + 1))
+        for skill in content["skills"]
+    ]
+    columns = (54, 250, 420, width - 54)
+    pdf.setFont("Helvetica", 9)
+    for row in rows:
+        for index, cell in enumerate(row):
+            pdf.drawString(columns[index] + 4, y + 5, cell)
+        pdf.line(columns[0], y, columns[-1], y)
+        pdf.line(columns[0], y + 18, columns[-1], y + 18)
+        for x in columns:
+            pdf.line(x, y, x, y + 18)
+        y -= 18
+        if y < 72:
+            pdf.showPage()
+            pdf.setFont("Helvetica", 9)
+            y = height - 72
+    pdf.save()
+    return buffer.getvalue()
+
+
+def scanned_page_image(dpi: int = 150):
+    """A letter-size page rendering the short resume as pixels, like a scan."""
+    from PIL import Image, ImageDraw, ImageFont
+    width, height = int(8.5 * dpi), int(11 * dpi)
+    image = Image.new("L", (width, height), 250)
+    draw = ImageDraw.Draw(image)
+    try:
+        font = ImageFont.load_default(size=dpi // 7)
+    except TypeError:  # Pillow < 10.1: fixed-size bitmap font
+        font = ImageFont.load_default()
+    y = dpi // 2
+    for line in resume_lines(resume_content(random.Random(_SEED))):
+        draw.text((dpi // 2, y), line[:95], fill=30, font=font)
+        y += dpi // 5
+    return image
+
+
+def scanned() -> bytes:
+    buffer = io.BytesIO()
+    scanned_page_image().save(buffer, format="PDF", resolution=150)
+    return buffer.getvalue()
+
+
+def docx() -> bytes:
+    import docx as python_docx
+    content = resume_content(random.Random(_SEED + 4), jobs=4, bullets=4)
+    document = python_docx.Document()
+    document.add_heading(content["name"], level=0)
+    document.add_paragraph(content["contact"])
+    for line in resume_lines(content)[3:]:
+        if line in ("Summary", "Experience", "Education", "Skills", "Projects"):
+            document.add_heading(line, level=1)
+        elif line:
+            document.add_paragraph(line)
+    table = document.add_table(rows=1, cols=2)
+    table.rows[0].cells[0].text, table.rows[0].cells[1].text = "Skill", "Years"
+    for skill in content["skills"]:
+        cells = table.add_row().cells
+        cells[0].text, cells[1].text = skill, str(len(skill) % 7 + 1)
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+def ocr_text() -> bytes:
+    """Tesseract-like output: page numbers, repeated headers, stray spacing and misreads."""
+    rng = random.Random(_SEED + 5)
+    lines = []
+    for page in range(1, 4):
+        lines += ["RESUME", ""]
+        for line in resume_lines(resume_content(rng, jobs=4, bullets=5)):
+            if rng.random() < 0.1:
+                line = line.replace("l", "1").replace("O", "0")
+            lines.append("  ".join(line.split(" ")) if rng.random() < 0.2 else line)
+            if rng.random() < 0.05:
+                lines.append(line)  # duplicated line
+        lines += ["", f"Page {page} of 3", "", "Confidential", ""]
+    return "\n".join(lines).encode("utf-8")
+
+
+# case -> (file extension, builder)
+CASES = {
+    "short": (".pdf", short),
+    "long": (".pdf", long),
+    "two_column": (".pdf", two_column),
+    "table_heavy": (".pdf", table_heavy),
+    "scanned": (".pdf", scanned),
+    "docx": (".docx", docx),
+    "ocr_text": (".txt", ocr_text),
+}
+
+
+def write_corpus(directory: str = CORPUS_DIR) -> dict:
+    """Write every case to `directory`; return {case: path}."""
+    os.makedirs(directory, exist_ok=True)
+    paths = {}
+    for name, (ext, build) in CASES.items():
+        path = os.path.join(directory, name + ext)
+        if not os.path.exists(path):
+            with open(path, "wb") as f:
+                f.write(build())
+        paths[name] = path
+    return paths
+
+
+if __name__ == "__main__":
+    for name, path in write_corpus(sys.argv[1] if len(sys.argv) > 1 else CORPUS_DIR).items():
+        print(f"{name:12} {os.path.getsize(path):>9} bytes  {path}")
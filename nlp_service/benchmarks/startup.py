@@ -0,0 +1,135 @@
+"""
+Cold-start benchmark for the FastAPI app and the Vercel handlers.
+
+Each entrypoint is imported in a fresh interpreter. Wall time is the median
+over several runs; one extra run under `python -X importtime` records which
+modules were loaded and what they cost.
+
+Run with:
+    python benchmarks/startup.py            # check against startup_budget.json
+    python benchmarks/startup.py --report   # also rewrite startup_report.txt
+Exits 1 when an entrypoint is over its budget or imports a forbidden module.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCH_DIR = os.path.join(ROOT, "benchmarks")
+BUDGET_PATH = os.path.join(BENCH_DIR, "startup_budget.json")
+REPORT_PATH = os.path.join(BENCH_DIR, "startup_report.txt")
+
+# How each entrypoint is loaded by its platform
+_LOADERS = {
+    "main.py": "import main",
+    "api/health.py": "import runpy; runpy.run_path('api/health.py')",
+    "api/analyze.py": "import runpy; runpy.run_path('api/analyze.py')",
+    "api/extract-text.py": "import runpy; runpy.run_path('api/extract-text.py')",
+    "api/layout-check.py": "import runpy; runpy.run_path('api/layout-check.py')",
+}
+
+_TIMED = (
+    "import sys, time; sys.path.insert(0, '.'); t = time.perf_counter(); {load}; "
+    "print((time.perf_counter() - t) * 1000)"
+)
+
+
+def time_import(entrypoint: str) -> float:
+    """Milliseconds to load one entrypoint in a fresh interpreter."""
+    code = _TIMED.format(load=_LOADERS[entrypoint])
+    out = subprocess.run(
+        [sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    return float(out.stdout.strip().splitlines()[-1])
+
+
+def import_profile(entrypoint: str) -> list:
+    """(module, self_us, cumulative_us) for every module the entrypoint loads."""
+    code = "import sys; sys.path.insert(0, '.'); " + _LOADERS[entrypoint]
+    out = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    modules = []
+    for line in out.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        modules.append((name.strip(), int(self_us), int(cumulative_us)))
+    return modules
+
+
+def measure(runs: int) -> dict:
+    results = {}
+    for entrypoint in _LOADERS:
+        times = [time_import(entrypoint) for _ in range(runs)]
+        results[entrypoint] = {
+            "median_ms": round(statistics.median(times), 1),
+            "modules": import_profile(entrypoint),
+        }
+    return results
+
+
+def write_report(results: dict, top: int = 15) -> None:
+    lines = [
+        "# Cold-start import report (python -X importtime)",
+        f"# python {sys.version.split()[0]}; regenerate with: python benchmarks/startup.py --report",
+        "",
+    ]
+    for entrypoint, result in results.items():
+        modules = result["modules"]
+        lines.append(
+            f"{entrypoint}: {result['median_ms']} ms median, {len(modules)} modules"
+        )
+        heaviest = sorted(modules, key=lambda m: m[2], reverse=True)[:top]
+        for name, self_us, cumulative_us in heaviest:
+            lines.append(f"  {cumulative_us / 1000:8.1f} ms cumulative {self_us / 1000:7.1f} ms self  {name}")
+        lines.append("")
+    with open(REPORT_PATH, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines))
+
+
+def check(results: dict, budget: dict) -> list:
+    """Return one message per budget violation."""
+    failures = []
+    for entrypoint, limits in budget["entrypoints"].items():
+        result = results[entrypoint]
+        if result["median_ms"] > limits["max_ms"]:
+            failures.append(
+                f"{entrypoint}: {result['median_ms']} ms exceeds budget {limits['max_ms']} ms"
+            )
+        loaded = {name for name, _, _ in result["modules"]}
+        for module in limits.get("forbidden_modules", []):
+            if module in loaded:
+                failures.append(f"{entrypoint}: imports {module} at startup")
+    return failures
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5, help="timed runs per entrypoint")
+    parser.add_argument("--report", action="store_true", help=f"rewrite {os.path.basename(REPORT_PATH)}")
+    args = parser.parse_args()
+
+    with open(BUDGET_PATH, "r", encoding="utf-8") as f:
+        budget = json.load(f)
+
+    results = measure(args.runs)
+    for entrypoint, result in results.items():
+        limit = budget["entrypoints"].get(entrypoint, {}).get("max_ms", "-")
+        print(f"{entrypoint:22} {result['median_ms']:8.1f} ms  (budget {limit} ms)")
+    if args.report:
+        write_report(results)
+        print(f"Wrote {REPORT_PATH}")
+
+    failures = check(results, budget)
+    for failure in failures:
+        print(f"FAIL {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""Analysis quality tiers (fast / balanced / thorough) and their latency budgets."""
+import os
+import time
+
+FAST = "fast"
+BALANCED = "balanced"
+THOROUGH = "thorough"
+DEFAULT_MODE = BALANCED
+
+# Optional stages per tier. Deadlines can be overridden per deployment with
+# ANALYSIS_DEADLINE_FAST / _BALANCED / _THOROUGH (seconds).
+ANALYSIS_MODES = {
+    FAST: {
+        "deadline_seconds": float(os.environ.get("ANALYSIS_DEADLINE_FAST", 0.2)),
+        "tables": False,
+        "images": False,
+        "ocr": False,
+        "suggestions": False,
+        "pdfplumber": False,
+        "page_ocr": False,
+        "column_reflow": False,
+    },
+    BALANCED: {
+        "deadline_seconds": float(os.environ.get("ANALYSIS_DEADLINE_BALANCED", 45)),
+        "tables": True,
+        "images": True,
+        "ocr": True,
+        "suggestions": True,
+        "pdfplumber": False,
+        "page_ocr": False,
+        "column_reflow": False,
+    },
+    THOROUGH: {
+        "deadline_seconds": float(os.environ.get("ANALYSIS_DEADLINE_THOROUGH", 90)),
+        "tables": True,
+        "images": True,
+        "ocr": True,
+        "suggestions": True,
+        "pdfplumber": True,
+        "page_ocr": True,
+        "column_reflow": True,
+    },
+}
+
+# Stages that distinguish a tier from the one below it
+_BALANCED_STAGES = {"tables", "images", "ocr", "suggestions"}
+_THOROUGH_STAGES = {"pdfplumber", "page_ocr", "column_reflow"}
+
+
+def resolve_mode(mode: str = None) -> str:
+    """Normalize a requested mode; raise ValueError for unknown tiers."""
+    mode = (mode or DEFAULT_MODE).strip().lower()
+    if mode not in ANALYSIS_MODES:
+        raise ValueError(
+            f"Invalid mode '{mode}'. Allowed modes: {', '.join(ANALYSIS_MODES)}"
+        )
+    return mode
+
+
+def effective_mode(requested: str, skipped_stages) -> str:
+    """Tier that actually ran once deadline-skipped stages are taken into account."""
+    skipped = set(skipped_stages)
+    if skipped & _BALANCED_STAGES:
+        return FAST
+    if requested == THOROUGH and skipped & _THOROUGH_STAGES:
+        return BALANCED
+    return requested
+
+
+class Deadline:
+    """Monotonic latency budget shared by the stages of one request.
+
+    The deadline is advisory: a stage that is already running is never
+    interrupted, but optional stages are skipped once the budget is spent.
+    """
+
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self.expires_at = time.monotonic() + seconds
+        self.skipped = []
+
+    @classmethod
+    def for_mode(cls, mode: str) -> "Deadline":
+        return cls(ANALYSIS_MODES[mode]["deadline_seconds"])
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self) -> bool:
+        return time.monotonic() >= self.expires_at
+
+    def allow(self, stage: str) -> bool:
+        """Return True if an optional stage may still run, recording skips."""
+        if self.expired():
+            if stage not in self.skipped:
+                self.skipped.append(stage)
+            return False
+        return True
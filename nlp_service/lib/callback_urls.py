@@ -0,0 +1,121 @@
+"""Validation and guarded delivery of job completion callbacks.
+
+A callback URL comes from the caller and receives the full analysis, so it
+must not reach the service's own network: loopback, private, link-local
+(e.g. the 169.254.169.254 metadata endpoint) and other non-global addresses
+are refused, unless the host is on JOB_CALLBACK_ALLOWED_HOSTS. The address
+check is repeated on the socket actually opened, so a DNS answer that
+changes after validation cannot redirect delivery; HTTP redirects and
+proxies are not followed.
+"""
+import http.client
+import ipaddress
+import os
+import socket
+import urllib.request
+from typing import Optional
+from urllib.parse import urlparse
+
+# Comma-separated callback hosts trusted even at internal addresses; when
+# set, callbacks to any other host are refused
+ALLOWED_HOSTS = frozenset(
+    host.strip().lower() for host in os.environ.get("JOB_CALLBACK_ALLOWED_HOSTS", "").split(",") if host.strip()
+)
+
+
+class CallbackURLError(ValueError):
+    """A callback URL the service refuses to deliver to."""
+
+
+def _host(url: str) -> str:
+    parsed = urlparse(url)
+    if parsed.scheme not in ("http", "https") or not parsed.hostname:
+        raise CallbackURLError("callback_url must be an http(s) URL.")
+    return parsed.hostname.lower()
+
+
+def _check_address(address: str) -> None:
+    ip = ipaddress.ip_address(address.split("%", 1)[0])
+    if isinstance(ip, ipaddress.IPv6Address) and ip.ipv4_mapped:
+        ip = ip.ipv4_mapped
+    if not ip.is_global or ip.is_multicast:
+        raise CallbackURLError("callback_url must not point to a private, loopback or link-local address.")
+
+
+def _resolve(host: str, port: Optional[int]) -> list:
+    """getaddrinfo results for host, every address checked unless host is allowed."""
+    try:
+        infos = socket.getaddrinfo(host, port, type=socket.SOCK_STREAM)
+    except socket.gaierror as e:
+        raise CallbackURLError(f"callback_url host cannot be resolved: {host}") from e
+    if host not in ALLOWED_HOSTS:
+        for info in infos:
+            _check_address(info[4][0])
+    return infos
+
+
+def check_callback_url(url: str) -> None:
+    """Raise CallbackURLError unless url may receive job callbacks (resolves its host)."""
+    host = _host(url)
+    if ALLOWED_HOSTS and host not in ALLOWED_HOSTS:
+        raise CallbackURLError("callback_url host is not on the allowed list.")
+    _resolve(host, None)
+
+
+def _guarded_connection(address, timeout=socket._GLOBAL_DEFAULT_TIMEOUT, source_address=None):
+    # socket.create_connection, connecting only to addresses that pass the check
+    host, port = address
+    error = None
+    for family, socktype, proto, _, sockaddr in _resolve(host.lower(), port):
+        sock = socket.socket(family, socktype, proto)
+        try:
+            if timeout is not socket._GLOBAL_DEFAULT_TIMEOUT:
+                sock.settimeout(timeout)
+            if source_address:
+                sock.bind(source_address)
+            sock.connect(sockaddr)
+            return sock
+        except OSError as e:
+            sock.close()
+            error = e
+    raise error or OSError(f"cannot connect to {host}")
+
+
+class _HTTPConnection(http.client.HTTPConnection):
+    _create_connection = staticmethod(_guarded_connection)
+
+
+class _HTTPSConnection(http.client.HTTPSConnection):
+    _create_connection = staticmethod(_guarded_connection)
+
+
+class _HTTPHandler(urllib.request.HTTPHandler):
+    def http_open(self, req):
+        return self.do_open(_HTTPConnection, req)
+
+
+class _HTTPSHandler(urllib.request.HTTPSHandler):
+    def https_open(self, req):
+        return self.do_open(_HTTPSConnection, req, context=self._context)
+
+
+class _NoRedirects(urllib.request.HTTPRedirectHandler):
+    def redirect_request(self, req, fp, code, msg, headers, newurl):
+        return None  # a 3xx is reported as an HTTPError instead of followed
+
+
+_opener = urllib.request.OpenerDirector()
+for _handler in (
+    _HTTPHandler(), _HTTPSHandler(), _NoRedirects(),
+    urllib.request.HTTPDefaultErrorHandler(), urllib.request.HTTPErrorProcessor(),
+):
+    _opener.add_handler(_handler)
+
+
+def post_callback(url: str, body: bytes, timeout: float):
+    """POST a JSON body to a callback URL; errors as urllib.request.urlopen raises them."""
+    check_callback_url(url)
+    request = urllib.request.Request(
+        url, data=body, method="POST", headers={"Content-Type": "application/json"}
+    )
+    return _opener.open(request, timeout=timeout)
@@ -0,0 +1,170 @@
+"""Per-request memory accounting and the soft memory ceiling.
+
+Peak Python allocation (tracemalloc) is recorded per pipeline stage, as the
+bytes above the level at which the stage started:
+
+- in a parse-sandbox child, which serves a single request, whenever the
+  request is profiled or MEMORY_TRACKING is on. The child also reports its
+  peak RSS, which is recorded for every sandboxed parse.
+- in API and job worker processes when MEMORY_TRACKING is on. These run
+  requests concurrently and tracemalloc is process-wide, so a stage's peak
+  there can include allocations of overlapping requests.
+
+Stage peaks feed the nlp_stage_peak_allocation_bytes histogram and, for a
+profiled request, the `memory` section of its profile. tracemalloc slows
+allocation-heavy code considerably, so tracking is off by default.
+
+The soft ceiling lets memory-hungry stages (OCR) scale down before the
+container is OOM-killed. It is compared with the container's working set
+(cgroup), or with this process's RSS outside a container:
+
+    MEMORY_TRACKING        "1" traces allocations in API and job workers
+    MEMORY_SOFT_LIMIT_MB   soft ceiling; default 85% of the cgroup memory
+                           limit (none without one), "0" disables
+"""
+import contextvars
+import os
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from typing import Any, Dict, List, Optional
+
+from lib.metrics import STAGE_PEAK_BYTES
+from lib.process_stats import cgroup_memory, memory_kb
+
+TRACKING = os.environ.get("MEMORY_TRACKING", "0") == "1"
+
+# Share of the container limit used as the default soft ceiling
+_DEFAULT_LIMIT_FRACTION = 0.85
+
+
+def _soft_limit_bytes() -> Optional[int]:
+    configured = os.environ.get("MEMORY_SOFT_LIMIT_MB")
+    if configured is not None:
+        return int(float(configured) * 1024 * 1024) or None
+    limit = cgroup_memory().get("limit_bytes")
+    return int(limit * _DEFAULT_LIMIT_FRACTION) if limit else None
+
+
+SOFT_LIMIT_BYTES = _soft_limit_bytes()
+
+_request: contextvars.ContextVar = contextvars.ContextVar("memory_request", default=None)
+
+
+def start() -> None:
+    """Start tracing allocations in this process (MEMORY_TRACKING or a profiled parse)."""
+    if not tracemalloc.is_tracing():
+        tracemalloc.start()
+
+
+class RequestMemory:
+    """Peak allocation per stage and peak RSS per process for one request."""
+
+    def __init__(self):
+        self.stages: Dict[str, int] = {}
+        self.peak_rss: Dict[str, int] = {}
+        # [starting bytes, peak bytes] of each stage in progress
+        self._open: List[List[int]] = []
+
+    def _fold(self) -> int:
+        """Current traced bytes; the peak so far is credited to open stages, then reset.
+
+        Resetting the peak lets a nested stage measure its own; the stages
+        around it keep the larger value.
+        """
+        current, peak = tracemalloc.get_traced_memory()
+        for frame in self._open:
+            frame[1] = max(frame[1], peak)
+        tracemalloc.reset_peak()
+        return current
+
+    def begin(self) -> Optional[List[int]]:
+        """Start measuring a stage; pass the result to end(). None when not tracing."""
+        if not tracemalloc.is_tracing():
+            return None
+        current = self._fold()
+        frame = [current, current]
+        self._open.append(frame)
+        return frame
+
+    def end(self, frame: Optional[List[int]], stage: str) -> None:
+        if frame is None or not tracemalloc.is_tracing():
+            return
+        self._fold()
+        self._open.remove(frame)
+        self.record(stage, frame[1] - frame[0])
+
+    def record(self, stage: str, peak_bytes: int) -> None:
+        STAGE_PEAK_BYTES.observe(peak_bytes, stage)
+        # A stage that runs more than once (OCR per page) keeps its largest peak
+        self.stages[stage] = max(self.stages.get(stage, 0), peak_bytes)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"stages": dict(self.stages), "peak_rss": dict(self.peak_rss)}
+
+    def merge(self, other: Dict[str, Any]) -> None:
+        """Add figures recorded in another process (a sandbox child)."""
+        for stage, peak_bytes in other["stages"].items():
+            self.stages[stage] = max(self.stages.get(stage, 0), peak_bytes)
+        self.peak_rss.update(other["peak_rss"])
+
+    def report(self) -> Dict[str, Any]:
+        mb = 1024 * 1024
+        return {
+            "stage_peak_mb": {stage: round(value / mb, 2) for stage, value in self.stages.items()},
+            "peak_rss_mb": {process: round(value / mb, 1) for process, value in self.peak_rss.items()},
+            "soft_limit_mb": round(SOFT_LIMIT_BYTES / mb) if SOFT_LIMIT_BYTES else None,
+        }
+
+
+def current() -> Optional[RequestMemory]:
+    """Memory account of the running request, if one is being kept."""
+    return _request.get()
+
+
+@contextmanager
+def track(memory: Optional[RequestMemory] = None):
+    """Account stages in the block to `memory` (default: a new RequestMemory), yielded."""
+    memory = memory if memory is not None else RequestMemory()
+    token = _request.set(memory)
+    try:
+        yield memory
+    finally:
+        _request.reset(token)
+
+
+_NOOP = nullcontext()
+
+
+def stage(name: str):
+    """Context manager recording the block's peak allocation as stage `name`.
+
+    Free when allocations are not being traced.
+    """
+    if not tracemalloc.is_tracing():
+        return _NOOP
+    return _stage(name)
+
+
+@contextmanager
+def _stage(name: str):
+    memory = _request.get() or RequestMemory()
+    frame = memory.begin()
+    try:
+        yield
+    finally:
+        memory.end(frame, name)
+
+
+def peak_rss_bytes() -> int:
+    """Peak resident memory of this process so far."""
+    return memory_kb().get("peak_rss_kb", 0) * 1024
+
+
+def headroom_bytes() -> Optional[int]:
+    """Bytes left under the soft ceiling (negative when over it), or None without one."""
+    if SOFT_LIMIT_BYTES is None:
+        return None
+    in_use = cgroup_memory().get("working_set_bytes")
+    if in_use is None:
+        in_use = memory_kb().get("rss_kb", 0) * 1024
+    return SOFT_LIMIT_BYTES - in_use
@@ -0,0 +1,258 @@
+"""In-process metrics in the Prometheus text exposition format.
+
+A small dependency-free subset of prometheus_client: counters, gauges and
+histograms with labels, plus collectors that compute values at scrape time
+(RSS, cache stats) so the hot path pays nothing for them. Recording is a
+dict lookup and an add under a per-metric lock.
+
+Metrics are per process. Counters and histograms recorded in a parse-sandbox
+child are shipped back with its result and merged here (see lib/sandbox.py);
+with several uvicorn workers each worker serves its own /metrics.
+"""
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds; spans sub-millisecond matching up to multi-page OCR
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+# Bytes; 1 MB doubling up to 1 GB
+MEMORY_BUCKETS = tuple(float(1 << (20 + i)) for i in range(11))
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *labelvalues: str, amount: float = 1) -> None:
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0) + amount
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return self._header() + [
+            f"{self.name}{_labels(self.labelnames, key)} {_number(value)}" for key, value in items
+        ]
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return dict(self._values)
+
+    def merge(self, values: dict) -> None:
+        with self._lock:
+            for key, value in values.items():
+                self._values[key] = self._values.get(key, 0) + value
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *labelvalues: str, amount: float = 1) -> None:
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0) + amount
+
+    def dec(self, *labelvalues: str, amount: float = 1) -> None:
+        self.inc(*labelvalues, amount=-amount)
+
+    def set(self, value: float, *labelvalues: str) -> None:
+        with self._lock:
+            self._values[labelvalues] = value
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return self._header() + [
+            f"{self.name}{_labels(self.labelnames, key)} {_number(value)}" for key, value in items
+        ]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # labels -> [per-bucket counts (+Inf last), sum]
+        self._series: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, *labelvalues: str) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labelvalues)
+            if series is None:
+                series = self._series[labelvalues] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    @contextmanager
+    def time(self, *labelvalues: str):
+        """Observe the duration of the with-block (also when it raises)."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, *labelvalues)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted((key, (list(counts), total)) for key, (counts, total) in self._series.items())
+        lines = self._header()
+        for key, (counts, total) in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = 'le="%s"' % _number(bound)
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, key)} {_number(total)}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, key)} {cumulative}")
+        return lines
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {key: (list(counts), total) for key, (counts, total) in self._series.items()}
+
+    def merge(self, series: dict) -> None:
+        with self._lock:
+            for key, (counts, total) in series.items():
+                current = self._series.get(key)
+                if current is None:
+                    current = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0]
+                current[0] = [a + b for a, b in zip(current[0], counts)]
+                current[1] += total
+
+
+# A collector returns (name, kind, documentation, [(label dict, value), ...]) tuples
+Collector = Callable[[], Iterable[tuple]]
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Collector] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def add_collector(self, collector: Collector) -> None:
+        """Register a function evaluated at every scrape."""
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        for collector in self._collectors:
+            for name, kind, documentation, samples in collector():
+                lines.append(f"# HELP {name} {documentation}")
+                lines.append(f"# TYPE {name} {kind}")
+                for labels, value in samples:
+                    lines.append(f"{name}{_labels(list(labels), list(labels.values()))} {_number(value)}")
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self) -> dict:
+        """Counter and histogram state, for shipping to another process."""
+        return {
+            name: metric.snapshot()
+            for name, metric in self._metrics.items()
+            if isinstance(metric, (Counter, Histogram))
+        }
+
+    def merge(self, snapshot: dict) -> None:
+        """Add another process's snapshot (e.g. a sandbox child's) into this registry."""
+        for name, values in snapshot.items():
+            metric = self._metrics.get(name)
+            if metric is not None and values:
+                metric.merge(values)
+
+
+REGISTRY = Registry()
+
+# Pipeline stages, wherever they run (API worker or parse sandbox)
+STAGE_SECONDS = REGISTRY.histogram(
+    "nlp_stage_duration_seconds", "Duration of analysis pipeline stages.", ["stage"]
+)
+OCR_TRIGGERS = REGISTRY.counter(
+    "nlp_ocr_triggers_total", "Documents sent to OCR, by the rule that triggered it.", ["reason"]
+)
+CACHE_LOOKUPS = REGISTRY.counter(
+    "nlp_cache_lookups_total", "Cache lookups by cache and result (hit or miss).", ["cache", "result"]
+)
+SANDBOX_RUNS = REGISTRY.counter(
+    "nlp_parse_sandbox_runs_total", "Sandboxed parses by outcome.", ["outcome"]
+)
+# Recorded by lib/memory_tracking.py and the OCR service
+STAGE_PEAK_BYTES = REGISTRY.histogram(
+    "nlp_stage_peak_allocation_bytes",
+    "Peak Python allocation of pipeline stages above their starting level (tracemalloc).",
+    ["stage"],
+    buckets=MEMORY_BUCKETS
+)
+PARSE_PEAK_RSS = REGISTRY.histogram(
+    "nlp_parse_peak_rss_bytes", "Peak resident memory of parse-sandbox children.", buckets=MEMORY_BUCKETS
+)
+OCR_DEGRADED = REGISTRY.counter(
+    "nlp_ocr_degraded_total", "OCR runs scaled down by the soft memory ceiling, by action.", ["action"]
+)
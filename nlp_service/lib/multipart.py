@@ -0,0 +1,212 @@
+"""Incremental multipart/form-data parsing for the Vercel handlers.
+
+The request body is read in chunks into one fixed buffer and scanned for
+boundaries as it arrives, so size limits apply while reading and parts are
+returned as memoryview slices of that buffer (no per-part copies). A part's
+body is everything between its header block and the next "\\r\\n--boundary",
+byte for byte, so uploads that contain CRLF sequences are not altered.
+"""
+import os
+from typing import Callable, Iterator, Optional
+
+MAX_UPLOAD_BYTES = int(os.environ.get("MAX_UPLOAD_BYTES", 5 * 1024 * 1024))  # 5MB, as main.py
+
+_CHUNK_BYTES = 64 * 1024
+# Room for boundaries, part headers and small form fields on top of the file limit
+ENVELOPE_BYTES = 64 * 1024
+_MAX_HEADER_BYTES = 16 * 1024
+_SNIFF_BYTES = 1024
+
+
+class MultipartError(ValueError):
+    """Malformed or truncated multipart body."""
+
+
+class UploadTooLarge(MultipartError):
+    """Upload exceeds the configured size limit."""
+
+
+class Part:
+    """One form field; `data` is a memoryview into the request buffer."""
+
+    __slots__ = ("headers", "name", "filename", "content_type", "data")
+
+    def __init__(self, headers: dict, data: memoryview):
+        self.headers = headers
+        params = _header_params(headers.get("content-disposition", ""))
+        self.name = params.get("name")
+        self.filename = params.get("filename")
+        self.content_type = headers.get("content-type", "application/octet-stream")
+        self.data = data
+
+
+def parse_boundary(content_type: str) -> Optional[bytes]:
+    """Boundary from a multipart/form-data Content-Type header, or None."""
+    if not content_type or "multipart/form-data" not in content_type.lower():
+        return None
+    for param in content_type.split(";")[1:]:
+        key, _, value = param.strip().partition("=")
+        if key.lower() == "boundary" and value.strip():
+            return value.strip().strip('"').encode("latin-1")
+    return None
+
+
+def _header_params(value: str) -> dict:
+    params = {}
+    for item in value.split(";")[1:]:
+        key, sep, val = item.strip().partition("=")
+        if sep:
+            params[key.strip().lower()] = val.strip().strip('"')
+    return params
+
+
+def _parse_headers(block: bytes) -> dict:
+    headers = {}
+    for line in block.split(b"\r\n"):
+        key, sep, value = line.partition(b":")
+        if sep:
+            headers[key.strip().lower().decode("latin-1")] = value.strip().decode("utf-8", "replace")
+    return headers
+
+
+class MultipartReader:
+    """Reads a multipart body from a stream and yields its parts as they complete.
+
+    Args:
+        stream: Readable binary stream (e.g. BaseHTTPRequestHandler.rfile)
+        boundary: Boundary from the Content-Type header
+        content_length: Declared body size, or None to read until EOF
+        max_file_bytes: Largest accepted part body
+        sniff: Check run on the first bytes of each file part, before the
+            rest of it is read; a False result aborts with MultipartError
+    """
+
+    def __init__(
+        self,
+        stream,
+        boundary: bytes,
+        content_length: Optional[int] = None,
+        max_file_bytes: int = MAX_UPLOAD_BYTES,
+        sniff: Optional[Callable[[memoryview], bool]] = None
+    ):
+        max_body = max_file_bytes + ENVELOPE_BYTES
+        if content_length is not None and content_length > max_body:
+            raise UploadTooLarge(f"Upload exceeds {max_file_bytes // (1024 * 1024)}MB limit.")
+        self._stream = stream
+        self._delimiter = b"\r\n--" + boundary
+        self._content_length = content_length
+        self._max_file_bytes = max_file_bytes
+        self._sniff = sniff
+        # Fixed capacity: the buffer is never resized, so yielded views stay valid
+        capacity = content_length if content_length is not None else max_body + 1
+        self._buffer = bytearray(capacity)
+        self._view = memoryview(self._buffer)
+        self._filled = 0
+        self._eof = False
+
+    def _fill(self) -> bool:
+        """Read one more chunk; return False at end of body."""
+        if self._eof:
+            return False
+        end = min(self._filled + _CHUNK_BYTES, len(self._buffer))
+        if end == self._filled:
+            if self._content_length is None:
+                raise UploadTooLarge(f"Upload exceeds {self._max_file_bytes // (1024 * 1024)}MB limit.")
+            self._eof = True
+            return False
+        n = self._stream.readinto(self._view[self._filled:end])
+        if not n:
+            self._eof = True
+            if self._content_length is not None and self._filled < self._content_length:
+                raise MultipartError("Request body is truncated.")
+            return False
+        self._filled += n
+        return True
+
+    def _find(self, needle: bytes, start: int, limit: int, too_large) -> int:
+        """Position of `needle` at or after `start`, reading more as needed."""
+        scan = start
+        while True:
+            pos = self._buffer.find(needle, scan, self._filled)
+            if pos != -1:
+                return pos
+            # Resume just before the end so a needle split across chunks is found
+            scan = max(start, self._filled - len(needle) + 1)
+            if self._filled - start > limit:
+                raise too_large
+            if not self._fill():
+                raise MultipartError("Multipart body ended before the closing boundary.")
+
+    def _ensure(self, end: int) -> None:
+        while self._filled < end:
+            if not self._fill():
+                raise MultipartError("Multipart body ended before the closing boundary.")
+
+    def _head(self, start: int, size: int) -> memoryview:
+        """Up to `size` bytes from `start`, reading only as far as needed."""
+        while self._filled < start + size and self._fill():
+            pass
+        return self._view[start:min(start + size, self._filled)]
+
+    def parts(self) -> Iterator[Part]:
+        header_error = MultipartError("Multipart part headers are too large.")
+        file_error = UploadTooLarge(f"Upload exceeds {self._max_file_bytes // (1024 * 1024)}MB limit.")
+
+        # The first delimiter may open the body without a leading CRLF
+        first = self._delimiter[2:]
+        pos = self._find(first, 0, ENVELOPE_BYTES, header_error) + len(first)
+        while True:
+            self._ensure(pos + 2)
+            marker = bytes(self._view[pos:pos + 2])
+            if marker == b"--":
+                return
+            if marker != b"\r\n":
+                raise MultipartError("Malformed multipart boundary.")
+            header_start = pos + 2
+            header_end = self._find(b"\r\n\r\n", header_start, _MAX_HEADER_BYTES, header_error)
+            headers = _parse_headers(bytes(self._view[header_start:header_end]))
+            body_start = header_end + 4
+            if self._sniff is not None and "filename=" in headers.get("content-disposition", ""):
+                head = bytes(self._head(body_start, _SNIFF_BYTES))
+                end = head.find(self._delimiter)
+                if not self._sniff(head if end == -1 else head[:end]):
+                    raise MultipartError("File content does not match its type.")
+            body_end = self._find(
+                self._delimiter, body_start, self._max_file_bytes + len(self._delimiter), file_error
+            )
+            if body_end - body_start > self._max_file_bytes:
+                raise file_error
+            yield Part(headers, self._view[body_start:body_end])
+            pos = body_end + len(self._delimiter)
+
+
+def read_file_part(
+    stream,
+    headers,
+    max_file_bytes: int = MAX_UPLOAD_BYTES,
+    sniff: Optional[Callable[[memoryview], bool]] = None
+) -> Optional[Part]:
+    """First file field of a multipart request, or None if there is none.
+
+    Args:
+        stream: Request body stream
+        headers: Request headers (mapping with Content-Type / Content-Length)
+        max_file_bytes: Largest accepted file
+        sniff: Magic-byte check for the file's first chunk (see MultipartReader)
+
+    Raises:
+        UploadTooLarge: The body or file is over the limit (checked while reading)
+        MultipartError: The body is malformed or truncated
+    """
+    boundary = parse_boundary(headers.get("Content-Type", ""))
+    if not boundary:
+        return None
+    try:
+        content_length = int(headers.get("Content-Length"))
+    except (TypeError, ValueError):
+        content_length = None
+    reader = MultipartReader(stream, boundary, content_length, max_file_bytes, sniff)
+    for part in reader.parts():
+        if part.filename is not None:
+            return part
+    return None
@@ -2,7 +2,8 @@
 import io
 import re
 
-import pdfplumber
+from lib.analysis_modes import ANALYSIS_MODES, DEFAULT_MODE, Deadline, effective_mode
+from lib.skill_matcher import normalize_skill, role_matchers
 
 _HEADING_KEYWORDS = [
     "summary", "professional summary", "profile", "objective",
@@ -11,8 +12,56 @@ _HEADING_KEYWORDS = [
 ]
 
 
+class _BufferReader(io.RawIOBase):
+    """Seekable read-only stream over a buffer (e.g. a multipart memoryview).
+
+    Parsers read it in small pieces, so the upload is never copied whole.
+    """
+
+    def __init__(self, buffer):
+        self._view = memoryview(buffer).cast("B")
+        self._pos = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def readinto(self, b) -> int:
+        n = max(0, min(len(b), len(self._view) - self._pos))
+        b[:n] = self._view[self._pos:self._pos + n]
+        self._pos += n
+        return n
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_CUR:
+            offset += self._pos
+        elif whence == io.SEEK_END:
+            offset += len(self._view)
+        if offset < 0:
+            raise ValueError("negative seek position")
+        self._pos = offset
+        return self._pos
+
+    def tell(self) -> int:
+        return self._pos
+
+
+def _pdf_stream(raw):
+    """File object over PDF bytes (or an already spooled upload) without copying."""
+    if hasattr(raw, "read"):
+        raw.seek(0)
+        return raw
+    if isinstance(raw, bytes):
+        return io.BytesIO(raw)  # shares the bytes object until written to
+    return _BufferReader(raw)
+
+
 def extract_pdf_text(raw: bytes) -> str:
-    with pdfplumber.open(io.BytesIO(raw)) as pdf:
+    import pdfplumber  # Heavy (pdfminer); only handlers that parse PDFs pay for it
+
+    with pdfplumber.open(_pdf_stream(raw)) as pdf:
         parts = []
         for page in pdf.pages:
             t = page.extract_text()
@@ -21,20 +70,52 @@ def extract_pdf_text(raw: bytes) -> str:
         return "\n\n".join(parts).strip() if parts else ""
 
 
-def _detect_columns(words: list) -> bool:
+def detect_column_split(words: list):
+    """Return the x coordinate separating two text columns, or None."""
     if len(words) < 40:
-        return False
+        return None
     x_positions = sorted(w.get("x0") for w in words if isinstance(w.get("x0"), (int, float)))
     if len(x_positions) < 40:
-        return False
+        return None
     gaps = [x_positions[i] - x_positions[i - 1] for i in range(1, len(x_positions))]
     max_gap = max(gaps) if gaps else 0
     if max_gap < 100:
-        return False
+        return None
     split_index = gaps.index(max_gap) + 1
     left = split_index
     right = len(x_positions) - split_index
-    return left >= 10 and right >= 10
+    if left >= 10 and right >= 10:
+        return x_positions[split_index]
+    return None
+
+
+def _detect_columns(words: list) -> bool:
+    return detect_column_split(words) is not None
+
+
+def reflow_columns(words: list, split_x: float) -> str:
+    """Rebuild page text reading the left column fully before the right one."""
+    columns = ([], [])
+    for w in words:
+        columns[0 if w.get("x0", 0) < split_x else 1].append(w)
+    blocks = []
+    for column in columns:
+        lines = []
+        current = []
+        current_top = None
+        for w in sorted(column, key=lambda w: (round(w.get("top", 0)), w.get("x0", 0))):
+            top = w.get("top", 0)
+            if current and abs(top - current_top) > 3:
+                lines.append(" ".join(x["text"] for x in current))
+                current = []
+            if not current:
+                current_top = top
+            current.append(w)
+        if current:
+            lines.append(" ".join(x["text"] for x in current))
+        if lines:
+            blocks.append("\n".join(lines))
+    return "\n".join(blocks)
 
 
 def _count_bullets(text: str) -> int:
@@ -50,84 +131,158 @@ def _extract_contact_signals(text: str) -> dict:
     return {"email": email_match.group(0) if email_match else None}
 
 
-def ats_layout_from_pdf(raw: bytes) -> dict:
-    flags = {"tables": False, "images": False, "columns": False, "standard_headings": False}
-    issues = []
-    headings_found = set()
-    bullet_count = 0
+def _ocr_page_text(raw: bytes, page_number: int, deadline: Deadline) -> str:
+    from app.services.ocr_service import ocr_service  # OCR stack is heavy; load on demand
 
-    with pdfplumber.open(io.BytesIO(raw)) as pdf:
-        for page in pdf.pages:
+    if not ocr_service.is_available():
+        return ""
+    if hasattr(raw, "read"):
+        raw.seek(0)
+        raw = raw.read()
+    return ocr_service.extract_page_text(raw, page_number, timeout=deadline.remaining()) or ""
+
+
+def _layout_pages_fast(raw: bytes, flags: dict) -> list:
+    """pypdf-only pass: page text and image flag, no pdfplumber layout analysis."""
+    from pypdf import PdfReader
+
+    reader = PdfReader(_pdf_stream(raw))
+    texts = []
+    for page in reader.pages:
+        texts.append(page.extract_text() or "")
+        try:
+            xobject = page.get("/Resources", {}).get("/XObject")
+            if xobject and any(xobject[o].get("/Subtype") == "/Image" for o in xobject):
+                flags["images"] = True
+        except Exception:
+            pass
+    return texts
+
+
+def _layout_pages(raw: bytes, flags: dict, tier: dict, deadline: Deadline) -> list:
+    import pdfplumber
+
+    texts = []
+    tables_unchecked = False
+    with pdfplumber.open(_pdf_stream(raw)) as pdf:
+        for page_number, page in enumerate(pdf.pages, start=1):
             text = page.extract_text() or ""
-            lower = text.lower()
-            for heading in _HEADING_KEYWORDS:
-                if heading in lower:
-                    headings_found.add(heading)
-            bullet_count += _count_bullets(text)
             if page.images:
                 flags["images"] = True
-            try:
-                tables = page.extract_tables()
-                if tables and any(len(t) > 0 for t in tables):
-                    flags["tables"] = True
-            except Exception:
-                pass
+            if deadline.allow("tables"):
+                try:
+                    tables = page.extract_tables()
+                    if tables and any(len(t) > 0 for t in tables):
+                        flags["tables"] = True
+                except Exception:
+                    pass
+            else:
+                tables_unchecked = True
             words = page.extract_words() or []
-            if _detect_columns(words):
+            split_x = detect_column_split(words)
+            if split_x is not None:
                 flags["columns"] = True
+                if tier["column_reflow"] and deadline.allow("column_reflow"):
+                    text = reflow_columns(words, split_x)
+            if tier["page_ocr"] and not text.strip() and deadline.allow("page_ocr"):
+                text = _ocr_page_text(raw, page_number, deadline)
+            texts.append(text)
+    if tables_unchecked and not flags["tables"]:
+        flags["tables"] = None  # pages left unchecked may hold tables
+    return texts
 
-    flags["standard_headings"] = len(headings_found) > 0
-    score = 0
-    if not flags["tables"]:
-        score += 15
-    else:
-        issues.append("Tables detected")
-    if not flags["images"]:
-        score += 10
-    else:
-        issues.append("Images detected")
-    if not flags["columns"]:
-        score += 15
-    else:
-        issues.append("Multiple columns detected")
-    if flags["standard_headings"]:
-        score += 15
-    else:
-        issues.append("Standard section headings missing")
-    if bullet_count >= 3:
-        score += 10
+
+# Points per layout check; a check that did not run (its flag None) earns
+# none, and the points of the checks that ran are scaled up to the total
+_CHECK_POINTS = {
+    "tables": 15,
+    "images": 10,
+    "columns": 15,
+    "standard_headings": 15,
+    "bullets": 10,
+    "email": 10,
+}
+
+
+def ats_layout_from_pdf(raw: bytes, mode: str = DEFAULT_MODE) -> dict:
+    tier = ANALYSIS_MODES[mode]
+    deadline = Deadline.for_mode(mode)
+    # Table and column checks need pdfplumber's layout analysis; the fast
+    # tier leaves them unchecked (None) rather than passed
+    layout = tier["tables"]
+    flags = {
+        "tables": False if layout else None,
+        "images": False,
+        "columns": False if layout else None,
+        "standard_headings": False,
+    }
+    headings_found = set()
+    bullet_count = 0
+
+    if layout:
+        page_texts = _layout_pages(raw, flags, tier, deadline)
     else:
-        issues.append("Bullet points not detected")
-    text = extract_pdf_text(raw)
+        page_texts = _layout_pages_fast(raw, flags)
+
+    for text in page_texts:
+        lower = text.lower()
+        for heading in _HEADING_KEYWORDS:
+            if heading in lower:
+                headings_found.add(heading)
+        bullet_count += _count_bullets(text)
+
+    flags["standard_headings"] = len(headings_found) > 0
+    parts = [t for t in page_texts if t]
+    text = "\n\n".join(parts).strip() if parts else ""
     contact = _extract_contact_signals(text)
-    if contact.get("email"):
-        score += 10
-    else:
-        issues.append("Contact email not detected")
+
+    # Check -> passed (True/False), or None when it did not run
+    passed = {
+        "tables": None if flags["tables"] is None else not flags["tables"],
+        "images": not flags["images"],
+        "columns": None if flags["columns"] is None else not flags["columns"],
+        "standard_headings": flags["standard_headings"],
+        "bullets": bullet_count >= 3,
+        "email": bool(contact.get("email")),
+    }
+    failed_issues = {
+        "tables": "Tables detected",
+        "images": "Images detected",
+        "columns": "Multiple columns detected",
+        "standard_headings": "Standard section headings missing",
+        "bullets": "Bullet points not detected",
+        "email": "Contact email not detected",
+    }
+    issues = [failed_issues[check] for check, ok in passed.items() if ok is False]
+    unchecked = [check for check, ok in passed.items() if ok is None]
+    earned = sum(_CHECK_POINTS[check] for check, ok in passed.items() if ok)
+    possible = sum(_CHECK_POINTS[check] for check, ok in passed.items() if ok is not None)
+    score = round(earned * sum(_CHECK_POINTS.values()) / possible) if possible else 0
     score = max(0, min(100, score))
     return {
         "ats_layout_score": score,
         "issues": issues,
         "flags": flags,
+        # Deadline-skipped stages plus the checks the tier never ran (flags None)
+        "skipped_stages": deadline.skipped + [c for c in unchecked if c not in deadline.skipped],
         "signals": {
             "bullet_count": bullet_count,
             "headings_found": sorted(headings_found),
             "email": contact.get("email"),
         },
+        "mode": effective_mode(mode, deadline.skipped),
+        "requested_mode": mode,
     }
 
 
 def analyze_skills(resume_text: str, job_role_skills: list, skill_dictionary: list = None):
     resume_lower = resume_text.strip().lower()
-    resume_words = set(resume_lower.split())
     job_skills = [s.strip() for s in job_role_skills if s.strip()]
-    skill_dict = skill_dictionary or job_skills
+    matcher = role_matchers.get(tuple(normalize_skill(s) for s in job_skills))
     matched = []
     missing = []
-    for skill in job_skills:
-        snorm = skill.strip().lower()
-        skill_parts = set(snorm.split())
-        if skill_parts & resume_words or any(p in resume_lower for p in skill_parts):
+    for skill, present in zip(job_skills, matcher.match(resume_lower)):
+        if present:
             matched.append(skill)
         else:
             missing.append(skill)
@@ -0,0 +1,57 @@
+"""Process and container memory figures from /proc and cgroupfs (Linux); empty elsewhere."""
+
+_FIELDS = {"VmRSS": "rss_kb", "RssAnon": "rss_anon_kb", "RssFile": "rss_file_kb", "VmHWM": "peak_rss_kb"}
+
+
+def memory_kb(pid="self") -> dict:
+    """Resident memory of a process in kB.
+
+    rss_anon_kb is private to the process; rss_file_kb includes mmap'd files
+    such as the taxonomy snapshot, whose pages are shared between workers.
+    """
+    stats = {}
+    try:
+        with open(f"/proc/{pid}/status", "r") as f:
+            for line in f:
+                key, _, value = line.partition(":")
+                if key in _FIELDS:
+                    stats[_FIELDS[key]] = int(value.split()[0])
+    except (OSError, ValueError):
+        return {}
+    return stats
+
+
+# cgroup v2 files, then v1; a v1 "unlimited" limit is a huge page-aligned number
+_CGROUP_FILES = (
+    ("/sys/fs/cgroup/memory.current", "/sys/fs/cgroup/memory.max", "inactive_file"),
+    ("/sys/fs/cgroup/memory/memory.usage_in_bytes", "/sys/fs/cgroup/memory/memory.limit_in_bytes",
+     "total_inactive_file"),
+)
+_UNLIMITED = 1 << 60
+
+
+def cgroup_memory() -> dict:
+    """Memory of this container (cgroup) in bytes; empty outside one.
+
+    working_set_bytes is usage minus reclaimable page cache, the figure the
+    kernel OOM killer and container platforms act on. limit_bytes is None
+    when the cgroup has no memory limit.
+    """
+    for usage_path, limit_path, inactive_key in _CGROUP_FILES:
+        try:
+            with open(usage_path, "r") as f:
+                usage = int(f.read())
+            with open(limit_path, "r") as f:
+                limit = f.read().strip()
+            inactive = 0
+            with open(limit_path.rsplit("/", 1)[0] + "/memory.stat", "r") as f:
+                for line in f:
+                    key, _, value = line.partition(" ")
+                    if key == inactive_key:
+                        inactive = int(value)
+                        break
+        except (OSError, ValueError):
+            continue
+        limit_bytes = int(limit) if limit.isdigit() and int(limit) < _UNLIMITED else None
+        return {"working_set_bytes": max(0, usage - inactive), "limit_bytes": limit_bytes}
+    return {}
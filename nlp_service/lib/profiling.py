@@ -0,0 +1,219 @@
+"""Sampling profiler for individual requests.
+
+A profiled request runs with a sampler thread that records the call stack of
+the request's thread every PROFILE_INTERVAL_SECONDS. Parsing happens in a
+sandbox child (lib/sandbox.py), so while a session is active the sandbox
+samples every thread of the child as well and sends the stacks back with the
+result. The session then yields
+
+- a top-N function table (self and total time, estimated from sample counts)
+- a collapsed-stack file ("api;frame;frame 12" per line, as consumed by
+  flamegraph.pl, speedscope or inferno), stored under PROFILE_DIR
+- peak allocation per pipeline stage and the sandbox's peak RSS
+
+Nothing here runs unless a request asks for a profile; the only cost on other
+requests is one context-variable lookup per sandboxed parse.
+"""
+import contextvars
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+from lib import memory_tracking
+
+_SERVICE_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROFILE_DIR = os.environ.get("PROFILE_DIR", os.path.join(_SERVICE_ROOT, "var", "profiles"))
+INTERVAL_SECONDS = float(os.environ.get("PROFILE_INTERVAL_SECONDS", 0.002))
+TOP_N = int(os.environ.get("PROFILE_TOP_N", 25))
+# Older collapsed-stack files are deleted as new ones are written
+KEEP_FILES = int(os.environ.get("PROFILE_KEEP_FILES", 100))
+
+# Profile ids are uuid4 hex; anything else is not a stored profile
+_ID_LENGTH = 32
+
+_session: contextvars.ContextVar = contextvars.ContextVar("profile_session", default=None)
+
+
+def _frame_label(code) -> str:
+    path = code.co_filename
+    if "site-packages" + os.sep in path:
+        path = path.split("site-packages" + os.sep, 1)[1]
+    elif path.startswith(_SERVICE_ROOT + os.sep):
+        path = os.path.relpath(path, _SERVICE_ROOT)
+    else:
+        path = os.path.basename(path)
+    # ";" separates frames in the collapsed format
+    return f"{code.co_name} ({path}:{code.co_firstlineno})".replace(";", ":")
+
+
+class StackSampler:
+    """Background thread sampling call stacks at a fixed interval.
+
+    Samples the given threads, or every thread but its own when
+    `thread_ids` is None (used in a sandbox child, which serves one request).
+    Frames outside the profiled code (thread bootstrap, event loop, the
+    function whose code object is `entry`) are left out of the stacks.
+    """
+
+    def __init__(
+        self,
+        interval: float = INTERVAL_SECONDS,
+        thread_ids: Optional[set] = None,
+        entry=None
+    ):
+        self.interval = interval
+        self.thread_ids = thread_ids
+        self.entry = entry
+        self.stacks: Counter = Counter()
+        self.ticks = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self._started = 0.0
+        self.elapsed = 0.0
+
+    def start(self) -> "StackSampler":
+        self._started = time.perf_counter()
+        self._thread.start()
+        return self
+
+    def stop(self) -> dict:
+        """Stop sampling and return the samples (picklable)."""
+        self._stop.set()
+        self._thread.join()
+        self.elapsed = time.perf_counter() - self._started
+        return {"stacks": dict(self.stacks), "ticks": self.ticks, "elapsed": self.elapsed}
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        labels: Dict[Any, str] = {}
+        while not self._stop.wait(self.interval):
+            self.ticks += 1
+            for ident, frame in sys._current_frames().items():
+                if ident == own or (self.thread_ids is not None and ident not in self.thread_ids):
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    if code is self.entry:
+                        break
+                    label = labels.get(code)
+                    if label is None:
+                        label = labels[code] = _frame_label(code)
+                    stack.append(label)
+                    frame = frame.f_back
+                if stack:
+                    self.stacks[tuple(reversed(stack))] += 1
+
+
+class ProfileSession:
+    """Samples gathered for one request, from the API process and sandbox children."""
+
+    def __init__(self, interval: float = INTERVAL_SECONDS):
+        self.id = uuid.uuid4().hex
+        self.interval = interval
+        # (root frame, samples dict) per sampled process
+        self.sources: List[Tuple[str, dict]] = []
+
+    def add(self, root: str, samples: dict) -> None:
+        self.sources.append((root, samples))
+
+    def collapsed(self) -> str:
+        lines = []
+        for root, samples in self.sources:
+            for stack, count in sorted(samples["stacks"].items()):
+                lines.append(f"{';'.join((root,) + stack)} {count}")
+        return "\n".join(lines) + "\n"
+
+    def report(self, top_n: int = TOP_N) -> Dict[str, Any]:
+        """Top-N functions by total (inclusive) time across all sources."""
+        self_ms: Counter = Counter()
+        total_ms: Counter = Counter()
+        samples_taken = 0
+        for root, samples in self.sources:
+            # Each tick took one sample per thread, so a sample stands for this long
+            ms_per_sample = samples["elapsed"] * 1000 / samples["ticks"] if samples["ticks"] else 0.0
+            for stack, count in samples["stacks"].items():
+                samples_taken += count
+                self_ms[(root, stack[-1])] += count * ms_per_sample
+                for label in set(stack):
+                    total_ms[(root, label)] += count * ms_per_sample
+        functions = [
+            {
+                "process": root,
+                "function": label,
+                "total_ms": round(ms, 1),
+                "self_ms": round(self_ms.get((root, label), 0.0), 1),
+            }
+            for (root, label), ms in total_ms.most_common(top_n)
+        ]
+        return {
+            "profile_id": self.id,
+            "interval_ms": self.interval * 1000,
+            "samples": samples_taken,
+            "wall_ms": {root: round(samples["elapsed"] * 1000, 1) for root, samples in self.sources},
+            "functions": functions,
+        }
+
+    def save(self) -> str:
+        """Write the collapsed stacks to PROFILE_DIR; return the file path."""
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        path = profile_path(self.id)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(self.collapsed())
+        _prune(PROFILE_DIR, KEEP_FILES)
+        return path
+
+
+def _prune(directory: str, keep: int) -> None:
+    try:
+        entries = sorted(
+            (entry for entry in os.scandir(directory) if entry.name.endswith(".collapsed")),
+            key=lambda entry: entry.stat().st_mtime
+        )
+        for entry in entries[:-keep] if keep > 0 else entries:
+            os.unlink(entry.path)
+    except OSError:
+        pass  # a concurrent prune got there first
+
+
+def profile_path(profile_id: str) -> Optional[str]:
+    """Path of a stored collapsed-stack file, or None for a malformed id."""
+    if len(profile_id) != _ID_LENGTH or not all(c in "0123456789abcdef" for c in profile_id):
+        return None
+    return os.path.join(PROFILE_DIR, profile_id + ".collapsed")
+
+
+def current() -> Optional[ProfileSession]:
+    """The profiling session of the running request, if any."""
+    return _session.get()
+
+
+def profile_call(func, *args, **kwargs) -> Tuple[Any, Dict[str, Any]]:
+    """Run func(*args, **kwargs) under the sampling profiler.
+
+    Sandboxed parses inside it are profiled in their child process too, with
+    per-stage peak allocations (see lib/memory_tracking.py). The collapsed
+    stacks are saved; exceptions propagate without a profile.
+
+    Returns:
+        Tuple of (func's result, report with the top-N function table and
+        the request's memory figures)
+    """
+    session = ProfileSession()
+    token = _session.set(session)
+    sampler = StackSampler(
+        session.interval, thread_ids={threading.get_ident()}, entry=profile_call.__code__
+    ).start()
+    try:
+        with memory_tracking.track() as memory:
+            result = func(*args, **kwargs)
+    finally:
+        session.add("api", sampler.stop())
+        _session.reset(token)
+    session.save()
+    return result, dict(session.report(), memory=memory.report())
@@ -0,0 +1,192 @@
+"""Run document parsers in a resource-limited child process.
+
+Malformed or hostile PDFs (decompression bombs, self-referencing xrefs or
+page trees, deeply nested objects) can make pypdf / pdfplumber spin or
+allocate without bound. Parsing runs in a child forked from a forkserver
+that has the parsers preloaded, with RLIMIT_AS and RLIMIT_CPU applied and a
+wall-clock deadline enforced by the parent, so a bad upload costs one child
+process instead of the worker. Limits can be tuned per deployment:
+
+    PARSE_SANDBOX            "0" runs parsers inline (no child process)
+    PARSE_MEMORY_MB          address-space limit of the child (default 1024)
+    PARSE_CPU_SECONDS        CPU-time limit of the child (default 30)
+    PARSE_TIMEOUT_SECONDS    wall-clock limit on top of the request budget (default 20)
+"""
+import multiprocessing
+import os
+import signal
+import time
+from contextlib import nullcontext
+from typing import Optional
+
+from lib import memory_tracking, metrics, profiling, tracing
+
+try:
+    import resource
+except ImportError:  # not available on Windows; the wall-clock deadline still applies
+    resource = None
+
+SANDBOX_ENABLED = os.environ.get("PARSE_SANDBOX", "1") != "0"
+MEMORY_MB = int(os.environ.get("PARSE_MEMORY_MB", 1024))
+CPU_SECONDS = int(os.environ.get("PARSE_CPU_SECONDS", 30))
+TIMEOUT_SECONDS = float(os.environ.get("PARSE_TIMEOUT_SECONDS", 20))
+
+# Imported once in the forkserver, so each child starts with them loaded
+_PRELOAD = ["app.services.resume_parser", "lib.pdf_utils", "pypdf", "pdfplumber", "docx"]
+
+_context = None
+
+
+class SandboxError(ValueError):
+    """Parsing was stopped by a sandbox limit or the child crashed.
+
+    `reason` is one of "timeout", "memory", "cpu" or "crashed".
+    """
+
+    def __init__(self, reason: str, message: str):
+        super().__init__(message)
+        self.reason = reason
+
+
+def _get_context():
+    global _context
+    if _context is None:
+        method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+        _context = multiprocessing.get_context(method)
+        if method == "forkserver":
+            _context.set_forkserver_preload(_PRELOAD)
+    return _context
+
+
+def warm_up() -> None:
+    """Start the forkserver ahead of the first upload (it preloads in the background)."""
+    if SANDBOX_ENABLED and _get_context().get_start_method() == "forkserver":
+        from multiprocessing import forkserver
+        forkserver.ensure_running()
+
+
+def _apply_limits(memory_mb: int, cpu_seconds: int) -> None:
+    if resource is None:
+        return
+    memory = memory_mb * 1024 * 1024
+    resource.setrlimit(resource.RLIMIT_AS, (memory, memory))
+    # SIGXCPU at the soft limit, SIGKILL one second later if it is ignored
+    resource.setrlimit(resource.RLIMIT_CPU, (cpu_seconds, cpu_seconds + 1))
+
+
+def _child(
+    conn, memory_mb: int, cpu_seconds: int, func, args,
+    profile_interval=None, trace=None, track_memory: bool = False
+) -> None:
+    try:
+        _apply_limits(memory_mb, cpu_seconds)
+        sampler = None
+        if profile_interval:
+            sampler = profiling.StackSampler(profile_interval, entry=_child.__code__).start()
+        if track_memory:
+            memory_tracking.start()
+        with tracing.collect(trace) if trace else nullcontext([]) as spans, memory_tracking.track() as memory:
+            frame = memory.begin()
+            try:
+                result = (True, func(*args))
+            except MemoryError:
+                result = (False, "memory")
+            except Exception as e:
+                result = (False, e)
+            memory.end(frame, "sandbox")
+        # The child serves one request, so its peak RSS is that request's
+        memory.peak_rss["sandbox"] = memory_tracking.peak_rss_bytes()
+        metrics.PARSE_PEAK_RSS.observe(memory.peak_rss["sandbox"])
+        # Observations made in the child, merged into the parent's /metrics,
+        # profile, trace and memory account
+        extras = {
+            "metrics": metrics.REGISTRY.snapshot(),
+            "profile": sampler.stop() if sampler is not None else None,
+            "spans": spans,
+            "memory": memory.to_dict(),
+        }
+        try:
+            conn.send(result + (extras,))
+        except Exception:
+            # Unpicklable result or exception: report it as text
+            conn.send((False, RuntimeError(str(result[1])), extras))
+    finally:
+        conn.close()
+
+
+def run_sandboxed(func, *args, timeout: Optional[float] = None):
+    """Call func(*args) in a resource-limited child and return its result.
+
+    func, args and the result cross a process boundary, so they must be
+    picklable (module-level functions or methods, bytes rather than open
+    files). Exceptions raised by func are re-raised here unchanged.
+
+    Args:
+        func: Parser to run
+        *args: Its arguments
+        timeout: Wall-clock limit in seconds (default: PARSE_TIMEOUT_SECONDS)
+
+    Raises:
+        SandboxError: The child hit a limit, crashed or missed its deadline
+    """
+    if not SANDBOX_ENABLED:
+        return func(*args)
+    try:
+        result = _run_in_child(
+            func, args, TIMEOUT_SECONDS if timeout is None else timeout, profiling.current()
+        )
+    except SandboxError as e:
+        metrics.SANDBOX_RUNS.inc(e.reason)
+        raise
+    except Exception:
+        metrics.SANDBOX_RUNS.inc("error")
+        raise
+    metrics.SANDBOX_RUNS.inc("ok")
+    return result
+
+
+def _run_in_child(func, args, timeout: float, profile: Optional[profiling.ProfileSession] = None):
+    ctx = _get_context()
+    receiver, sender = ctx.Pipe(duplex=False)
+    proc = ctx.Process(
+        target=_child,
+        args=(
+            sender, MEMORY_MB, CPU_SECONDS, func, args,
+            profile.interval if profile else None, tracing.current_context(),
+            memory_tracking.TRACKING or memory_tracking.current() is not None
+        ),
+        daemon=True
+    )
+    started = time.monotonic()
+    proc.start()
+    sender.close()
+    try:
+        if not receiver.poll(timeout):
+            raise SandboxError(
+                "timeout", f"Document parsing exceeded the {timeout:.0f}s time limit."
+            )
+        try:
+            ok, value, extras = receiver.recv()
+        except EOFError:
+            # Child died without reporting (rlimit signal, segfault in a C extension)
+            proc.join(max(0.0, timeout - (time.monotonic() - started)))
+            if resource is not None and proc.exitcode == -signal.SIGXCPU:
+                raise SandboxError("cpu", f"Document parsing exceeded the {CPU_SECONDS}s CPU limit.")
+            raise SandboxError("crashed", f"Document parser crashed (exit code {proc.exitcode}).")
+    finally:
+        if proc.is_alive():
+            proc.kill()
+        proc.join()
+        receiver.close()
+
+    metrics.REGISTRY.merge(extras["metrics"])
+    if extras["profile"] is not None:
+        profile.add("sandbox", extras["profile"])
+    tracing.export(extras["spans"])
+    if memory_tracking.current() is not None:
+        memory_tracking.current().merge(extras["memory"])
+    if ok:
+        return value
+    if value == "memory":
+        raise SandboxError("memory", f"Document parsing exceeded the {MEMORY_MB}MB memory limit.")
+    raise value
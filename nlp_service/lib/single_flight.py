@@ -0,0 +1,57 @@
+"""Coalesce concurrent identical async computations into one.
+
+The frontend double-submits and the backend retries on timeout, so the same
+resume often arrives twice while its first analysis is still running. Calls
+that share a key while one is in flight await that computation instead of
+starting their own; once it finishes the key is free again (results are not
+cached).
+"""
+import asyncio
+from typing import Awaitable, Callable, Dict, Hashable
+
+
+class SingleFlight:
+    """In-flight deduplication keyed by e.g. (content hash, options).
+
+    The shared computation runs as its own task, so a caller that is
+    cancelled (client disconnect) does not cancel it for the others.
+    Exceptions are raised to every caller of the flight.
+    """
+
+    def __init__(self):
+        self._flights: Dict[Hashable, asyncio.Future] = {}
+        self.started = 0
+        self.coalesced = 0
+
+    async def do(self, key: Hashable, compute: Callable[[], Awaitable]):
+        """Return compute()'s result, sharing it with concurrent calls for `key`.
+
+        Args:
+            key: Identity of the computation (must capture every input)
+            compute: Zero-argument coroutine function; only called by the
+                first caller of a flight
+        """
+        flight = self._flights.get(key)
+        if flight is None:
+            self.started += 1
+            flight = asyncio.ensure_future(compute())
+            self._flights[key] = flight
+            flight.add_done_callback(lambda done: self._finish(key, done))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(flight)
+
+    def _finish(self, key: Hashable, flight: asyncio.Future) -> None:
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+        if not flight.cancelled():
+            flight.exception()  # mark retrieved: callers may all have gone away
+
+    def stats(self) -> dict:
+        requests = self.started + self.coalesced
+        return {
+            "in_flight": len(self._flights),
+            "started": self.started,
+            "coalesced": self.coalesced,
+            "coalesced_ratio": round(self.coalesced / requests, 4) if requests else 0.0,
+        }
@@ -0,0 +1,358 @@
+"""Compiled skill matchers: Aho-Corasick automata with word-boundary rules.
+
+A matcher is built once per distinct (normalized) skill list and cached in an
+LRU, so repeated /analyze calls for the same job role cost one pass over the
+resume regardless of how many skills the role lists. RoleCatalog extends the
+same idea to ranking a resume against many roles at once.
+"""
+import hashlib
+import heapq
+import json
+import threading
+from array import array
+from collections import OrderedDict, deque
+
+from lib.metrics import CACHE_LOOKUPS
+
+
+def _is_word_char(ch: str) -> bool:
+    return ch.isalnum() or ch == "_"
+
+
+class Automaton:
+    """Multi-pattern matcher that reports each pattern found on word boundaries.
+
+    Boundary rule: a pattern edge that is a word character must not touch
+    another word character in the text ("go" matches "go," but not "google").
+    Edges that are punctuation ("c++", ".net") need no boundary on that side.
+
+    build() compiles the trie into flat arrays (a dense DFA over the pattern
+    alphabet plus output lists), so a built automaton can be written to and
+    mapped back from a snapshot without rebuilding it.
+    """
+
+    def __init__(self, patterns=()):
+        self._goto = [{}]
+        self._out = [[]]
+        self._patterns = []
+        self._built = False
+        for pattern in patterns:
+            self.add(pattern)
+
+    def add(self, pattern: str) -> int:
+        """Add a pattern and return its id (ids are assigned in insertion order)."""
+        if self._built:
+            raise RuntimeError("Automaton is already built")
+        pattern_id = len(self._patterns)
+        self._patterns.append(pattern)
+        state = 0
+        for ch in pattern:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({})
+                self._out.append([])
+            state = nxt
+        self._out[state].append(pattern_id)
+        return pattern_id
+
+    def build(self) -> "Automaton":
+        if self._built:
+            return self
+        goto, out = self._goto, self._out
+        # Column 0 is every character that appears in no pattern
+        charmap = {}
+        for ch in sorted({ch for p in self._patterns for ch in p}):
+            charmap[ch] = len(charmap) + 1
+        width = len(charmap) + 1
+        n_states = len(goto)
+
+        delta = array("I", [0]) * (n_states * width)
+        fail = [0] * n_states
+        for ch, nxt in goto[0].items():
+            delta[charmap[ch]] = nxt
+        # Breadth-first, so a state's fail row is complete before it is copied
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            row = state * width
+            fail_row = fail[state] * width
+            delta[row:row + width] = delta[fail_row:fail_row + width]
+            for ch, nxt in goto[state].items():
+                fail[nxt] = delta[fail_row + charmap[ch]]
+                out[nxt] = out[nxt] + out[fail[nxt]]
+                delta[row + charmap[ch]] = nxt
+                queue.append(nxt)
+
+        out_start = array("I", [0])
+        out_ids = array("I")
+        for ids in out:
+            out_ids.extend(ids)
+            out_start.append(len(out_ids))
+        # Boundary requirements per pattern: bit 0 = left edge, bit 1 = right edge
+        lengths = array("I", (len(p) for p in self._patterns))
+        flags = array("B", (
+            _is_word_char(p[0]) | _is_word_char(p[-1]) << 1 for p in self._patterns
+        ))
+        self._load(charmap, delta, out_start, out_ids, lengths, flags)
+        self._goto = self._out = None
+        return self
+
+    def _load(self, charmap, delta, out_start, out_ids, lengths, flags):
+        self._charmap = charmap
+        self._width = len(charmap) + 1
+        self._delta = delta
+        self._out_start = out_start
+        self._out_ids = out_ids
+        self._lengths = lengths
+        self._flags = flags
+        self._built = True
+
+    def to_sections(self, prefix: str) -> dict:
+        """Arrays and tables for lib.snapshot.write_snapshot."""
+        self.build()
+        return {
+            f"{prefix}.patterns": self._patterns,
+            f"{prefix}.charmap": self._charmap,
+            f"{prefix}.delta": self._delta,
+            f"{prefix}.out_start": self._out_start,
+            f"{prefix}.out_ids": self._out_ids,
+            f"{prefix}.lengths": self._lengths,
+            f"{prefix}.flags": self._flags,
+        }
+
+    @classmethod
+    def from_snapshot(cls, snapshot, prefix: str) -> "Automaton":
+        """Automaton over arrays mapped from a lib.snapshot.Snapshot (no copy)."""
+        automaton = cls()
+        automaton._goto = automaton._out = None
+        automaton._patterns = snapshot.section(f"{prefix}.patterns")
+        automaton._load(*(
+            snapshot.section(f"{prefix}.{name}")
+            for name in ("charmap", "delta", "out_start", "out_ids", "lengths", "flags")
+        ))
+        return automaton
+
+    @property
+    def patterns(self) -> list:
+        return self._patterns
+
+    def find(self, text: str) -> set:
+        """Return the ids of all patterns occurring in `text` on word boundaries."""
+        if not self._built:
+            self.build()
+        charmap, width, delta = self._charmap, self._width, self._delta
+        out_start, out_ids = self._out_start, self._out_ids
+        lengths, flags = self._lengths, self._flags
+        found = set()
+        state = 0
+        n = len(text)
+        for i, ch in enumerate(text):
+            state = delta[state * width + charmap.get(ch, 0)]
+            lo = out_start[state]
+            hi = out_start[state + 1]
+            if lo == hi:
+                continue
+            for k in range(lo, hi):
+                pattern_id = out_ids[k]
+                if pattern_id in found:
+                    continue
+                flag = flags[pattern_id]
+                start = i - lengths[pattern_id] + 1
+                if flag & 1 and start > 0 and _is_word_char(text[start - 1]):
+                    continue
+                if flag & 2 and i + 1 < n and _is_word_char(text[i + 1]):
+                    continue
+                found.add(pattern_id)
+        return found
+
+
+class RoleMatcher:
+    """Compiled matcher for one job role's skill list.
+
+    A skill counts as present when any of its words appears in the resume,
+    the same rule /analyze has always used, now evaluated on word boundaries.
+    """
+
+    def __init__(self, normalized_skills: tuple):
+        self.skills = normalized_skills
+        self.automaton = Automaton()
+        part_ids = {}
+        self._skill_parts = []
+        for skill in normalized_skills:
+            ids = set()
+            for part in set(skill.split()):
+                if part not in part_ids:
+                    part_ids[part] = self.automaton.add(part)
+                ids.add(part_ids[part])
+            self._skill_parts.append(ids)
+        self.automaton.build()
+
+    def match(self, resume_lower: str) -> list:
+        """Return one bool per skill, in the order the skills were given."""
+        found = self.automaton.find(resume_lower)
+        return [bool(parts & found) for parts in self._skill_parts]
+
+
+class RoleCatalog:
+    """Scores one resume against many job roles in a single pass.
+
+    Skills shared by several roles are matched once: the automaton maps
+    resume words to skills, an inverted index maps skills to the roles that
+    list them, and per-role hit counts accumulate in a sparse vector. Work is
+    proportional to the resume plus the postings of skills actually found,
+    not to the number of roles.
+    """
+
+    def __init__(self, roles: tuple):
+        # roles: tuple of (role_id, name, tuple of display skills)
+        self.roles = roles
+        self.automaton = Automaton()
+        part_ids = {}
+        skill_ids = {}
+        part_to_skills = []
+        self._skill_to_roles = []
+        self._role_skills = []
+        for role_index, (_, _, skills) in enumerate(roles):
+            role_skills = []
+            ids = set()
+            for skill in skills:
+                norm = normalize_skill(skill)
+                if not norm:
+                    continue
+                skill_id = skill_ids.get(norm)
+                if skill_id is None:
+                    skill_id = skill_ids[norm] = len(skill_ids)
+                    self._skill_to_roles.append([])
+                    for part in set(norm.split()):
+                        if part not in part_ids:
+                            part_ids[part] = self.automaton.add(part)
+                            part_to_skills.append([])
+                        part_to_skills[part_ids[part]].append(skill_id)
+                if skill_id not in ids:
+                    ids.add(skill_id)
+                    role_skills.append((skill, skill_id))
+                    self._skill_to_roles[skill_id].append(role_index)
+            self._role_skills.append(role_skills)
+        self._part_to_skills = part_to_skills
+        self.automaton.build()
+
+    @classmethod
+    def from_entries(cls, entries) -> "RoleCatalog":
+        """Build (or fetch from cache) a catalog from dicts with name/skills/id."""
+        return role_catalogs.get(_catalog_key_parts(entries))
+
+    def __len__(self) -> int:
+        return len(self.roles)
+
+    def rank(self, resume_text: str, top_k: int = 5) -> list:
+        """Return the top_k roles as dicts with score and matched/missing skills."""
+        found_parts = self.automaton.find(resume_text.strip().lower())
+        matched_skills = set()
+        for part_id in found_parts:
+            matched_skills.update(self._part_to_skills[part_id])
+
+        counts = {}
+        for skill_id in matched_skills:
+            for role_index in self._skill_to_roles[skill_id]:
+                counts[role_index] = counts.get(role_index, 0) + 1
+
+        def score(role_index):
+            total = len(self._role_skills[role_index]) or 1
+            return 100.0 * counts.get(role_index, 0) / total
+
+        top = heapq.nsmallest(
+            top_k, counts, key=lambda r: (-score(r), -counts[r], r)
+        )
+        # Pad with unmatched roles (catalog order) when fewer roles matched anything
+        if len(top) < top_k:
+            for role_index in range(len(self.roles)):
+                if len(top) >= top_k:
+                    break
+                if role_index not in counts:
+                    top.append(role_index)
+
+        ranked = []
+        for role_index in top:
+            role_id, name, _ = self.roles[role_index]
+            matched, missing = [], []
+            for skill, skill_id in self._role_skills[role_index]:
+                (matched if skill_id in matched_skills else missing).append(skill)
+            ranked.append({
+                "id": role_id,
+                "name": name,
+                "match_score": round(score(role_index), 1),
+                "matched_skills": matched,
+                "missing_skills": missing,
+            })
+        return ranked
+
+
+def _catalog_key_parts(entries) -> tuple:
+    roles = []
+    for entry in entries:
+        skills = tuple(s.strip() for s in entry.get("skills", []) if s and s.strip())
+        roles.append((entry.get("id"), entry.get("name", ""), skills))
+    return tuple(roles)
+
+
+def _catalog_key(roles: tuple) -> str:
+    return hashlib.sha1(json.dumps(roles, default=str).encode("utf-8")).hexdigest()
+
+
+def load_role_catalog(path: str) -> RoleCatalog:
+    """Load a role catalog JSON file: [{"id": .., "name": .., "skills": [..]}, ...]."""
+    with open(path, "r", encoding="utf-8") as f:
+        return RoleCatalog.from_entries(json.load(f))
+
+
+def normalize_skill(skill: str) -> str:
+    return " ".join(skill.strip().lower().split())
+
+
+def skill_list_key(normalized_skills) -> str:
+    """Stable cache key for a normalized skill list."""
+    return hashlib.sha1("\x1f".join(normalized_skills).encode("utf-8")).hexdigest()
+
+
+class MatcherCache:
+    """Thread-safe LRU of compiled matchers keyed by skill-list hash."""
+
+    def __init__(self, factory, max_size: int = 256, key=skill_list_key, name: str = "matcher"):
+        self._factory = factory
+        self.name = name
+        self._key = key
+        self._max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, normalized_skills: tuple):
+        key = self._key(normalized_skills)
+        with self._lock:
+            matcher = self._entries.get(key)
+            if matcher is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                CACHE_LOOKUPS.inc(self.name, "hit")
+                return matcher
+            self.misses += 1
+        CACHE_LOOKUPS.inc(self.name, "miss")
+        # Build outside the lock; a concurrent duplicate build is harmless
+        matcher = self._factory(normalized_skills)
+        with self._lock:
+            self._entries[key] = matcher
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_size:
+                self._entries.popitem(last=False)
+        return matcher
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"size": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+role_matchers = MatcherCache(RoleMatcher, name="role_matchers")
+role_catalogs = MatcherCache(RoleCatalog, max_size=16, key=_catalog_key, name="role_catalogs")
@@ -0,0 +1,129 @@
+"""Flat binary snapshots of compiled read-only structures, loaded through mmap.
+
+Layout: 8-byte magic, 4-byte little-endian header length, a JSON header, then
+8-byte aligned sections. Array sections are exposed as memoryviews over the
+mapped file (no copy, no unpickling); JSON sections hold the small tables
+that are cheaper to decode than to lay out by hand.
+"""
+import json
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from array import array
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: concurrent builds are not coordinated
+    fcntl = None
+
+MAGIC = b"CIPSNAP1"
+FORMAT_VERSION = 1
+_ALIGN = 8
+
+
+class SnapshotError(Exception):
+    """Raised when a snapshot file is missing, corrupt or incompatible."""
+
+
+def write_snapshot(path: str, meta: dict, sections: dict) -> None:
+    """Atomically write `sections` (name -> array.array | JSON-able) to `path`."""
+    table = {}
+    blobs = []
+    offset = 0
+    for name, value in sections.items():
+        if isinstance(value, array):
+            blob = value.tobytes()
+            kind = value.typecode
+        else:
+            blob = json.dumps(value, separators=(",", ":")).encode("utf-8")
+            kind = "json"
+        table[name] = [offset, len(blob), kind]
+        padding = (-len(blob)) % _ALIGN
+        blobs.append(blob + b"\0" * padding)
+        offset += len(blob) + padding
+
+    header = json.dumps({
+        "format": FORMAT_VERSION,
+        "byteorder": sys.byteorder,
+        "meta": meta,
+        "sections": table,
+    }, separators=(",", ":")).encode("utf-8")
+    header += b" " * ((-(len(MAGIC) + 4 + len(header))) % _ALIGN)
+
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".snapshot-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(MAGIC)
+            f.write(struct.pack("<I", len(header)))
+            f.write(header)
+            for blob in blobs:
+                f.write(blob)
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+class Snapshot:
+    """Read-only view of a snapshot file mapped into memory."""
+
+    def __init__(self, path: str):
+        self.path = path
+        try:
+            with open(path, "rb") as f:
+                self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError) as e:
+            raise SnapshotError(f"Cannot map snapshot {path}: {e}") from e
+
+        view = memoryview(self._mm)
+        if bytes(view[:len(MAGIC)]) != MAGIC:
+            raise SnapshotError(f"{path} is not a snapshot file")
+        try:
+            (header_len,) = struct.unpack_from("<I", self._mm, len(MAGIC))
+            body = len(MAGIC) + 4 + header_len
+            header = json.loads(bytes(view[len(MAGIC) + 4:body]))
+        except (struct.error, ValueError) as e:
+            raise SnapshotError(f"{path} has a corrupt header: {e}") from e
+        if header.get("format") != FORMAT_VERSION or header.get("byteorder") != sys.byteorder:
+            raise SnapshotError(f"{path} was built for an incompatible format")
+
+        self.meta = header["meta"]
+        self.size = len(self._mm)
+        self._view = view
+        self._body = body
+        self._sections = header["sections"]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._sections
+
+    def section(self, name: str):
+        """Memoryview (arrays) or decoded value (JSON) for a section."""
+        try:
+            offset, length, kind = self._sections[name]
+        except KeyError:
+            raise SnapshotError(f"{self.path} has no section '{name}'") from None
+        start = self._body + offset
+        raw = self._view[start:start + length]
+        if kind == "json":
+            return json.loads(bytes(raw))
+        return raw.cast(kind)
+
+
+@contextmanager
+def build_lock(path: str):
+    """Exclusive lock (path + ".lock") so only one process builds a snapshot."""
+    if fcntl is None:
+        yield
+        return
+    with open(path + ".lock", "w") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
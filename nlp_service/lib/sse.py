@@ -0,0 +1,13 @@
+"""Server-sent events framing (text/event-stream)."""
+import json
+
+# Sent on idle streams so proxies do not time the connection out
+KEEPALIVE = ": keep-alive\n\n"
+
+# Response headers for an event stream (no caching, no proxy buffering)
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+
+def sse_event(event: str, data) -> str:
+    """One SSE message with a JSON payload."""
+    return f"event: {event}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
@@ -0,0 +1,219 @@
+"""Lightweight tracing spans, exported in the OpenTelemetry (OTLP/JSON) format.
+
+Spans follow the OpenTelemetry data model: W3C trace context (`traceparent`
+header) links them to the caller's trace, and the file exporter writes one
+OTLP/JSON ExportTraceServiceRequest per line, the format the OpenTelemetry
+Collector's otlpjsonfile receiver reads. Configured per deployment:
+
+    TRACE_EXPORTER   "file", "console" (one line per span on stderr) or unset (off)
+    TRACE_FILE       file exporter path (default var/traces/spans.jsonl)
+
+With no exporter, span() and traced() only check a module flag, so tracing
+costs nothing measurable when off. Spans finished inside a parse-sandbox
+child are shipped back with its result and exported by the parent (see
+lib/sandbox.py).
+"""
+import contextvars
+import functools
+import json
+import os
+import re
+import sys
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Any, List, Optional, Tuple
+
+_SERVICE_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+EXPORTER = os.environ.get("TRACE_EXPORTER", "").strip().lower() or None
+TRACE_FILE = os.environ.get("TRACE_FILE", os.path.join(_SERVICE_ROOT, "var", "traces", "spans.jsonl"))
+SERVICE_NAME = os.environ.get("TRACE_SERVICE_NAME", "career-intelligence-nlp")
+
+# OTLP span kinds
+KIND_INTERNAL = 1
+KIND_SERVER = 2
+
+_TRACEPARENT = re.compile(r"^[0-9a-f]{2}-([0-9a-f]{32})-([0-9a-f]{16})-[0-9a-f]{2}$")
+
+_current: contextvars.ContextVar = contextvars.ContextVar("trace_span", default=None)
+# Set in a sandbox child: finished spans are collected here instead of exported
+_buffer: Optional[List[dict]] = None
+_write_lock = threading.Lock()
+
+
+def enabled() -> bool:
+    return EXPORTER is not None
+
+
+def parse_traceparent(header: Optional[str]) -> Optional[Tuple[str, str]]:
+    """(trace id, parent span id) from a W3C traceparent header, or None."""
+    match = _TRACEPARENT.match((header or "").strip().lower())
+    if match is None or match.group(1) == "0" * 32 or match.group(2) == "0" * 16:
+        return None
+    return match.group(1), match.group(2)
+
+
+class Span:
+    __slots__ = ("name", "kind", "trace_id", "span_id", "parent_id", "start_ns", "end_ns", "attributes", "error")
+
+    def __init__(self, name: str, trace_id: str, parent_id: Optional[str], kind: int, attributes: dict):
+        self.name = name
+        self.kind = kind
+        self.trace_id = trace_id
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self.attributes = attributes
+        self.error = None
+
+    @property
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def to_otlp(self) -> dict:
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": [_otlp_attribute(key, value) for key, value in self.attributes.items()],
+            "status": {"code": 2, "message": self.error} if self.error else {"code": 1},
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        return span
+
+
+def _otlp_attribute(key: str, value: Any) -> dict:
+    if isinstance(value, bool):
+        typed = {"boolValue": value}
+    elif isinstance(value, int):
+        typed = {"intValue": str(value)}
+    elif isinstance(value, float):
+        typed = {"doubleValue": value}
+    else:
+        typed = {"stringValue": str(value)}
+    return {"key": key, "value": typed}
+
+
+@contextmanager
+def _span(name: str, kind: int, parent: Optional[Tuple[str, str]], attributes: dict):
+    current = _current.get()
+    if parent is None and current is not None:
+        parent = (current.trace_id, current.span_id)
+    trace_id, parent_id = parent if parent is not None else (os.urandom(16).hex(), None)
+    span = Span(name, trace_id, parent_id, kind, attributes)
+    token = _current.set(span)
+    try:
+        yield span
+    except BaseException as e:
+        span.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        _current.reset(token)
+        span.end_ns = time.time_ns()
+        _finish(span)
+
+
+_NOOP = nullcontext()
+
+
+def span(name: str, kind: int = KIND_INTERNAL, parent: Optional[Tuple[str, str]] = None, **attributes):
+    """Context manager timing a block as a span (yields the Span, or None when off).
+
+    Args:
+        name: Span name, e.g. "ResumeParser.parse"
+        kind: KIND_INTERNAL or KIND_SERVER
+        parent: Remote (trace id, span id) to continue; default is the
+            current span, or a new trace
+        **attributes: Initial span attributes
+    """
+    if EXPORTER is None:
+        return _NOOP
+    return _span(name, kind, parent, attributes)
+
+
+def traced(name: str):
+    """Decorator running each call of a function in a span named `name`."""
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if EXPORTER is None:
+                return func(*args, **kwargs)
+            with _span(name, KIND_INTERNAL, None, {}):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def set_attributes(**attributes) -> None:
+    """Add attributes to the current span (no-op outside a span or when off)."""
+    current = _current.get()
+    if current is not None:
+        current.attributes.update(attributes)
+
+
+def current_context() -> Optional[Tuple[str, str]]:
+    """(trace id, span id) of the current span, to continue the trace elsewhere."""
+    current = _current.get()
+    return (current.trace_id, current.span_id) if current is not None else None
+
+
+@contextmanager
+def collect(parent: Tuple[str, str]):
+    """Buffer spans finished in the block (children of `parent`) instead of exporting them.
+
+    Used in a sandbox child; yields the list the OTLP span dicts are added to.
+    """
+    global _buffer
+    _buffer = spans = []
+    try:
+        with span("sandbox", parent=parent, pid=os.getpid()):
+            yield spans
+    finally:
+        _buffer = None
+
+
+def export(spans: List[dict]) -> None:
+    """Export spans recorded elsewhere (a sandbox child) as one batch."""
+    if spans and EXPORTER is not None:
+        _write(spans)
+
+
+def _finish(span: Span) -> None:
+    if _buffer is not None:
+        _buffer.append(span.to_otlp())
+    else:
+        _write([span.to_otlp()])
+
+
+def _write(spans: List[dict]) -> None:
+    if EXPORTER == "console":
+        for item in spans:
+            duration_ms = (int(item["endTimeUnixNano"]) - int(item["startTimeUnixNano"])) / 1e6
+            attributes = " ".join(
+                f"{a['key']}={next(iter(a['value'].values()))}" for a in item["attributes"]
+            )
+            print(
+                f"[trace {item['traceId']}] {item['name']} {duration_ms:.1f}ms {attributes}".rstrip(),
+                file=sys.stderr
+            )
+        return
+    line = json.dumps({
+        "resourceSpans": [{
+            "resource": {"attributes": [_otlp_attribute("service.name", SERVICE_NAME)]},
+            "scopeSpans": [{"scope": {"name": "lib.tracing"}, "spans": spans}],
+        }]
+    }, separators=(",", ":")) + "\n"
+    with _write_lock:
+        os.makedirs(os.path.dirname(TRACE_FILE), exist_ok=True)
+        # One O_APPEND write per batch keeps lines whole across worker processes
+        fd = os.open(TRACE_FILE, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+        try:
+            os.write(fd, line.encode("utf-8"))
+        finally:
+            os.close(fd)
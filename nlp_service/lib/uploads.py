@@ -0,0 +1,16 @@
+"""Content sniffing for uploaded resumes (FastAPI app and Vercel handlers)."""
+
+# PDF readers accept a little junk before the header, so "%PDF-" may start
+# anywhere in the first KB; DOCX is a zip archive and starts with a local
+# file header.
+SNIFF_BYTES = 1024
+_MAGIC = {
+    ".pdf": lambda head: b"%PDF-" in head[:SNIFF_BYTES],
+    ".docx": lambda head: head[:4] == b"PK\x03\x04",
+}
+
+
+def looks_like(ext: str, head) -> bool:
+    """True if the first bytes of an upload match its declared extension."""
+    check = _MAGIC.get(ext)
+    return bool(check and check(bytes(head[:SNIFF_BYTES])))
@@ -2,25 +2,89 @@
 NLP microservice for Phase 1: PDF text extraction + resume vs job-role analysis.
 Node backend calls this over HTTP.
 """
-import io
+import asyncio
+import hashlib
+import hmac
 import os
-import re
+import shutil
 import tempfile
-from typing import Optional
+import time
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from typing import Any, Optional, Union
 
-import pdfplumber
-from fastapi import FastAPI, File, HTTPException, UploadFile
+
+from fastapi import FastAPI, File, Form, Header, HTTPException, UploadFile
+from fastapi.concurrency import run_in_threadpool
+from fastapi.encoders import jsonable_encoder
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from fastapi.responses import FileResponse, JSONResponse, PlainTextResponse, StreamingResponse
+from pydantic import BaseModel, ValidationError
 
 # Import ATS analysis services
 from app.services.resume_parser import ResumeParser
 from app.services.ats_scorer import ATSScorer
 from app.services.skill_extractor import SkillExtractor
 from app.services.domain_classifier import DomainClassifier
-from app.models.schemas import AnalysisResponse
+from app.services.analysis_pipeline import AnalysisPipeline
+from app.services.analysis_store import analysis_store
+from app.services.job_matcher import JobMatcher
+from app.services.taxonomy import taxonomy_store
+from app.job_worker import WORKER_PROCESSES, job_payload, start_workers, stop_workers
+from app.models.schemas import AnalysisResponse, JobAccepted, JobStatus, SimulationResponse
+from app.services.job_queue import FAILED, SUCCEEDED, job_queue
+from app.request_metrics import RequestMetricsMiddleware
+from app.request_tracing import RequestTracingMiddleware
+from app.upload_limits import UploadLimitMiddleware
+from lib.analysis_modes import ANALYSIS_MODES, DEFAULT_MODE, resolve_mode
+from lib.callback_urls import CallbackURLError, check_callback_url
+from lib import memory_tracking, metrics, profiling
+from lib.multipart import ENVELOPE_BYTES
+from lib.pdf_utils import analyze_skills, ats_layout_from_pdf, extract_pdf_text
+from lib.skill_matcher import RoleCatalog, load_role_catalog, role_catalogs, role_matchers
+from lib.process_stats import cgroup_memory, memory_kb
+from lib.single_flight import SingleFlight
+from lib.sandbox import (
+    TIMEOUT_SECONDS as PARSE_TIMEOUT_SECONDS, SandboxError, run_sandboxed, warm_up as warm_parse_sandbox
+)
+from lib.snapshot import SnapshotError
+from lib.sse import KEEPALIVE, SSE_HEADERS, sse_event
+from lib.uploads import SNIFF_BYTES, looks_like
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Warm the taxonomy (an mmap of the snapshot) and the role catalog before
+    # the first request; PDF, DOCX and OCR libraries still load on first use
+    global role_catalog
+    await run_in_threadpool(taxonomy_store.current)
+    warm_parse_sandbox()
+    if memory_tracking.TRACKING:
+        memory_tracking.start()
+    if os.environ.get("ROLE_CATALOG_PATH"):
+        role_catalog = await run_in_threadpool(load_role_catalog, os.environ["ROLE_CATALOG_PATH"])
+    # Workers for /api/jobs/analyze (JOB_WORKERS=0 when they run separately)
+    workers = start_workers() if WORKER_PROCESSES > 0 else None
+    yield
+    if workers:
+        await run_in_threadpool(stop_workers, *workers)
+
+
+app = FastAPI(title="Career Intelligence NLP Service", version="0.1.0", lifespan=lifespan)
 
-app = FastAPI(title="Career Intelligence NLP Service", version="0.1.0")
+MAX_FILE_SIZE = 5 * 1024 * 1024  # 5MB
+ALLOWED_EXTENSIONS = {".pdf", ".docx"}
+
+# Upload routes stop reading once the body passes the file limit (plus
+# room for the multipart envelope); added before CORS so 413s get CORS headers
+app.add_middleware(
+    UploadLimitMiddleware,
+    limits={
+        path: MAX_FILE_SIZE + ENVELOPE_BYTES
+        for path in ("/extract-text", "/layout-check", "/api/analyze", "/api/analyze/stream", "/api/jobs/analyze")
+    },
+    detail="File size exceeds 5MB limit",
+)
 
 # CORS configuration
 app.add_middleware(
@@ -31,182 +95,138 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialize ATS services
-resume_parser = ResumeParser()
-ats_scorer = ATSScorer()
-skill_extractor = SkillExtractor()
-domain_classifier = DomainClassifier()
+# Root span per request, continuing the backend's traceparent (TRACE_EXPORTER)
+app.add_middleware(RequestTracingMiddleware)
 
-MAX_FILE_SIZE = 5 * 1024 * 1024  # 5MB
-ALLOWED_EXTENSIONS = {".pdf", ".docx"}
+# Outermost, so rejected uploads and CORS preflights are counted too
+app.add_middleware(RequestMetricsMiddleware)
 
 
-_HEADING_KEYWORDS = [
-    "summary",
-    "professional summary",
-    "profile",
-    "objective",
-    "skills",
-    "experience",
-    "work experience",
-    "education",
-    "projects",
-    "certifications",
-]
-
-
-def _extract_pdf_text(raw: bytes) -> str:
-    with pdfplumber.open(io.BytesIO(raw)) as pdf:
-        parts = []
-        for page in pdf.pages:
-            t = page.extract_text()
-            if t:
-                parts.append(t)
-        return "\n\n".join(parts).strip() if parts else ""
-
-
-def _detect_columns(words: list[dict]) -> bool:
-    if len(words) < 40:
-        return False
-    x_positions = sorted(w.get("x0") for w in words if isinstance(w.get("x0"), (int, float)))
-    if len(x_positions) < 40:
-        return False
-    gaps = [x_positions[i] - x_positions[i - 1] for i in range(1, len(x_positions))]
-    max_gap = max(gaps) if gaps else 0
-    if max_gap < 100:
-        return False
-    split_index = gaps.index(max_gap) + 1
-    left = split_index
-    right = len(x_positions) - split_index
-    return left >= 10 and right >= 10
+# ATS services are built on first use so importing the app stays cheap
+@lru_cache(maxsize=None)
+def get_analysis_pipeline() -> AnalysisPipeline:
+    return AnalysisPipeline(ResumeParser(), SkillExtractor(), DomainClassifier(), ATSScorer())
 
 
-def _count_bullets(text: str) -> int:
-    count = 0
-    for line in text.splitlines():
-        if re.match(r"^\s*([•\-\*])\s+", line):
-            count += 1
-    return count
+@lru_cache(maxsize=None)
+def get_job_matcher() -> JobMatcher:
+    return JobMatcher()
 
 
-def _extract_contact_signals(text: str) -> dict:
-    email_match = re.search(r"\b[\w\.-]+@[\w\.-]+\.\w+\b", text)
-    return {
-        "email": email_match.group(0) if email_match else None,
-    }
+async def _check_upload(file: UploadFile, file_ext: str) -> None:
+    """Size and magic-byte checks on a spooled upload, before any parsing.
 
+    Only the first chunk is read; the file stays in Starlette's spool.
+    """
+    head = await file.read(SNIFF_BYTES)
+    if not looks_like(file_ext, head):
+        raise HTTPException(
+            status_code=400,
+            detail=f"File content is not a valid {file_ext.lstrip('.').upper()} document."
+        )
+    size = file.size
+    if size is None:
+        size = await run_in_threadpool(lambda: file.file.seek(0, os.SEEK_END))
+    if size > MAX_FILE_SIZE:
+        raise HTTPException(status_code=413, detail="File size exceeds 5MB limit")
+    await file.seek(0)
 
-def _ats_layout_from_pdf(raw: bytes) -> dict:
-    flags = {"tables": False, "images": False, "columns": False, "standard_headings": False}
-    issues = []
-    headings_found = set()
-    bullet_count = 0
-
-    with pdfplumber.open(io.BytesIO(raw)) as pdf:
-        for page in pdf.pages:
-            text = page.extract_text() or ""
-            lower = text.lower()
-            for heading in _HEADING_KEYWORDS:
-                if heading in lower:
-                    headings_found.add(heading)
-            bullet_count += _count_bullets(text)
-
-            if page.images:
-                flags["images"] = True
-            try:
-                tables = page.extract_tables()
-                if tables and any(len(t) > 0 for t in tables):
-                    flags["tables"] = True
-            except Exception:
-                pass
-
-            words = page.extract_words() or []
-            if _detect_columns(words):
-                flags["columns"] = True
-
-    flags["standard_headings"] = len(headings_found) > 0
-
-    score = 0
-    if not flags["tables"]:
-        score += 15
-    else:
-        issues.append("Tables detected")
-    if not flags["images"]:
-        score += 10
-    else:
-        issues.append("Images detected")
-    if not flags["columns"]:
-        score += 15
-    else:
-        issues.append("Multiple columns detected")
-    if flags["standard_headings"]:
-        score += 15
-    else:
-        issues.append("Standard section headings missing")
-    if bullet_count >= 3:
-        score += 10
-    else:
-        issues.append("Bullet points not detected")
 
-    text = _extract_pdf_text(raw)
-    contact = _extract_contact_signals(text)
-    if contact.get("email"):
-        score += 10
-    else:
-        issues.append("Contact email not detected")
+def _profiling_requested(profile: bool, x_profile: Optional[str], x_admin_token: Optional[str]) -> bool:
+    """Whether to profile this request (`?profile=1` or `X-Profile: 1`); admin only."""
+    if not profile and (x_profile or "").lower() not in ("1", "true"):
+        return False
+    _require_admin(x_admin_token)
+    return True
 
-    score = max(0, min(100, score))
 
-    return {
-        "ats_layout_score": score,
-        "issues": issues,
-        "flags": flags,
-        "signals": {
-            "bullet_count": bullet_count,
-            "headings_found": sorted(headings_found),
-            "email": contact.get("email"),
-        },
-    }
+async def _run_blocking(profiled: bool, func, *args, **kwargs) -> tuple:
+    """Run blocking work in the threadpool, under the sampling profiler if asked.
+
+    Returns:
+        Tuple of (func's result, profile report or None)
+    """
+    if not profiled:
+        return await run_in_threadpool(func, *args, **kwargs), None
+    result, report = await run_in_threadpool(profiling.profile_call, func, *args, **kwargs)
+    report["collapsed_stacks_url"] = f"/admin/profiles/{report['profile_id']}"
+    return result, report
 
 
 @app.post("/extract-text")
-async def extract_text(file: UploadFile = File(...)):
-    """Accept a PDF file, return extracted plain text."""
+async def extract_text(
+    file: UploadFile = File(...),
+    profile: bool = False,
+    x_profile: Optional[str] = Header(None),
+    x_admin_token: Optional[str] = Header(None)
+):
+    """Accept a PDF file, return extracted plain text.
+
+    With `profile=1` (or an `X-Profile: 1` header) and the admin token, the
+    request runs under the sampling profiler and the response carries a
+    `profile` with its slowest functions and a link to the collapsed stacks.
+    """
+    profiled = _profiling_requested(profile, x_profile, x_admin_token)
     if not file.filename or not file.filename.lower().endswith(".pdf"):
         raise HTTPException(status_code=400, detail="Only PDF files are allowed.")
 
     try:
+        await _check_upload(file, ".pdf")
         raw = await file.read()
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=f"Failed to read file: {e}") from e
+        try:
+            text, report = await _run_blocking(profiled, run_sandboxed, extract_pdf_text, raw)
+        except Exception as e:
+            raise HTTPException(status_code=422, detail=f"PDF extraction failed: {e}") from e
     finally:
         await file.close()
 
-    try:
-        text = _extract_pdf_text(raw)
-    except Exception as e:
-        raise HTTPException(status_code=422, detail=f"PDF extraction failed: {e}") from e
-
+    if report is not None:
+        return {"text": text, "profile": report}
     return {"text": text}
 
 
+def _resolve_mode_or_400(mode: str) -> str:
+    try:
+        return resolve_mode(mode)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+
+
 @app.post("/layout-check")
-async def layout_check(file: UploadFile = File(...)):
-    """Accept a PDF file, return ATS layout score + issues."""
+async def layout_check(
+    file: UploadFile = File(...),
+    mode: str = DEFAULT_MODE,
+    profile: bool = False,
+    x_profile: Optional[str] = Header(None),
+    x_admin_token: Optional[str] = Header(None)
+):
+    """Accept a PDF file, return ATS layout score + issues.
+
+    `mode` selects the quality tier: fast (pypdf only, no table/column
+    analysis), balanced (default) or thorough (column reflow + per-page OCR).
+    Checks a tier does not run are reported as `null` flags and listed in
+    `skipped_stages`; the score is scaled over the checks that ran.
+    `profile` works as on /extract-text.
+    """
+    mode = _resolve_mode_or_400(mode)
+    profiled = _profiling_requested(profile, x_profile, x_admin_token)
     if not file.filename or not file.filename.lower().endswith(".pdf"):
         raise HTTPException(status_code=400, detail="Only PDF files are allowed.")
     try:
+        await _check_upload(file, ".pdf")
         raw = await file.read()
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=f"Failed to read file: {e}") from e
+        try:
+            result, report = await _run_blocking(
+                profiled, run_sandboxed, ats_layout_from_pdf, raw, mode,
+                timeout=ANALYSIS_MODES[mode]["deadline_seconds"] + PARSE_TIMEOUT_SECONDS
+            )
+        except Exception as e:
+            raise HTTPException(status_code=422, detail=f"Layout analysis failed: {e}") from e
     finally:
         await file.close()
 
-    try:
-        result = _ats_layout_from_pdf(raw)
-    except Exception as e:
-        raise HTTPException(status_code=422, detail=f"Layout analysis failed: {e}") from e
-
+    if report is not None:
+        result["profile"] = report
     return result
 
 
@@ -229,43 +249,111 @@ class AnalyzeResponse(BaseModel):
     roadmap: list[RoadmapItem]
 
 
-def _normalize(s: str) -> str:
-    return s.strip().lower()
-
-
 @app.post("/analyze", response_model=AnalyzeResponse)
 async def analyze(body: AnalyzeRequest):
-    """Stub: resume text + job role skills -> match score, matched/missing/weak, roadmap."""
-    resume_lower = _normalize(body.resume_text)
-    resume_words = set(resume_lower.split())
-    job_skills = [s.strip() for s in body.job_role_skills if s.strip()]
-    skill_dict = body.skill_dictionary or job_skills
-
-    matched = []
-    missing = []
-
-    for skill in job_skills:
-        snorm = _normalize(skill)
-        skill_parts = set(snorm.split())
-        if skill_parts & resume_words or any(p in resume_lower for p in skill_parts):
-            matched.append(skill)
-        else:
-            missing.append(skill)
-
-    total = len(job_skills) or 1
-    match_score = round(100.0 * len(matched) / total, 1)
-    roadmap = [
-        RoadmapItem(skill=sk, steps=[f"Course for {sk}", f"Project using {sk}"])
-        for sk in missing[:10]
-    ]
+    """Resume text + job role skills -> match score, matched/missing/weak, roadmap.
+
+    Role skill lists are compiled once into word-boundary matchers and
+    cached, so repeated roles cost a single pass over the resume.
+    """
+    return AnalyzeResponse(**analyze_skills(body.resume_text, body.job_role_skills, body.skill_dictionary))
+
+
+class RoleSkills(BaseModel):
+    id: Optional[int] = None
+    name: str
+    skills: list[str]
 
-    return AnalyzeResponse(
-        match_score=match_score,
-        matched_skills=matched,
-        missing_skills=missing,
-        weak_skills=[],
-        roadmap=roadmap,
+
+class RankRequest(BaseModel):
+    resume_text: str
+    roles: Optional[list[RoleSkills]] = None  # omit to rank against the preloaded catalog
+    top_k: int = 5
+
+
+class RankedRole(BaseModel):
+    id: Optional[int] = None
+    name: str
+    match_score: float
+    matched_skills: list[str]
+    missing_skills: list[str]
+
+
+class RankResponse(BaseModel):
+    roles: list[RankedRole]
+    total_roles: int
+
+
+# Role catalog preloaded via ROLE_CATALOG_PATH (at startup) or PUT /analyze/roles
+role_catalog: Optional[RoleCatalog] = None
+
+
+@app.put("/analyze/roles")
+async def load_roles(roles: list[RoleSkills]):
+    """Preload the job-role catalog used by /analyze/rank when no roles are sent."""
+    global role_catalog
+    role_catalog = RoleCatalog.from_entries([r.model_dump() for r in roles])
+    return {"total_roles": len(role_catalog)}
+
+
+@app.post("/analyze/rank", response_model=RankResponse)
+async def rank_roles(body: RankRequest):
+    """Rank one resume against every job role in a single pass.
+
+    Uses the roles in the request, or the preloaded catalog when omitted.
+    """
+    if body.roles is not None:
+        catalog = RoleCatalog.from_entries([r.model_dump() for r in body.roles])
+    elif role_catalog is not None:
+        catalog = role_catalog
+    else:
+        raise HTTPException(status_code=400, detail="No roles provided and no role catalog loaded.")
+    if body.top_k < 1:
+        raise HTTPException(status_code=400, detail="top_k must be at least 1.")
+
+    ranked = catalog.rank(body.resume_text, top_k=body.top_k)
+    return RankResponse(roles=[RankedRole(**r) for r in ranked], total_roles=len(catalog))
+
+
+class JobPosting(BaseModel):
+    id: Optional[Union[int, str]] = None
+    title: Optional[str] = None
+    description: str = ""
+
+
+class JobMatchRequest(BaseModel):
+    resume_text: str
+    jobs: list[JobPosting]
+    top_k: Optional[int] = None
+
+
+class JobMatch(BaseModel):
+    id: Optional[Union[int, str]] = None
+    title: Optional[str] = None
+    match_score: float
+    matched_skills: list[str]
+    missing_skills: list[str]
+
+
+class JobMatchResponse(BaseModel):
+    jobs: list[JobMatch]
+    total_jobs: int
+    resume_skills: list[str]
+
+
+@app.post("/analyze/jobs", response_model=JobMatchResponse)
+async def match_jobs(body: JobMatchRequest):
+    """Score a resume against a batch of job postings (e.g. job_search_cache results).
+
+    Job skills come from the taxonomy's skill vocabulary; overlap is computed
+    on skill-id bitsets, and results are returned best match first.
+    """
+    if body.top_k is not None and body.top_k < 1:
+        raise HTTPException(status_code=400, detail="top_k must be at least 1.")
+    result = await run_in_threadpool(
+        get_job_matcher().rank, body.resume_text, [j.model_dump() for j in body.jobs], body.top_k
     )
+    return JobMatchResponse(**result)
 
 
 @app.get("/health")
@@ -273,11 +361,185 @@ def health():
     return {"status": "ok"}
 
 
+def _require_admin(token: Optional[str]) -> None:
+    expected = os.environ.get("ADMIN_TOKEN")
+    if not expected:
+        raise HTTPException(status_code=403, detail="Admin endpoints are disabled (ADMIN_TOKEN not set).")
+    if not token or not hmac.compare_digest(token, expected):
+        raise HTTPException(status_code=401, detail="Invalid admin token.")
+
+
+@app.get("/admin/taxonomy")
+def taxonomy_status(x_admin_token: Optional[str] = Header(None)):
+    """Active taxonomy version and this worker's memory (snapshot pages are shared)."""
+    _require_admin(x_admin_token)
+    return {"taxonomy": taxonomy_store.current().info(), "pid": os.getpid(), "memory": memory_kb()}
+
+
+@app.get("/admin/stats")
+def service_stats(x_admin_token: Optional[str] = Header(None)):
+    """Request coalescing counters (analyses started vs. served from an in-flight one) and job queue depth."""
+    _require_admin(x_admin_token)
+    return {
+        "analysis_coalescing": analysis_flights.stats(),
+        "jobs": job_queue.counts(),
+        "pid": os.getpid(),
+    }
+
+
+def _scrape_time_metrics():
+    """Gauges computed when /metrics is scraped rather than on the request path."""
+    lookups = metrics.CACHE_LOOKUPS.snapshot()
+    ratios = []
+    for cache in sorted({cache for cache, _ in lookups}):
+        hits = lookups.get((cache, "hit"), 0)
+        total = hits + lookups.get((cache, "miss"), 0)
+        ratios.append(({"cache": cache}, round(hits / total, 4) if total else 0.0))
+    yield "nlp_cache_hit_ratio", "gauge", "Cache hits over lookups since start.", ratios
+    yield "nlp_cache_entries", "gauge", "Entries held per cache in this process.", [
+        ({"cache": "role_matchers"}, role_matchers.stats()["size"]),
+        ({"cache": "role_catalogs"}, role_catalogs.stats()["size"]),
+    ]
+
+    flights = analysis_flights.stats()
+    yield "nlp_analyses_in_flight", "gauge", "Distinct resume analyses running.", [({}, flights["in_flight"])]
+    yield "nlp_analyses_coalesced_total", "counter", "Analysis requests served by an in-flight analysis.", [
+        ({}, flights["coalesced"])
+    ]
+
+    memory = memory_kb()
+    if memory:
+        yield "process_resident_memory_bytes", "gauge", "Resident memory of this worker.", [
+            ({}, memory["rss_kb"] * 1024)
+        ]
+    container = cgroup_memory()
+    if container:
+        yield "nlp_container_memory_working_set_bytes", "gauge", "Working set of the container (cgroup).", [
+            ({}, container["working_set_bytes"])
+        ]
+    if memory_tracking.SOFT_LIMIT_BYTES:
+        yield "nlp_memory_soft_limit_bytes", "gauge", "Soft memory ceiling at which OCR scales down.", [
+            ({}, memory_tracking.SOFT_LIMIT_BYTES)
+        ]
+    try:
+        jobs = job_queue.counts()
+    except Exception:
+        jobs = None  # queue database unavailable; omit rather than fail the scrape
+    if jobs is not None:
+        yield "nlp_jobs", "gauge", "Analysis jobs by status.", [
+            ({"status": status}, count) for status, count in sorted(jobs.items())
+        ]
+
+
+metrics.REGISTRY.add_collector(_scrape_time_metrics)
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def prometheus_metrics():
+    """Prometheus scrape endpoint: request and per-stage latency histograms,
+    OCR trigger reasons, cache hit ratios, in-flight work and memory.
+
+    Values are per worker process; scrape each worker (or run one worker).
+    """
+    return PlainTextResponse(metrics.REGISTRY.render(), media_type=metrics.CONTENT_TYPE)
+
+
+@app.get("/admin/profiles/{profile_id}")
+def download_profile(profile_id: str, x_admin_token: Optional[str] = Header(None)):
+    """Collapsed stacks of a profiled request (flamegraph.pl / speedscope input)."""
+    _require_admin(x_admin_token)
+    path = profiling.profile_path(profile_id)
+    if path is None or not os.path.exists(path):
+        raise HTTPException(status_code=404, detail="Profile not found.")
+    return FileResponse(path, media_type="text/plain", filename=f"{profile_id}.collapsed")
+
+
+@app.post("/admin/taxonomy/reload")
+async def reload_taxonomy(rebuild: bool = False, x_admin_token: Optional[str] = Header(None)):
+    """Hot-swap the skill/domain taxonomy without restarting the worker.
+
+    Loads the snapshot at TAXONOMY_SNAPSHOT_PATH (or compiles taxonomy.json
+    when the snapshot is stale). With rebuild=true the snapshot is recompiled
+    from taxonomy.json first; other workers pick up the replaced file within
+    TAXONOMY_REFRESH_SECONDS. Requests already running keep the old version.
+    """
+    _require_admin(x_admin_token)
+    previous = taxonomy_store.current()
+    try:
+        taxonomy = await run_in_threadpool(taxonomy_store.reload, rebuild)
+    except (OSError, ValueError, KeyError, SnapshotError) as e:
+        raise HTTPException(status_code=422, detail=f"Taxonomy reload failed: {e}") from e
+    return {"previous": previous.info(), "current": taxonomy.info()}
+
+
+# In-flight /api/analyze computations, keyed by (content sha256, extension, mode)
+analysis_flights = SingleFlight()
+
+# Strong references to fire-and-forget tasks until they finish
+_background_tasks: set = set()
+
+
+def _content_sha256(fileobj) -> str:
+    digest = hashlib.sha256()
+    fileobj.seek(0)
+    for chunk in iter(lambda: fileobj.read(1024 * 1024), b""):
+        digest.update(chunk)
+    fileobj.seek(0)
+    return digest.hexdigest()
+
+
+def _analyze_upload(fileobj, file_ext: str, mode: str, provisional: bool = False) -> AnalysisResponse:
+    """Run the pipeline on a spooled upload via a temporary file on disk.
+
+    With `provisional`, a document that needs OCR gets its native-text
+    analysis back at once and the full analysis is queued as a job.
+    """
+    # Copy the spooled upload to a temporary file in chunks
+    with tempfile.NamedTemporaryFile(delete=False, suffix=file_ext) as tmp_file:
+        tmp_path = tmp_file.name
+        shutil.copyfileobj(fileobj, tmp_file)
+    try:
+        response = get_analysis_pipeline().run(tmp_path, file_ext, mode, defer_ocr=provisional)
+        if response.provisional:
+            # The upgrade job takes over the file
+            job_id = job_queue.new_id()
+            job_path = job_queue.file_path_for(job_id, file_ext)
+            shutil.move(tmp_path, job_path)
+            job_queue.enqueue(job_id, "analyze", job_path, file_ext, {"mode": mode})
+            response.upgrade_job_id = job_id
+        return response
+    finally:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+
+
 @app.post("/api/analyze", response_model=AnalysisResponse)
-async def analyze_resume(file: UploadFile = File(...)):
+async def analyze_resume(
+    file: UploadFile = File(...),
+    mode: str = DEFAULT_MODE,
+    provisional: bool = False,
+    profile: bool = False,
+    x_profile: Optional[str] = Header(None),
+    x_admin_token: Optional[str] = Header(None)
+):
     """
     Analyze uploaded resume and return comprehensive ATS analysis
+
+    `mode` trades accuracy for latency: fast (pypdf text only, no table
+    check, OCR or suggestions), balanced (default) or thorough (pdfplumber,
+    per-page OCR, column reflow). The response reports the tier that ran.
+
+    With `provisional=true`, a scanned resume that needs OCR is scored on its
+    native text and returned immediately with `provisional: true`; the OCR
+    analysis runs as job `upgrade_job_id` (GET /api/jobs/{id} or its
+    /events stream).
+
+    `profile` works as on /extract-text; a profiled request always runs its
+    own analysis rather than sharing an in-flight one.
     """
+    mode = _resolve_mode_or_400(mode)
+    profiled = _profiling_requested(profile, x_profile, x_admin_token)
+
     # Validate file extension
     file_ext = os.path.splitext(file.filename)[1].lower()
     if file_ext not in ALLOWED_EXTENSIONS:
@@ -286,75 +548,274 @@ async def analyze_resume(file: UploadFile = File(...)):
             detail=f"Invalid file type. Allowed types: {', '.join(ALLOWED_EXTENSIONS)}"
         )
     
-    # Read file content
-    content = await file.read()
+    # Validate size and content type (the body limit itself is enforced
+    # by UploadLimitMiddleware while the upload streams in)
+    await _check_upload(file, file_ext)
     
-    # Validate file size
-    if len(content) > MAX_FILE_SIZE:
-        raise HTTPException(
-            status_code=400,
-            detail="File size exceeds 5MB limit"
+    try:
+        if profiled:
+            response, report = await _run_blocking(
+                True, _analyze_upload, file.file, file_ext, mode, provisional
+            )
+            return JSONResponse(dict(jsonable_encoder(response), profile=report))
+        # Identical uploads with the same options (double submits, retries on
+        # timeout) share one in-flight analysis
+        digest = await run_in_threadpool(_content_sha256, file.file)
+        return await analysis_flights.do(
+            (digest, file_ext, mode, provisional),
+            lambda: run_in_threadpool(_analyze_upload, file.file, file_ext, mode, provisional)
         )
-    
+    except SandboxError as e:
+        # Parser killed by a time/memory/CPU limit: the document, not the service, is at fault
+        raise HTTPException(status_code=422, detail=f"Resume could not be parsed: {e}") from e
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+async def _parse_state(analysis_id: Optional[str], state: Optional[dict[str, Any]]) -> dict[str, Any]:
+    """The parse state sent, or the stored one of analysis_id."""
+    if (analysis_id is None) == (state is None):
+        raise HTTPException(status_code=400, detail="Send either analysis_id or state.")
+    if analysis_id is not None:
+        state = await run_in_threadpool(analysis_store.get, analysis_id)
+        if state is None:
+            raise HTTPException(status_code=404, detail="Analysis not found or expired.")
+    return state
+
+
+class RescoreRequest(BaseModel):
+    analysis_id: Optional[str] = None  # from an earlier /api/analyze or /api/rescore response
+    state: Optional[dict[str, Any]] = None  # or that analysis' parse state itself
+    text: Optional[str] = None  # the edited resume text in full
+    sections: Optional[dict[str, str]] = None  # or only the edited sections' contents
+
+
+@app.post("/api/rescore", response_model=AnalysisResponse)
+async def rescore_resume(body: RescoreRequest):
+    """
+    Re-analyze an edited resume without re-uploading it
+
+    Identify the earlier analysis by `analysis_id` (or send its `state`,
+    from GET /api/analyses/{id}/state), and send either the edited `text`
+    or the new contents of the edited `sections` (by section type, e.g.
+    "experience", without the header line). Only sections whose hash
+    changed are re-extracted; the result equals a full analysis of the
+    edited text, and carries a new analysis_id for the next edit.
+    """
+    state = await _parse_state(body.analysis_id, body.state)
     try:
-        # Create temporary file
-        with tempfile.NamedTemporaryFile(delete=False, suffix=file_ext) as tmp_file:
-            tmp_file.write(content)
-            tmp_path = tmp_file.name
-        
-        # Parse resume
-        parsed_data = resume_parser.parse(tmp_path, file_ext)
-        
-        # Get OCR metadata
-        parsing_method = parsed_data.get("parsing_method", "standard")
-        ocr_confidence = parsed_data.get("ocr_confidence")
-        
-        # Extract skills
-        skills_data = skill_extractor.extract(parsed_data["raw_text"])
-        
-        # Classify domain
-        domain_data = domain_classifier.classify(parsed_data["raw_text"], skills_data)
-        
-        # Calculate ATS score (OCR-aware)
-        ats_analysis = ats_scorer.calculate_score(
-            parsed_data, 
-            skills_data, 
-            domain_data,
-            parsing_method=parsing_method,
-            ocr_confidence=ocr_confidence
+        return await run_in_threadpool(get_analysis_pipeline().rescore, state, body.text, body.sections)
+    except ValidationError as e:
+        # An internal model built from the edited text failed; its message names internal fields
+        raise HTTPException(status_code=422, detail="The edited resume could not be analyzed.") from e
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+
+
+class SimulatedEdit(BaseModel):
+    type: str  # "add_skill" | "add_keyword" | "add_metrics" | "add_section"
+    value: Optional[str] = None  # the skill, keyword or section type
+    text: Optional[str] = None  # lines to add instead of the edit's default
+
+
+class SimulateRequest(BaseModel):
+    analysis_id: Optional[str] = None  # from an earlier /api/analyze or /api/rescore response
+    state: Optional[dict[str, Any]] = None  # or that analysis' parse state itself
+    edits: list[SimulatedEdit]
+
+
+# Upper bound on the edits of one /api/simulate request
+MAX_SIMULATED_EDITS = 50
+
+
+@app.post("/api/simulate", response_model=SimulationResponse)
+async def simulate_edits(body: SimulateRequest):
+    """
+    Score impact of hypothetical edits to an analyzed resume
+
+    Each edit adds lines to one section: "add_skill" and "add_keyword" add
+    `value` to the skills section, "add_metrics" a quantified achievement
+    to the experience section, "add_section" the section named by `value`
+    (a summary gets a default sentence; other sections need `text`).
+    Edits are simulated one at a time against the analysis' stored score
+    features, re-evaluating only the score components an edit affects,
+    and returned by impact on the score, largest first, to rank suggestions.
+    """
+    if not 1 <= len(body.edits) <= MAX_SIMULATED_EDITS:
+        raise HTTPException(status_code=400, detail=f"Send 1 to {MAX_SIMULATED_EDITS} edits.")
+    state = await _parse_state(body.analysis_id, body.state)
+    try:
+        return await run_in_threadpool(
+            get_analysis_pipeline().simulate, state, [edit.model_dump() for edit in body.edits]
         )
-        
-        # Cleanup temporary file
-        os.unlink(tmp_path)
-        
-        # Build response
-        response = AnalysisResponse(
-            success=True,
-            candidate=parsed_data["candidate"],
-            ats_score=ats_analysis["score"],
-            score_breakdown=ats_analysis["breakdown"],
-            score_category=ats_analysis["category"],
-            domain=domain_data,
-            skills=skills_data,
-            projects=parsed_data["projects"],
-            experience=parsed_data["experience"],
-            education=parsed_data["education"],
-            issues=ats_analysis["issues"],
-            suggestions=ats_analysis["suggestions"],
-            keywords_analysis=ats_analysis["keywords_analysis"],
-            # OCR metadata
-            parsing_method=parsing_method,
-            ocr_confidence=ocr_confidence
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail="The edited resume could not be analyzed.") from e
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+
+
+@app.get("/api/analyses/{analysis_id}/state")
+async def get_analysis_state(analysis_id: str):
+    """Parse state of an analysis, for clients that keep it to re-score or simulate edits later."""
+    state = await run_in_threadpool(analysis_store.get, analysis_id)
+    if state is None:
+        raise HTTPException(status_code=404, detail="Analysis not found or expired.")
+    return state
+
+
+@app.post("/api/analyze/stream")
+async def analyze_resume_stream(file: UploadFile = File(...), mode: str = DEFAULT_MODE):
+    """
+    /api/analyze as server-sent events, one per finished stage
+
+    Events: `parse` (candidate, experience, education, projects), `skills`,
+    `domain` and `score`, each with its stage_ms and elapsed_ms since the
+    request started, then `result` with the AnalysisResponse (or `error`
+    with status and detail). Scanned resumes run a native-text pass first
+    (pass "native", provisional) so candidate info and skills arrive before
+    OCR; the OCR pass then repeats the stages (pass "ocr").
+    """
+    mode = _resolve_mode_or_400(mode)
+    file_ext = os.path.splitext(file.filename)[1].lower()
+    if file_ext not in ALLOWED_EXTENSIONS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid file type. Allowed types: {', '.join(ALLOWED_EXTENSIONS)}"
         )
-        
-        return response
-        
-    except Exception as e:
-        # Cleanup on error
-        if 'tmp_path' in locals() and os.path.exists(tmp_path):
+    await _check_upload(file, file_ext)
+
+    # The upload is closed once the response starts, so copy it out first
+    def spool() -> str:
+        with tempfile.NamedTemporaryFile(delete=False, suffix=file_ext) as tmp_file:
+            shutil.copyfileobj(file.file, tmp_file)
+            return tmp_file.name
+
+    tmp_path = await run_in_threadpool(spool)
+    loop = asyncio.get_running_loop()
+    events: asyncio.Queue = asyncio.Queue()
+    started = time.perf_counter()
+
+    def emit(event: Optional[str], data=None) -> None:
+        loop.call_soon_threadsafe(events.put_nowait, (event, data))
+
+    def stage_emitter(analysis_pass: str):
+        def on_stage(stage: str, partial: dict) -> None:
+            partial["pass"] = analysis_pass
+            partial["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 1)
+            emit(stage, jsonable_encoder(partial))
+        return on_stage
+
+    def work() -> None:
+        pipeline = get_analysis_pipeline()
+        try:
+            response = pipeline.run(tmp_path, file_ext, mode, defer_ocr=True, on_stage=stage_emitter("native"))
+            if response.provisional:
+                response = pipeline.run(tmp_path, file_ext, mode, on_stage=stage_emitter("ocr"))
+            emit("result", jsonable_encoder(response))
+        except SandboxError as e:
+            emit("error", {"status": 422, "detail": f"Resume could not be parsed: {e}"})
+        except Exception as e:
+            emit("error", {"status": 500, "detail": str(e)})
+        finally:
             os.unlink(tmp_path)
-        raise HTTPException(status_code=500, detail=str(e))
+            emit(None)
 
+    # If the client disconnects, the analysis still finishes (and cleans up)
+    worker = asyncio.ensure_future(run_in_threadpool(work))
+    _background_tasks.add(worker)
+    worker.add_done_callback(_background_tasks.discard)
+
+    async def stream():
+        while True:
+            event, data = await events.get()
+            if event is None:
+                break
+            yield sse_event(event, data)
+
+    return StreamingResponse(stream(), media_type="text/event-stream", headers=SSE_HEADERS)
+
+
+@app.post("/api/jobs/analyze", response_model=JobAccepted, status_code=202)
+async def enqueue_analysis(
+    file: UploadFile = File(...),
+    mode: str = DEFAULT_MODE,
+    callback_url: Optional[str] = Form(None)
+):
+    """
+    Queue a resume analysis and return its job id immediately
+
+    Poll GET /api/jobs/{job_id} for the result, or pass `callback_url` to
+    have the finished job POSTed there. Jobs are persisted, so they survive
+    restarts, and failed attempts are retried with backoff.
+    """
+    mode = _resolve_mode_or_400(mode)
+    file_ext = os.path.splitext(file.filename)[1].lower()
+    if file_ext not in ALLOWED_EXTENSIONS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid file type. Allowed types: {', '.join(ALLOWED_EXTENSIONS)}"
+        )
+    if callback_url:
+        try:
+            # Refuses private, loopback and link-local targets (resolves the host)
+            await run_in_threadpool(check_callback_url, callback_url)
+        except CallbackURLError as e:
+            raise HTTPException(status_code=400, detail=str(e)) from e
+    await _check_upload(file, file_ext)
+
+    job_id = job_queue.new_id()
+    file_path = job_queue.file_path_for(job_id, file_ext)
+
+    def persist() -> None:
+        with open(file_path, "wb") as f:
+            shutil.copyfileobj(file.file, f)
+        job_queue.enqueue(job_id, "analyze", file_path, file_ext, {"mode": mode}, callback_url)
+
+    await run_in_threadpool(persist)
+    return JobAccepted(job_id=job_id, status="queued", status_url=f"/api/jobs/{job_id}")
+
+
+@app.get("/api/jobs/{job_id}", response_model=JobStatus)
+async def get_job(job_id: str):
+    """Status of a queued analysis, with its AnalysisResponse once it has succeeded."""
+    job = await run_in_threadpool(job_queue.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found.")
+    return JobStatus(**job_payload(job))
+
+
+JOB_EVENTS_POLL_SECONDS = 0.5
+JOB_EVENTS_KEEPALIVE_SECONDS = 15
+
+
+@app.get("/api/jobs/{job_id}/events")
+async def job_events(job_id: str):
+    """Server-sent events for a job: `status` on every change, then `result` once finished.
+
+    The final `result` event carries the same payload as GET /api/jobs/{id}.
+    """
+    if await run_in_threadpool(job_queue.get, job_id) is None:
+        raise HTTPException(status_code=404, detail="Job not found.")
+
+    async def stream():
+        last_status = None
+        idle = 0.0
+        while True:
+            job = await run_in_threadpool(job_queue.get, job_id)
+            if job["status"] in (SUCCEEDED, FAILED):
+                yield sse_event("result", job_payload(job))
+                return
+            if job["status"] != last_status:
+                last_status = job["status"]
+                idle = 0.0
+                yield sse_event("status", {"job_id": job_id, "status": last_status, "attempts": job["attempts"]})
+            elif idle >= JOB_EVENTS_KEEPALIVE_SECONDS:
+                idle = 0.0
+                yield KEEPALIVE
+            await asyncio.sleep(JOB_EVENTS_POLL_SECONDS)
+            idle += JOB_EVENTS_POLL_SECONDS
+
+    return StreamingResponse(stream(), media_type="text/event-stream", headers=SSE_HEADERS)
 
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,34 @@
+"""
+Compile app/data/taxonomy.json into the binary snapshot the service maps at startup.
+Run with: python scripts/build_taxonomy.py [taxonomy.json] [taxonomy.snap]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from app.services.taxonomy import SNAPSHOT_PATH, TAXONOMY_PATH, build_snapshot, load_taxonomy
+
+
+def main() -> None:
+    source = sys.argv[1] if len(sys.argv) > 1 else TAXONOMY_PATH
+    target = sys.argv[2] if len(sys.argv) > 2 else SNAPSHOT_PATH
+
+    start = time.perf_counter()
+    taxonomy = build_snapshot(source, target)
+    built_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    loaded = load_taxonomy(source, target)
+    loaded_ms = (time.perf_counter() - start) * 1000
+    if loaded.origin != target:
+        sys.exit(f"Snapshot {target} did not load back")
+
+    print(f"Taxonomy v{taxonomy.version}: {len(taxonomy.vocabulary.names)} skills, "
+          f"{len(taxonomy.domains)} domains")
+    print(f"Wrote {target} ({os.path.getsize(target)} bytes) in {built_ms:.1f} ms; "
+          f"loads in {loaded_ms:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()